@@ -97,8 +97,12 @@ namespace std {
 %apply (int DIM1, double* IN_ARRAY1) {(int size_values, double *values_array)}
 %apply (int DIM1, double* IN_ARRAY1) {(int size, double *data)}
 %apply(int *DIM1, double** ARGOUTVIEW_ARRAY1) {(int* size, double** data_array)}
-#ifndef HAVE_MPI
+// getLocalArray() returns a view of the local data in serial and in parallel
 %apply(int *DIM1, int* DIM2, double** ARGOUTVIEW_ARRAY2) {(int* size1, int* size2, double** mat_array)}
+#ifndef HAVE_MPI
+%apply(int *DIM1, int** ARGOUTVIEW_ARRAY1) {(int* size_indptr, int** indptr_array),
+                                           (int* size_indices, int** indices_array)}
+%apply(int *DIM1, double** ARGOUTVIEW_ARRAY1) {(int* size_data, double** data_array)}
 #endif
 
 //%apply (int DIM1, double* IN_ARRAY1) {(int size, double *in_array)};
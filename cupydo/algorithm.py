@@ -37,6 +37,10 @@ import sys
 import ccupydo
 from utilities import *
 from interfaceData import FlexInterfaceData
+from profiler import getProfiler, profiled
+from predictor import VelocityPredictor
+from history import HistoryWriter, flushHistoryWriters
+from checkpoint import Checkpointer, getInterfaceDataState, setInterfaceDataState
 
 np.set_printoptions(threshold=sys.maxsize)
 
@@ -63,13 +67,13 @@ class Algorithm:
         self.interfaceInterpolator = InterfaceInterpolator
         
 
-        self.globalTimer = Timer()
-        self.communicationTimer = Timer()
-        self.meshDefTimer = Timer()
-        self.fluidSolverTimer = Timer()
-        self.solidSolverTimer = Timer()
-        self.solidRemeshingTimer = Timer()
-        self.fluidRemeshingTimer = Timer()
+        self.globalTimer = Timer('FSI')
+        self.communicationTimer = Timer('communication')
+        self.meshDefTimer = Timer('meshDeformation')
+        self.fluidSolverTimer = Timer('fluidSolver')
+        self.solidSolverTimer = Timer('solidSolver')
+        self.solidRemeshingTimer = Timer('solidRemeshing')
+        self.fluidRemeshingTimer = Timer('fluidRemeshing')
 
         
         self.deltaT = deltaT
@@ -88,6 +92,59 @@ class Algorithm:
 
         self.solidHasRun = False
 
+        # --- Start the solid to fluid transfers of the next time step before the solvers preprocessing (see postSolidToFluidTransfers()) --- #
+        self.pipelined = False
+
+        # --- Checkpoint of the coupling state every checkpointInterval time steps, restart from restartPath (see checkpoint() and restart()) --- #
+        self.checkpointPath = None
+        self.checkpointInterval = 10
+        self.restartPath = None
+        self.checkpointer = Checkpointer(mpiComm)
+
+    def getState(self):
+        """
+        Returns the coupling state of the process (scalars, copies of arrays and of the local rows of the interface data), restored by setState().
+        """
+
+        return {'mpiSize': self.mpiSize, 'time': self.time, 'timeIter': self.timeIter, 'deltaT': self.deltaT,
+                'interpolator': self.interfaceInterpolator.getState()}
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        self.time = state['time']
+        self.timeIter = state['timeIter']
+        self.deltaT = state['deltaT']
+        self.interfaceInterpolator.setState(state['interpolator'])
+
+    def checkpoint(self, path):
+        """
+        Writes the coupling state in the directory path, one file per process (collective call).
+        The state is copied, then written by a worker thread while the time loop goes on.
+        The solvers are not checkpointed: their own restart mechanisms must be used.
+        """
+
+        mpiPrint('\nCheckpoint of the coupling state in {}'.format(path), self.mpiComm)
+        self.checkpointer.write(path, self.getState())
+
+    def restart(self, path):
+        """
+        Restores the coupling state written in the directory path by checkpoint() (collective call).
+        """
+
+        mpiPrint('\nRestart of the coupling state from {}'.format(path), self.mpiComm)
+        self.setState(self.checkpointer.read(path))
+        mpiPrint('Restarting at time iteration {} (time {})'.format(self.timeIter, self.time), self.mpiComm)
+
+    def isCheckpointStep(self):
+        """
+        Des.
+        """
+
+        return self.checkpointPath != None and self.checkpointInterval > 0 and self.timeIter % self.checkpointInterval == 0
+
     def setFSIInitialConditions(self):
         """
         Des.
@@ -129,7 +186,8 @@ class Algorithm:
         """
 
         self.communicationTimer.start()
-        self.interfaceInterpolator.interpolateSolidDisplacementOnFluidMesh()
+        if not self.interfaceInterpolator.isTransferPending('displacement'):
+            self.interfaceInterpolator.interpolateSolidDisplacementOnFluidMesh()
         self.interfaceInterpolator.setDisplacementToFluidSolver(self.time)
         self.communicationTimer.stop()
         self.communicationTimer.cumul()
@@ -141,14 +199,30 @@ class Algorithm:
 
         self.communicationTimer.start()
         if self.interfaceInterpolator.chtTransferMethod == 'TFFB' or self.interfaceInterpolator.chtTransferMethod == 'hFFB':
-            self.interfaceInterpolator.interpolateSolidHeatFluxOnFluidMesh()
+            if not self.interfaceInterpolator.isTransferPending('heatFlux'):
+                self.interfaceInterpolator.interpolateSolidHeatFluxOnFluidMesh()
             self.interfaceInterpolator.setHeatFluxToFluidSolver(self.time)
         elif self.interfaceInterpolator.chtTransferMethod == 'FFTB' or self.interfaceInterpolator.chtTransferMethod == 'hFTB':
-            self.interfaceInterpolator.interpolateSolidTemperatureOnFluidMesh()
+            if not self.interfaceInterpolator.isTransferPending('temperature'):
+                self.interfaceInterpolator.interpolateSolidTemperatureOnFluidMesh()
             self.interfaceInterpolator.setTemperatureToFluidSolver(self.time)
         self.communicationTimer.stop()
         self.communicationTimer.cumul()
 
+    def postSolidToFluidTransfers(self):
+        """
+        Starts the interpolation and redistribution of the solid interface data for the first iteration of the next time step (displacement, and thermal data if the solid has run).
+        They are completed by solidToFluidMechaTransfer() and solidToFluidThermalTransfer(), the preprocessing of the solvers being done meanwhile.
+        """
+
+        self.communicationTimer.start()
+        if self.manager.mechanical:
+            self.interfaceInterpolator.postDisplacementToFluidSolver()
+        if self.manager.thermal and self.solidHasRun:
+            self.interfaceInterpolator.postThermalDataToFluidSolver()
+        self.communicationTimer.stop()
+        self.communicationTimer.cumul()
+
     def fluidToSolidThermalTransfer(self):
         """
         Des.
@@ -200,6 +274,8 @@ class AlgorithmExplicit(Algorithm):
         mpiPrint('Setting FSI initial conditions...', self.mpiComm)
         self.setFSIInitialConditions()
         mpiPrint('\nFSI initial conditions are set', self.mpiComm)
+        if self.restartPath != None:
+            self.restart(self.restartPath)
         
         try:
             if self.manager.computationType == 'unsteady':
@@ -220,6 +296,8 @@ class AlgorithmExplicit(Algorithm):
             mpiPrint('*************************\n', self.mpiComm)
             
             self.printExitInfo()
+            flushHistoryWriters()
+            self.checkpointer.wait()
             
             # --- Exit the solid solver --- #
             if self.myid in self.manager.getSolidSolverProcessors():
@@ -245,6 +323,8 @@ class AlgorithmExplicit(Algorithm):
         while self.timeIter <= nbTimeIter:
             
             mpiPrint("\n>>>> Time iteration {} <<<<".format(self.timeIter), self.mpiComm)
+            getProfiler().setTimeIteration(self.timeIter)
+            getProfiler().start('timeStep')
 
             # --- Preprocess the temporal iteration --- #
             self.FluidSolver.preprocessTimeIter(self.timeIter)
@@ -283,8 +363,13 @@ class AlgorithmExplicit(Algorithm):
             self.fluidRemeshingTimer.cumul()
             # ---
 
+            getProfiler().stop('timeStep')
             self.timeIter += 1
             self.time += self.deltaT
+
+            if self.isCheckpointStep():
+                # --- The state is the one of the beginning of the next time step --- #
+                self.checkpoint(self.checkpointPath)
         # --- End of the temporal loop --- #
 
     def fsiCoupling(self):
@@ -413,10 +498,15 @@ class AlgorithmBGSStaticRelax(Algorithm):
         self.totNbOfFSIIt = 0
         self.nbFSIIterMax = nbFSIIterMax
 
+        # --- Predictor of the interface displacement of the next time step (see predictor.py) --- #
         self.predictor = True
-        self.predictorOrder = 2
-        self.alpha_0 = 1.0
-        self.alpha_1 = 0.5
+        self.displacementPredictor = VelocityPredictor(2, 1.0, 0.5)
+
+        # --- Inexact coupling: the solvers tolerance follows the coupling error (see setSolversTolerance()) --- #
+        self.adaptiveTolerance = False
+        self.toleranceFactorMax = 100.0
+        self.toleranceEta = 0.1
+        self.errValuekM1 = None
 
         self.solidInterfaceVelocity = None
         self.solidInterfaceVelocitynM1 = None
@@ -433,7 +523,7 @@ class AlgorithmBGSStaticRelax(Algorithm):
         d = self.interfaceInterpolator.getd()
 
         # --- Initialize data for prediction (mechanical only) --- #
-        if self.predictor and self.manager.mechanical:
+        if self.predictor and self.manager.mechanical and self.displacementPredictor.needsVelocity:
             self.solidInterfaceVelocity = FlexInterfaceData(ns+d, 3, self.mpiComm)
             self.solidInterfaceVelocitynM1 = FlexInterfaceData(ns+d, 3, self.mpiComm)
 
@@ -444,6 +534,44 @@ class AlgorithmBGSStaticRelax(Algorithm):
             self.solidHeatFluxResidual = FlexInterfaceData(ns+d, 3, self.mpiComm)
             self.solidTemperatureResidual = FlexInterfaceData(ns+d, 1, self.mpiComm)
 
+    def getState(self):
+        """
+        Des.
+        """
+
+        state = Algorithm.getState(self)
+        state.update({'omegaMecha': self.omegaMecha, 'omegaThermal': self.omegaThermal, 'totNbOfFSIIt': self.totNbOfFSIIt,
+                      'errValue': self.errValue, 'errValuekM1': self.errValuekM1,
+                      'solidInterfaceVelocity': getInterfaceDataState(self.solidInterfaceVelocity),
+                      'solidInterfaceVelocitynM1': getInterfaceDataState(self.solidInterfaceVelocitynM1),
+                      'solidInterfaceResidual': getInterfaceDataState(self.solidInterfaceResidual),
+                      'solidHeatFluxResidual': getInterfaceDataState(self.solidHeatFluxResidual),
+                      'solidTemperatureResidual': getInterfaceDataState(self.solidTemperatureResidual),
+                      'criterion': self.criterion.getState()})
+        if self.displacementPredictor != None:
+            state['displacementPredictor'] = self.displacementPredictor.getState()
+        return state
+
+    def setState(self, state):
+        """
+        The predictors must be of the same type as in the checkpointed computation.
+        """
+
+        Algorithm.setState(self, state)
+        self.omegaMecha = state['omegaMecha']
+        self.omegaThermal = state['omegaThermal']
+        self.totNbOfFSIIt = state['totNbOfFSIIt']
+        self.errValue = state['errValue']
+        self.errValuekM1 = state['errValuekM1']
+        setInterfaceDataState(self.solidInterfaceVelocity, state['solidInterfaceVelocity'])
+        setInterfaceDataState(self.solidInterfaceVelocitynM1, state['solidInterfaceVelocitynM1'])
+        setInterfaceDataState(self.solidInterfaceResidual, state['solidInterfaceResidual'])
+        setInterfaceDataState(self.solidHeatFluxResidual, state['solidHeatFluxResidual'])
+        setInterfaceDataState(self.solidTemperatureResidual, state['solidTemperatureResidual'])
+        self.criterion.setState(state['criterion'])
+        if self.displacementPredictor != None and 'displacementPredictor' in state:
+            self.displacementPredictor.setState(state['displacementPredictor'])
+
     def run(self):
         """
         Des.
@@ -465,6 +593,8 @@ class AlgorithmBGSStaticRelax(Algorithm):
         mpiPrint('Setting FSI initial conditions...', self.mpiComm)
         self.setFSIInitialConditions()
         mpiPrint('\nFSI initial conditions are set', self.mpiComm)
+        if self.restartPath != None:
+            self.restart(self.restartPath)
         
         try:
             if self.manager.computationType == 'unsteady':
@@ -493,6 +623,8 @@ class AlgorithmBGSStaticRelax(Algorithm):
             mpiPrint('*************************\n', self.mpiComm)
             
             self.printExitInfo()
+            flushHistoryWriters()
+            self.checkpointer.wait()
             
             # --- Exit the solid solver --- #
             if self.myid in self.manager.getSolidSolverProcessors():
@@ -518,6 +650,8 @@ class AlgorithmBGSStaticRelax(Algorithm):
         while self.timeIter <= nbTimeIter:
             
             mpiPrint("\n>>>> Time iteration {} <<<<".format(self.timeIter), self.mpiComm)
+            getProfiler().setTimeIteration(self.timeIter)
+            getProfiler().start('timeStep')
 
             # --- Preprocess the temporal iteration --- #
             self.FluidSolver.preprocessTimeIter(self.timeIter)
@@ -529,6 +663,8 @@ class AlgorithmBGSStaticRelax(Algorithm):
             # --- End of FSI loop --- #
 
             mpiBarrier(self.mpiComm)
+            if self.manager.mechanical:
+                self.criterion.updateTimeStep(self.interfaceInterpolator.solidInterfaceDisplacement)
             
             if self.timeIter > 0:
                 self.totNbOfFSIIt += self.FSIIter
@@ -564,8 +700,17 @@ class AlgorithmBGSStaticRelax(Algorithm):
                 mpiPrint('\nSolid displacement prediction for next time step', self.mpiComm)
                 self.solidDisplacementPredictor()
 
+            if self.pipelined and self.timeIter < nbTimeIter:
+                # --- The interface data of the next time step do not change anymore, their transfer overlaps the preprocessing of the solvers --- #
+                self.postSolidToFluidTransfers()
+
+            getProfiler().stop('timeStep')
             self.timeIter += 1
             self.time += self.deltaT
+
+            if self.isCheckpointStep():
+                # --- The state is the one of the beginning of the next time step --- #
+                self.checkpoint(self.checkpointPath)
         # --- End of the temporal loop --- #
 
     def iniRealTimeData(self):
@@ -577,9 +722,9 @@ class AlgorithmBGSStaticRelax(Algorithm):
             self.FluidSolver.initRealTimeData()
         if self.myid in self.manager.getSolidSolverProcessors():
             self.SolidSolver.initRealTimeData()
-        histFile = open('FSIhistory.ascii', "w")
-        histFile.write("{0:>12s}   {1:>12s}   {2:>12s}   {3:>12s}   {4:>12s}   {5:>12s}   {6:>12s}\n".format("TimeIter", "Time", "FSIError", "CHTError", "FSINbIter", "omegaMecha", "omegaThermal"))
-        histFile.close()
+        if self.myid == 0:
+            self.historyWriter = HistoryWriter('FSIhistory.ascii', [('TimeIter', '12d'), ('Time', '.6e'), ('FSIError', '.6e'), ('CHTError', '.6e'), ('FSINbIter', '12d'),
+                                                                   ('omegaMecha', '.6e'), ('omegaThermal', '.6e'), ('fluidTime', '.6e'), ('solidTime', '.6e')])
 
     def writeRealTimeData(self):
         """
@@ -590,9 +735,8 @@ class AlgorithmBGSStaticRelax(Algorithm):
             self.FluidSolver.saveRealTimeData(self.time, self.FSIIter)
             if self.timeIter >= self.timeIterTreshold:
                 self.SolidSolver.saveRealTimeData(self.time, self.FSIIter)
-            histFile = open('FSIhistory.ascii', "a")
-            histFile.write('{0:12d}   {1:.6e}   {2:.6e}   {3:.6e}   {4:12d}   {5:.6e}   {6:.6e}\n'.format(self.timeIter, self.time, self.errValue, self.errValue_CHT, self.FSIIter, self.omegaMecha, self.omegaThermal))
-            histFile.close()
+            self.historyWriter.append(self.timeIter, self.time, self.errValue, self.errValue_CHT, self.FSIIter, self.omegaMecha, self.omegaThermal,
+                                      self.fluidSolverTimer.cumulTime, self.solidSolverTimer.cumulTime)
 
     def getMeanNbOfFSIIt(self):
         """
@@ -647,6 +791,9 @@ class AlgorithmBGSStaticRelax(Algorithm):
 
         while ((self.FSIIter < nbFSIIter) and (not self.criterion.isVerified(self.errValue, self.errValue_CHT))):
             mpiPrint("\n>>>> FSI iteration {} <<<<\n".format(self.FSIIter), self.mpiComm)
+            getProfiler().setFSIIteration(self.FSIIter)
+            getProfiler().start('fsiIteration')
+            self.setSolversTolerance()
 
             if self.manager.mechanical:
                 # --- Solid to fluid mechanical transfer --- #
@@ -693,7 +840,7 @@ class AlgorithmBGSStaticRelax(Algorithm):
                 if self.manager.mechanical:
                     # --- Compute the mechanical residual --- #
                     res = self.computeSolidInterfaceResidual()
-                    self.errValue = self.criterion.update(res)
+                    self.errValue = self.criterion.update(res, self.interfaceInterpolator.solidInterfaceDisplacement)
                     mpiPrint('\nFSI error value : {}\n'.format(self.errValue), self.mpiComm)
                 else:
                     self.errValue = 0.0
@@ -728,10 +875,39 @@ class AlgorithmBGSStaticRelax(Algorithm):
             if self.myid in self.manager.getSolidSolverProcessors():
                 self.SolidSolver.bgsUpdate()
             self.FluidSolver.bgsUpdate()
+            getProfiler().stop('fsiIteration')
 
         if self.timeIter > self.timeIterTreshold:
             mpiPrint('\n*************** BGS is converged ***************', self.mpiComm)
 
+    def setSolversTolerance(self):
+        """
+        Inexact coupling: the solvers are asked to solve to their nominal tolerance multiplied by a factor in [1, toleranceFactorMax].
+        The factor is toleranceEta times the coupling error expected at the end of the iteration (current error times its last reduction ratio) divided by the criterion tolerance,
+        so that the first iterations are loosely solved and the last ones to the nominal tolerance.
+        No coupling error is known at the first iteration (errValue is a placeholder), which is solved with toleranceFactorMax,
+        and no reduction ratio at the second one, for which the expected error is the current one.
+        """
+
+        if not self.adaptiveTolerance:
+            return
+
+        if self.FSIIter == 0:
+            self.errValuekM1 = None
+            factor = self.toleranceFactorMax
+        else:
+            expectedErrValue = self.errValue
+            if self.errValuekM1 != None and self.errValuekM1 > 0.0:
+                expectedErrValue *= min(self.errValue/self.errValuekM1, 1.0)
+            self.errValuekM1 = self.errValue
+            factor = min(max(self.toleranceEta*expectedErrValue/self.criterion.tol, 1.0), self.toleranceFactorMax)
+        mpiPrint('Inexact coupling, solvers tolerance factor : {}'.format(factor), self.mpiComm)
+        if self.myid in self.manager.getFluidSolverProcessors():
+            self.FluidSolver.setToleranceFactor(factor)
+        if self.myid in self.manager.getSolidSolverProcessors():
+            self.SolidSolver.setToleranceFactor(factor)
+
+    @profiled('residual')
     def computeSolidInterfaceResidual(self):
         """
         Des.
@@ -745,9 +921,7 @@ class AlgorithmBGSStaticRelax(Algorithm):
 
         if self.myid in self.manager.getSolidInterfaceProcessors():
             localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z = self.SolidSolver.getNodalDisplacements()
-            for iVertex in range(self.manager.getNumberOfLocalSolidInterfaceNodes()):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                predictedDisplacement[iGlobalVertex] = [localSolidInterfaceDisp_X[iVertex], localSolidInterfaceDisp_Y[iVertex], localSolidInterfaceDisp_Z[iVertex]]
+            predictedDisplacement.setRows(self.manager.getLocalGlobalIndices('solid'), np.column_stack((localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z))[:self.manager.getNumberOfLocalSolidInterfaceNodes()])
 
         predictedDisplacement.assemble()
 
@@ -757,6 +931,7 @@ class AlgorithmBGSStaticRelax(Algorithm):
 
         return self.solidInterfaceResidual
 
+    @profiled('residual')
     def computeSolidInterfaceResidual_CHT(self):
         """
         Des.
@@ -771,10 +946,10 @@ class AlgorithmBGSStaticRelax(Algorithm):
         if self.myid in self.manager.getSolidInterfaceProcessors():
             localSolidInterfaceHeatFlux_X, localSolidInterfaceHeatFlux_Y, localSolidInterfaceHeatFlux_Z = self.SolidSolver.getNodalHeatFluxes()
             localSolidInterfaceTemperature = self.SolidSolver.getNodalTemperatures()
-            for iVertex in range(self.manager.getNumberOfLocalSolidInterfaceNodes()):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                predictedHF[iGlobalVertex] = [localSolidInterfaceHeatFlux_X[iVertex], localSolidInterfaceHeatFlux_Y[iVertex], localSolidInterfaceHeatFlux_Z[iVertex]]
-                predictedTemp[iGlobalVertex] = [localSolidInterfaceTemperature[iVertex]]
+            ns_loc = self.manager.getNumberOfLocalSolidInterfaceNodes()
+            globalIndices = self.manager.getLocalGlobalIndices('solid')
+            predictedHF.setRows(globalIndices, np.column_stack((localSolidInterfaceHeatFlux_X, localSolidInterfaceHeatFlux_Y, localSolidInterfaceHeatFlux_Z))[:ns_loc])
+            predictedTemp.setRows(globalIndices, np.reshape(localSolidInterfaceTemperature, (-1,1))[:ns_loc])
 
         predictedHF.assemble()
         predictedTemp.assemble()
@@ -795,25 +970,25 @@ class AlgorithmBGSStaticRelax(Algorithm):
         Des
         """
 
-        # --- Get the velocity (current and previous time step) of the solid interface from the solid solver --- #
-        if self.myid in self.manager.getSolidInterfaceProcessors():
-            localSolidInterfaceVel_X, localSolidInterfaceVel_Y, localSolidInterfaceVel_Z = self.SolidSolver.getNodalVelocity()
-            localSolidInterfaceVelNm1_X, localSolidInterfaceVelNm1_Y, localSolidInterfaceVelNm1_Z = self.SolidSolver.getNodalVelocityNm1()
-            for iVertex in range(self.manager.getNumberOfLocalSolidInterfaceNodes()):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                self.solidInterfaceVelocity[iGlobalVertex] = [localSolidInterfaceVel_X[iVertex], localSolidInterfaceVel_Y[iVertex], localSolidInterfaceVel_Z[iVertex]]
-                self.solidInterfaceVelocitynM1[iGlobalVertex] = [localSolidInterfaceVelNm1_X[iVertex], localSolidInterfaceVelNm1_Y[iVertex], localSolidInterfaceVelNm1_Z[iVertex]]
+        predictor = self.displacementPredictor
 
-        self.solidInterfaceVelocity.assemble()
-        self.solidInterfaceVelocitynM1.assemble()
+        # --- Get the velocity (current and previous time step) of the solid interface from the solid solver --- #
+        if predictor.needsVelocity:
+            if self.myid in self.manager.getSolidInterfaceProcessors():
+                localSolidInterfaceVel_X, localSolidInterfaceVel_Y, localSolidInterfaceVel_Z = self.SolidSolver.getNodalVelocity()
+                localSolidInterfaceVelNm1_X, localSolidInterfaceVelNm1_Y, localSolidInterfaceVelNm1_Z = self.SolidSolver.getNodalVelocityNm1()
+                ns_loc = self.manager.getNumberOfLocalSolidInterfaceNodes()
+                globalIndices = self.manager.getLocalGlobalIndices('solid')
+                self.solidInterfaceVelocity.setRows(globalIndices, np.column_stack((localSolidInterfaceVel_X, localSolidInterfaceVel_Y, localSolidInterfaceVel_Z))[:ns_loc])
+                self.solidInterfaceVelocitynM1.setRows(globalIndices, np.column_stack((localSolidInterfaceVelNm1_X, localSolidInterfaceVelNm1_Y, localSolidInterfaceVelNm1_Z))[:ns_loc])
+
+            self.solidInterfaceVelocity.assemble()
+            self.solidInterfaceVelocitynM1.assemble()
 
         # --- Predict the solid position for the next time step --- #
-        if self.predictorOrder == 1:
-            mpiPrint("First order predictor.", self.mpiComm)
-            self.interfaceInterpolator.solidInterfaceDisplacement += (self.alpha_0*self.deltaT*self.solidInterfaceVelocity)
-        else:
-            mpiPrint("Second order predictor.", self.mpiComm)
-            self.interfaceInterpolator.solidInterfaceDisplacement += (self.alpha_0*self.deltaT*self.solidInterfaceVelocity + self.alpha_1*self.deltaT*(self.solidInterfaceVelocity-self.solidInterfaceVelocitynM1))
+        predictor.update(self.interfaceInterpolator.solidInterfaceDisplacement)
+        mpiPrint(predictor.describe(), self.mpiComm)
+        predictor.predict(self.interfaceInterpolator.solidInterfaceDisplacement, self.deltaT, self.solidInterfaceVelocity, self.solidInterfaceVelocitynM1)
 
     def setOmegaMecha(self):
         """
@@ -857,6 +1032,28 @@ class AlgorithmBGSStaticRelax(Algorithm):
         elif self.interfaceInterpolator.chtTransferMethod == 'hFTB' or self.interfaceInterpolator.chtTransferMethod == 'FFTB':
             self.interfaceInterpolator.solidInterfaceTemperature += (self.omegaThermal*self.solidTemperatureResidual)
 
+    def getLocalSlab(self, interfData):
+        """
+        Returns the local slab of the coupling vector made of the nDim components of the physical solid interface nodes owned by this process (component after component).
+        """
+
+        ns = self.interfaceInterpolator.getNs()
+        startIndex, stopIndex = interfData.getOwnershipRange()
+        nRows = max(0, min(stopIndex, ns) - startIndex)
+        with interfData.localView() as view:
+            slab = view[:nRows,:self.manager.nDim].T.ravel()
+        return slab
+
+    def setLocalSlab(self, interfData, slab):
+        """
+        Sets the rows owned by this process from a local slab (see getLocalSlab()), the other components and rows being set to 0.
+        """
+
+        nRows = slab.shape[0]//self.manager.nDim
+        with interfData.localView() as view:
+            view[:] = 0.0
+            view[:nRows,:self.manager.nDim] = slab.reshape(self.manager.nDim, nRows).T
+
 class AlgorithmBGSAitkenRelax(AlgorithmBGSStaticRelax):
 
     def __init__(self, Manager, FluidSolver, SolidSolver, InterfaceInterpolator, Criterion, nbFSIIterMax, deltaT, totTime, timeIterTreshold=-1, omegaBoundList=[1.0, 1.0], mpiComm=None):
@@ -886,6 +1083,26 @@ class AlgorithmBGSAitkenRelax(AlgorithmBGSStaticRelax):
         self.solidHeatFluxResidualkM1 = FlexInterfaceData(ns+d, 3, self.mpiComm)
         self.solidTemperatureResidualkM1 = FlexInterfaceData(ns+d, 1, self.mpiComm)
 
+    def getState(self):
+        """
+        Des.
+        """
+
+        state = AlgorithmBGSStaticRelax.getState(self)
+        state.update({'solidInterfaceResidualkM1': getInterfaceDataState(self.solidInterfaceResidualkM1),
+                      'solidHeatFluxResidualkM1': getInterfaceDataState(self.solidHeatFluxResidualkM1),
+                      'solidTemperatureResidualkM1': getInterfaceDataState(self.solidTemperatureResidualkM1)})
+        return state
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        AlgorithmBGSStaticRelax.setState(self, state)
+        setInterfaceDataState(self.solidInterfaceResidualkM1, state['solidInterfaceResidualkM1'])
+        setInterfaceDataState(self.solidHeatFluxResidualkM1, state['solidHeatFluxResidualkM1'])
+        setInterfaceDataState(self.solidTemperatureResidualkM1, state['solidTemperatureResidualkM1'])
 
 
     def setOmegaMecha(self):
@@ -995,33 +1212,119 @@ class AlgorithmIQN_ILS(AlgorithmBGSAitkenRelax):
         self.maxNbOfItReached = False
         self.convergenceReachedInOneIt = False
         
-        # --- Global V and W matrices for IQN-ILS algorithm, including information from previous time steps --- #
-        self.V = []
-        self.W = []
+        # --- Global V and W matrices for IQN-ILS algorithm (newest columns first, tagged with their time step), including information from previous time steps, and their QR factorization --- #
+        # (distributed by rows, as the solid interface data)
+        self.qr = IncrementalQR(self.mpiComm)
+        self.storedTimeSteps = []
+
+    def getState(self):
+        """
+        Des.
+        """
+
+        state = AlgorithmBGSAitkenRelax.getState(self)
+        state.update({'qr': self.qr.getState(), 'storedTimeSteps': list(self.storedTimeSteps),
+                      'maxNbOfItReached': self.maxNbOfItReached, 'convergenceReachedInOneIt': self.convergenceReachedInOneIt})
+        return state
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        AlgorithmBGSAitkenRelax.setState(self, state)
+        self.qr.setState(state['qr'])
+        self.storedTimeSteps = state['storedTimeSteps']
+        self.maxNbOfItReached = state['maxNbOfItReached']
+        self.convergenceReachedInOneIt = state['convergenceReachedInOneIt']
     
-    def qrSolve(self, V, W, res):
+    def qrSolve(self, res):
+        """
+        Computes the coefficients c of the least-squares problem V*c = -res, using the QR factorization of V updated at each iteration.
+        res is the local slab of the residual (collective call).
+        Filtered columns are removed from V and W for the following iterations.
+        """
         
         if self.qrFilter == 'Degroote1': # QR filtering as described by J. Degroote et al. Computers and Structures, 87, 793-801 (2009).
-            Q, R = sp.linalg.qr(V, mode='economic')
-            s = np.dot(np.transpose(Q), -res)
-            toll = self.tollQR*sp.linalg.norm(R, 2)
-            c = solve_upper_triangular_mod(R, s, toll)
+            s = self.qr.dot(-res)
+            toll = self.tollQR*sp.linalg.norm(self.qr.R, 2)
+            c = solve_upper_triangular_mod(self.qr.R, s, toll)
         
-        elif self.qrFilter == 'Degroote2': # QR filtering as described by J. Degroote et al. CMAME, 199, 2085-2098 (2010).
-            Q, R, V, W = QRfiltering(V, W, self.tollQR)
-            s = np.dot(np.transpose(Q), -res)
-            c = np.linalg.solve(R, s)
-        
-        elif self.qrFilter == 'Haelterman': # 'Modified' QR filtering as described by R. Haelterman et al. Computers and Structures, 171, 9-17 (2016).
-            Q, R, V, W = QRfiltering_mod(V, W, self.tollQR)
-            s = np.dot(np.transpose(Q), -res)
-            c = np.linalg.solve(R, s)
+        elif self.qrFilter == 'Degroote2' or self.qrFilter == 'Haelterman': # QR filtering as described by J. Degroote et al. CMAME, 199, 2085-2098 (2010), or 'modified' QR filtering as described by R. Haelterman et al. Computers and Structures, 171, 9-17 (2016).
+            self.qr.filter(self.qrFilter, self.tollQR)
+            s = self.qr.dot(-res)
+            c = np.linalg.solve(self.qr.R, s)
         
         else:
             raise NameError('IQN-ILS Algorithm: the QR filtering technique is unknown!')
         
-        return c, W
+        return c, self.qr.W
     
+    def addSecantPair(self, delta_res, delta_d):
+        """
+        Adds the differences of the residual and of the solid solver output between two iterations (local slabs) to V and W.
+        """
+
+        self.qr.prepend(delta_res, delta_d, self.timeIter)
+
+    def isRelaxationStep(self):
+        """
+        Returns True if the solid position has to be relaxed (as in BGS) instead of being corrected by the quasi-Newton method.
+        If information from previous time steps is re-used then this step is only performed at the first iteration of the first time step, otherwise it is performed at the first iteration of every time step.
+        """
+
+        return (self.FSIIter == 0 and (self.nbTimeToKeep == 0 or (self.nbTimeToKeep != 0 and (self.maxNbOfItReached or self.convergenceReachedInOneIt or self.timeIter == 1)))) or self.timeIter < 1
+
+    def computeCorrection(self, res):
+        """
+        Returns the local slab of the correction of the solid interface displacement, W*c + res (collective call).
+        """
+
+        if self.qr.getNumberOfColumns() == 0: # e.g. zero residual difference, plain fixed-point update
+            return res.copy()
+        elif self.useQR: # Technique described by Degroote et al.
+            c, W = self.qrSolve(res)
+        else: # Least-squares solution without filtering: NOT RECOMMENDED!
+            c = np.linalg.solve(self.qr.R, self.qr.dot(-res))
+            W = self.qr.W
+        return np.dot(W, c) + res
+
+    def updateTimeStepHistory(self, nbFSIIter):
+        """
+        Updates the V and W matrices kept for the next time steps, at the end of the time step.
+        """
+
+        if self.nbTimeToKeep != 0 and self.timeIter >= 1:
+            
+            # --- Trick to avoid breaking down of the simulation in the rare cases when, in the initial time steps, FSI convergence is reached without iterating (e.g. starting from a steady condition and using very small time steps), leading to empty V and W matrices ---
+            if not (self.FSIIter == 1 and self.FSIConv and len(self.storedTimeSteps)==0):
+                
+                self.convergenceReachedInOneIt = False
+                
+                # --- Managing situations where FSI convergence is not reached ---
+                if (self.FSIIter >= nbFSIIter and not self.FSIConv):
+                    mpiPrint('WARNING: IQN-ILS using information from {} previous time steps reached max number of iterations. Next time step is run without using any information from previous time steps!'.format(self.nbTimeToKeep), self.mpiComm)
+                    
+                    self.maxNbOfItReached = True
+                    self.qr.reset()
+                    self.storedTimeSteps = []
+                else:
+                    self.maxNbOfItReached = False
+                    
+                    mpiPrint('\nUpdating V and W matrices...\n', self.mpiComm)
+                    
+                    # --- The columns of this time step are already in V and W, the ones of the oldest time step are removed --- #
+                    self.storedTimeSteps.insert(0, self.timeIter)
+                    
+                    if (self.timeIter > self.nbTimeToKeep and len(self.storedTimeSteps) > self.nbTimeToKeep):
+                        del self.storedTimeSteps[-1]
+                        self.qr.truncate(np.count_nonzero(self.qr.tags >= self.storedTimeSteps[-1]))
+                # --- 
+            else:
+                mpiPrint('\nWARNING: IQN-ILS algorithm convergence reached in one iteration at the beginning of the simulation. V and W matrices cannot be built. BGS will be employed for the next time step!\n', self.mpiComm)
+                self.convergenceReachedInOneIt = True
+            # ---
+
     def fsiCoupling(self):
         """
         Interface Quasi Newton - Inverse Least Square (IQN-ILS) method for strong coupling FSI
@@ -1042,32 +1345,24 @@ class AlgorithmIQN_ILS(AlgorithmBGSAitkenRelax):
         d = self.interfaceInterpolator.getd()
 
         # --- Initialize all the quantities used in the IQN-ILS method --- #
-        res = FlexInterfaceData(ns, 3, self.mpiComm)
+        # (all the vectors have the same size, hence the same distribution, as the solid interface displacement)
+        res = FlexInterfaceData(ns+d, 3, self.mpiComm)
         solidInterfaceResidual0 = FlexInterfaceData(ns+d, 3, self.mpiComm)
 
-        solidInterfaceDisplacement_tilde = FlexInterfaceData(ns, 3, self.mpiComm)
-        solidInterfaceDisplacement_tilde1 = FlexInterfaceData(ns, 3, self.mpiComm)
+        solidInterfaceDisplacement_tilde = FlexInterfaceData(ns+d, 3, self.mpiComm)
+        solidInterfaceDisplacement_tilde1 = FlexInterfaceData(ns+d, 3, self.mpiComm)
 
         delta_ds = FlexInterfaceData(ns+d, 3, self.mpiComm)
 
-        Vk_mat = np.zeros((self.manager.nDim*ns,1))
-        Wk_mat = np.zeros((self.manager.nDim*ns,1))
-
-        delta_ds_loc_X = np.zeros(0)
-        delta_ds_loc_Y = np.zeros(0)
-        delta_ds_loc_Z = np.zeros(0)
-
-        if (self.nbTimeToKeep!=0 and self.timeIter > 1): # If information from previous time steps is re-used then Vk = V, Wk = W
-            Vk = copy.deepcopy(self.V)
-            Wk = copy.deepcopy(self.W)
-        else: # If information from previous time steps is not re-used then Vk and Wk are empty lists of np.array()
-            Vk = []
-            Wk = []
-        
-        nIt = 0
+        if not (self.nbTimeToKeep!=0 and self.timeIter > 1): # If information from previous time steps is not re-used then V and W start empty
+            self.qr.reset()
+            self.storedTimeSteps = []
 
         while ((self.FSIIter < nbFSIIter) and (not self.criterion.isVerified(self.errValue,self.errValue_CHT))):
             mpiPrint("\n>>>> FSI iteration {} <<<<\n".format(self.FSIIter), self.mpiComm)
+            getProfiler().setFSIIteration(self.FSIIter)
+            getProfiler().start('fsiIteration')
+            self.setSolversTolerance()
 
             # --- Solid to fluid mechanical transfer --- #
             self.solidToFluidMechaTransfer()
@@ -1102,20 +1397,18 @@ class AlgorithmIQN_ILS(AlgorithmBGSAitkenRelax):
 
                 # --- Compute and monitor the FSI residual --- #
                 res = self.computeSolidInterfaceResidual()
-                self.errValue = self.criterion.update(res)
+                self.errValue = self.criterion.update(res, self.interfaceInterpolator.solidInterfaceDisplacement)
                 mpiPrint('\nFSI error value : {}\n'.format(self.errValue), self.mpiComm)
                 self.FSIConv = self.criterion.isVerified(self.errValue)
 
                 # --- Initialize d_tilde for the construction of the Wk matrix -- #
                 if self.myid in self.manager.getSolidInterfaceProcessors():
                     localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z = self.SolidSolver.getNodalDisplacements()
-                    for iVertex in range(self.manager.getNumberOfLocalSolidInterfaceNodes()):
-                        iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                        solidInterfaceDisplacement_tilde[iGlobalVertex] = [localSolidInterfaceDisp_X[iVertex], localSolidInterfaceDisp_Y[iVertex], localSolidInterfaceDisp_Z[iVertex]]
+                    solidInterfaceDisplacement_tilde.setRows(self.manager.getLocalGlobalIndices('solid'), np.column_stack((localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z))[:self.manager.getNumberOfLocalSolidInterfaceNodes()])
 
                 solidInterfaceDisplacement_tilde.assemble()
                 
-                if ((self.FSIIter == 0 and (self.nbTimeToKeep == 0 or (self.nbTimeToKeep != 0 and (self.maxNbOfItReached or self.convergenceReachedInOneIt or self.timeIter == 1)))) or self.timeIter < 1): # If information from previous time steps is re-used then this step is only performed at the first iteration of the first time step, otherwise it is performed at the first iteration of every time step
+                if self.isRelaxationStep():
                     # --- Relax the solid position --- #
                     mpiPrint('\nProcessing interface displacements...\n', self.mpiComm)
                     self.relaxSolidPosition()
@@ -1123,72 +1416,22 @@ class AlgorithmIQN_ILS(AlgorithmBGSAitkenRelax):
                     # --- Construct Vk and Wk matrices for the computation of the approximated tangent matrix --- #
                     mpiPrint('\nCorrect solid interface displacements using IQN-ILS method...\n', self.mpiComm)
                     
-                    # --- Start gathering on root process --- #
-                    res_X_Gat, res_Y_Gat, res_Z_Gat = mpiGatherInterfaceData(res, ns+d, self.mpiComm, 0)
-                    res_X_Gat_C = res_X_Gat[:ns] # Copies for operating on, length=ns, not ns+d
-                    res_Y_Gat_C = res_Y_Gat[:ns]
-                    res_Z_Gat_C = res_Z_Gat[:ns]
-                    solidInterfaceResidual0_X_Gat, solidInterfaceResidual0_Y_Gat, solidInterfaceResidual0_Z_Gat = mpiGatherInterfaceData(solidInterfaceResidual0, ns+d, self.mpiComm, 0)
-                    solidInterfaceResidual0_X_Gat_C = solidInterfaceResidual0_X_Gat[:ns] # Copies for operating on, length=ns, not ns+d
-                    solidInterfaceResidual0_Y_Gat_C = solidInterfaceResidual0_Y_Gat[:ns]
-                    solidInterfaceResidual0_Z_Gat_C = solidInterfaceResidual0_Z_Gat[:ns]
-                    solidInterfaceDisplacement_tilde_X_Gat, solidInterfaceDisplacement_tilde_Y_Gat, solidInterfaceDisplacement_tilde_Z_Gat = mpiGatherInterfaceData(solidInterfaceDisplacement_tilde, ns, self.mpiComm, 0)
-                    solidInterfaceDisplacement_tilde1_X_Gat, solidInterfaceDisplacement_tilde1_Y_Gat, solidInterfaceDisplacement_tilde1_Z_Gat = mpiGatherInterfaceData(solidInterfaceDisplacement_tilde1, ns, self.mpiComm, 0)
+                    # --- Local slabs (rows owned by this process) of the IQN-ILS vectors --- #
+                    res_loc = self.getLocalSlab(res)
+                    
+                    if self.FSIIter > 0: # Either information from previous time steps is re-used or not, Vk and Wk matrices are enriched only starting from the second iteration of every FSI loop
+                        delta_res = res_loc - self.getLocalSlab(solidInterfaceResidual0)
+                        delta_d = self.getLocalSlab(solidInterfaceDisplacement_tilde) - self.getLocalSlab(solidInterfaceDisplacement_tilde1)
+                        self.addSecantPair(delta_res, delta_d)
                     
-                    if self.myid == 0:
-                        if self.FSIIter > 0: # Either information from previous time steps is re-used or not, Vk and Wk matrices are enriched only starting from the second iteration of every FSI loop
-                            if self.manager.nDim == 3:
-                                delta_res = np.concatenate([res_X_Gat_C - solidInterfaceResidual0_X_Gat_C, res_Y_Gat_C - solidInterfaceResidual0_Y_Gat_C, res_Z_Gat_C - solidInterfaceResidual0_Z_Gat_C], axis=0)
-                                delta_d = np.concatenate([solidInterfaceDisplacement_tilde_X_Gat - solidInterfaceDisplacement_tilde1_X_Gat, solidInterfaceDisplacement_tilde_Y_Gat - solidInterfaceDisplacement_tilde1_Y_Gat, solidInterfaceDisplacement_tilde_Z_Gat - solidInterfaceDisplacement_tilde1_Z_Gat], axis = 0)
-                            else:
-                                delta_res = np.concatenate([res_X_Gat_C - solidInterfaceResidual0_X_Gat_C, res_Y_Gat_C - solidInterfaceResidual0_Y_Gat_C], axis=0)
-                                delta_d = np.concatenate([solidInterfaceDisplacement_tilde_X_Gat - solidInterfaceDisplacement_tilde1_X_Gat, solidInterfaceDisplacement_tilde_Y_Gat - solidInterfaceDisplacement_tilde1_Y_Gat], axis = 0)
-                            
-                            Vk.insert(0, delta_res)
-                            Wk.insert(0, delta_d)
-                            
-                            nIt+=1
-                        
-                        Vk_mat = np.vstack(Vk).T
-                        Wk_mat = np.vstack(Wk).T
-                        
-                        if (Vk_mat.shape[1] > self.manager.nDim*ns and self.qrFilter == 'Degroote1'): # Remove extra columns if number of iterations (i.e. columns of Vk and Wk) is larger than number of interface degrees of freedom 
-                            mpiPrint('WARNING: IQN-ILS Algorithm using \'Degroote1\' QR filter. Approximated stiffness matrix number of columns exceeds the number of degrees of freedom at FSI interface. Extra columns (the oldest ones!) are deleted for next iterations to avoid overdetermined problem!', self.mpiComm)
-                            Vk_mat = np.delete(Vk_mat, np.s_[(self.manager.nDim*ns-Vk_mat.shape[1]):], 1)
-                            Wk_mat = np.delete(Wk_mat, np.s_[(self.manager.nDim*ns-Wk_mat.shape[1]):], 1)
-                        
-                        dummy_V = Vk_mat.copy()
-                        dummy_W = Wk_mat.copy()
-                        
-                        if self.manager.nDim == 3:
-                            dummy_Res = np.concatenate([res_X_Gat_C, res_Y_Gat_C, res_Z_Gat_C], axis=0)
-                        else:
-                            dummy_Res = np.concatenate([res_X_Gat_C, res_Y_Gat_C], axis=0)
-                        
-                        if self.useQR: # Technique described by Degroote et al.
-                            c, dummy_W = self.qrSolve(dummy_V, dummy_W, dummy_Res)
-                        else:
-                            c = np.linalg.lstsq(dummy_V, -dummy_Res)[0] # Classical QR decomposition: NOT RECOMMENDED!
-                        
-                        if self.manager.nDim == 3:
-                            delta_ds_loc = np.split((np.dot(dummy_W,c).T + np.concatenate([res_X_Gat_C, res_Y_Gat_C, res_Z_Gat_C], axis=0)),3,axis=0)
-                            
-                            delta_ds_loc_X = delta_ds_loc[0]
-                            delta_ds_loc_Y = delta_ds_loc[1]
-                            delta_ds_loc_Z = delta_ds_loc[2]
-                        else:
-                            delta_ds_loc = np.split((np.dot(dummy_W,c).T + np.concatenate([res_X_Gat_C, res_Y_Gat_C], axis=0)),2,axis=0)
-                            
-                            delta_ds_loc_X = delta_ds_loc[0]
-                            delta_ds_loc_Y = delta_ds_loc[1]
-                            delta_ds_loc_Z = np.zeros(ns)
-                        
-                        for iVertex in range(delta_ds_loc_X.shape[0]):
-                            iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                            delta_ds[iGlobalVertex] = [delta_ds_loc_X[iVertex], delta_ds_loc_Y[iVertex], delta_ds_loc_Z[iVertex]]
+                    if (self.qr.getNumberOfColumns() > self.manager.nDim*ns and self.qrFilter == 'Degroote1'): # Remove extra columns if number of iterations (i.e. columns of Vk and Wk) is larger than number of interface degrees of freedom 
+                        mpiPrint('WARNING: IQN-ILS Algorithm using \'Degroote1\' QR filter. Approximated stiffness matrix number of columns exceeds the number of degrees of freedom at FSI interface. Extra columns (the oldest ones!) are deleted for next iterations to avoid overdetermined problem!', self.mpiComm)
+                        self.qr.truncate(self.manager.nDim*ns)
                     
-                    # --- Go back to parallel run --- #
-                    mpiBarrier(self.mpiComm)
+                    # --- The correction is computed and applied locally --- #
+                    getProfiler().start('leastSquares')
+                    self.setLocalSlab(delta_ds, self.computeCorrection(res_loc))
+                    getProfiler().stop('leastSquares')
                     delta_ds.assemble()
                     self.interfaceInterpolator.solidInterfaceDisplacement += delta_ds
                 
@@ -1203,46 +1446,298 @@ class AlgorithmIQN_ILS(AlgorithmBGSAitkenRelax):
             if self.writeInFSIloop == True:
                 self.writeRealTimeData()
             
+            getProfiler().stop('fsiIteration')
             self.FSIIter += 1
         
         # if comm.myself == rootProcess
         
-        # update of the matrices V and W at the end of the while
-        if self.nbTimeToKeep != 0 and self.timeIter >= 1:
-            
-            # --- Trick to avoid breaking down of the simulation in the rare cases when, in the initial time steps, FSI convergence is reached without iterating (e.g. starting from a steady condition and using very small time steps), leading to empty V and W matrices ---
-            if not (self.FSIIter == 1 and self.FSIConv and len(self.V)==0):
-                
-                self.convergenceReachedInOneIt = False
-                
-                # --- Managing situations where FSI convergence is not reached ---
-                if (self.FSIIter >= nbFSIIter and not self.FSIConv):
-                    mpiPrint('WARNING: IQN-ILS using information from {} previous time steps reached max number of iterations. Next time step is run without using any information from previous time steps!'.format(self.nbTimeToKeep), self.mpiComm)
-                    
-                    self.maxNbOfItReached = True
-                    self.V = []
-                    self.W = []
-                else:
-                    self.maxNbOfItReached = False
-                    
-                    mpiPrint('\nUpdating V and W matrices...\n', self.mpiComm)
-                    
-                    self.V.insert(0, Vk_mat[:,0:nIt].T)
-                    self.W.insert(0, Wk_mat[:,0:nIt].T)
-                    
-                    if (self.timeIter > self.nbTimeToKeep and len(self.V) > self.nbTimeToKeep):
-                        del self.V[-1]
-                        del self.W[-1]
-                # --- 
-            else:
-                mpiPrint('\nWARNING: IQN-ILS algorithm convergence reached in one iteration at the beginning of the simulation. V and W matrices cannot be built. BGS will be employed for the next time step!\n', self.mpiComm)
-                self.convergenceReachedInOneIt = True
-            # ---
-            
+        # --- Update of the information kept for the next time steps --- #
+        self.updateTimeStepHistory(nbFSIIter)
+
         # --- Update the FSI history file --- #
         if self.timeIter > self.timeIterTreshold:
             mpiPrint('\n*************** IQN-ILS is converged ***************', self.mpiComm)
 
+class AlgorithmIQN_MVJ(AlgorithmIQN_ILS):
+    """
+    Interface Quasi Newton - Inverse Multi-Vector Jacobian (IQN-IMVJ) method for strong coupling FSI.
+    The inverse Jacobian approximation is carried from one time step to the next in the low-rank form J_prev = -I + A*B^T (A and B distributed as V and W).
+    Restart variants : 'SVD', A*B^T is truncated to rank maxRank (and its singular values lower than svdTol times the largest one are removed),
+    'zero', J_prev is reset to -I every restartInterval time steps.
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, InterfaceInterpolator, Criterion, nbFSIIterMax, deltaT, totTime, timeIterTreshold=-1, omegaBoundList= [1.0, 1.0], restartType='SVD', maxRank=100, svdTol=1.0e-4, restartInterval=8, computeTangentMatrixBasedOnFirstIt = False, mpiComm=None):
+        """
+        Des.
+        """
+
+        AlgorithmIQN_ILS.__init__(self, Manager, FluidSolver, SolidSolver, InterfaceInterpolator, Criterion, nbFSIIterMax, deltaT, totTime, timeIterTreshold, omegaBoundList, 0, computeTangentMatrixBasedOnFirstIt, mpiComm)
+
+        if restartType not in ['SVD', 'zero']:
+            raise NameError('IQN-MVJ Algorithm: the restart type {} is unknown (avail: "SVD" or "zero")!'.format(restartType))
+        self.restartType = restartType
+        self.maxRank = maxRank
+        self.svdTol = svdTol
+        self.restartInterval = restartInterval
+
+        # --- Low-rank part of the inverse Jacobian approximation of the previous time steps --- #
+        self.A = None
+        self.B = None
+        self.nbTimeSinceRestart = 0
+
+    def getState(self):
+        """
+        Des.
+        """
+
+        state = AlgorithmIQN_ILS.getState(self)
+        state.update({'A': copyOrNone(self.A), 'B': copyOrNone(self.B), 'nbTimeSinceRestart': self.nbTimeSinceRestart})
+        return state
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        AlgorithmIQN_ILS.setState(self, state)
+        self.A = state['A']
+        self.B = state['B']
+        self.nbTimeSinceRestart = state['nbTimeSinceRestart']
+
+    def getJacobianRank(self):
+        """
+        Des.
+        """
+
+        if self.A is None:
+            return 0
+        else:
+            return self.A.shape[1]
+
+    def applyPreviousJacobian(self, X):
+        """
+        Returns J_prev*X = -X + A*(B^T*X), X being a local slab (or a set of slabs as columns). Collective call.
+        """
+
+        JX = -X
+        if self.A is not None:
+            JX = JX + self.A.dot(mpiAllReduceArray(self.mpiComm, self.B.T.dot(X)))
+        return JX
+
+    def isRelaxationStep(self):
+        """
+        The solid position is relaxed only if no inverse Jacobian approximation is available yet.
+        """
+
+        return (self.FSIIter == 0 and self.getJacobianRank() == 0) or self.timeIter < 1
+
+    def computeCorrection(self, res):
+        """
+        Returns the local slab of the correction -J*res, with J = J_prev + (W - V - J_prev*V)*V^+ (collective call).
+        """
+
+        delta = -self.applyPreviousJacobian(res)
+        if self.qr.getNumberOfColumns() > 0:
+            if self.useQR:
+                c, W = self.qrSolve(res)
+            else:
+                c = np.linalg.solve(self.qr.R, self.qr.dot(-res))
+            # c = -V^+*res, with the (possibly filtered) V and W
+            delta += (self.qr.W - self.qr.V - self.applyPreviousJacobian(self.qr.V)).dot(c)
+        return delta
+
+    def orthogonalize(self, X):
+        """
+        Returns Q, R with X = Q*R, Q having orthonormal columns (distributed) and R being small (rank-revealing, computed from the Gram matrix of X).
+        """
+
+        eigenValues, eigenVectors = np.linalg.eigh(mpiAllReduceArray(self.mpiComm, X.T.dot(X)))
+        keep = eigenValues > 1e-14*max(eigenValues.max(), 0.0)
+        sqrtValues = np.sqrt(eigenValues[keep])
+        return X.dot(eigenVectors[:,keep]/sqrtValues), (eigenVectors[:,keep]*sqrtValues).T
+
+    def compressJacobian(self):
+        """
+        Truncated SVD of A*B^T.
+        """
+
+        QA, RA = self.orthogonalize(self.A)
+        QB, RB = self.orthogonalize(self.B)
+        U, S, VT = np.linalg.svd(RA.dot(RB.T))
+        rank = min(self.maxRank, np.count_nonzero(S > self.svdTol*S[0])) if S.size > 0 else 0
+        if rank == 0:
+            self.A = None
+            self.B = None
+        else:
+            self.A = QA.dot(U[:,:rank]*S[:rank])
+            self.B = QB.dot(VT[:rank].T)
+
+    def updateTimeStepHistory(self, nbFSIIter):
+        """
+        Adds the information of the time step to the inverse Jacobian approximation: J_prev = J_prev + (W - V - J_prev*V)*V^+ with V^+ = R^-1*Q^T.
+        """
+
+        if self.timeIter < 1 or self.qr.getNumberOfColumns() == 0:
+            return
+
+        mpiPrint('\nUpdating the inverse Jacobian approximation...\n', self.mpiComm)
+        # --- R must be invertible: the (almost) linearly dependent columns kept by 'Degroote1' (or without QR filtering) are removed first --- #
+        if self.useQR and self.qrFilter in ['Degroote2', 'Haelterman']:
+            self.qr.filter(self.qrFilter, self.tollQR)
+        else:
+            self.qr.filter('Degroote2', self.tollQR)
+        if self.qr.getNumberOfColumns() == 0:
+            return
+        U = self.qr.W - self.qr.V - self.applyPreviousJacobian(self.qr.V)
+        Z = sp.linalg.solve_triangular(self.qr.R, self.qr.Q.T).T
+        if self.A is None:
+            self.A, self.B = U, Z
+        else:
+            self.A = np.column_stack((self.A, U))
+            self.B = np.column_stack((self.B, Z))
+        self.nbTimeSinceRestart += 1
+
+        if self.restartType == 'SVD' and self.getJacobianRank() > self.maxRank:
+            self.compressJacobian()
+            mpiPrint('Inverse Jacobian approximation truncated to rank {}'.format(self.getJacobianRank()), self.mpiComm)
+        elif self.restartType == 'zero' and self.nbTimeSinceRestart >= self.restartInterval:
+            self.A = None
+            self.B = None
+            self.nbTimeSinceRestart = 0
+            mpiPrint('Inverse Jacobian approximation reset', self.mpiComm)
+
+class AlgorithmAnderson(AlgorithmIQN_ILS):
+    """
+    Anderson acceleration (type II multisecant method) for strong coupling FSI, using the last depth iterations of the time step:
+    x_k+1 = x_k + damping*r_k - (dX + damping*dR)*gamma, with gamma minimizing |r_k - dR*gamma| (normal equations, one Allreduce per iteration).
+    The differences of the residual and of the solid solver output are kept in preallocated ring buffers (local slabs).
+    History variants : 'window', the oldest pair is overwritten when the buffers are full, 'restart', the buffers are emptied when they are full.
+    Safeguards : the oldest iterations are dropped as long as the linear system is too ill-conditioned and,
+    if safeguardFactor is given, the history is emptied (damped fixed-point step) if the residual norm grows by more than safeguardFactor in one iteration.
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, InterfaceInterpolator, Criterion, nbFSIIterMax, deltaT, totTime, timeIterTreshold=-1, omegaBoundList= [1.0, 1.0], depth=5, damping=1.0, restartType='window', safeguardFactor=None, mpiComm=None):
+        """
+        Des.
+        """
+
+        AlgorithmIQN_ILS.__init__(self, Manager, FluidSolver, SolidSolver, InterfaceInterpolator, Criterion, nbFSIIterMax, deltaT, totTime, timeIterTreshold, omegaBoundList, 0, False, mpiComm)
+
+        if restartType not in ['window', 'restart']:
+            raise NameError('{} Algorithm: the restart type {} is unknown (avail: "window" or "restart")!'.format(self.getName(), restartType))
+        self.depth = depth
+        self.damping = damping
+        self.restartType = restartType
+        self.safeguardFactor = safeguardFactor
+        self.maxConditionNumber = 1.0e10
+
+        # --- Residual and solid solver output differences (newest first), res_k - res_k-1 and d_tilde_k - d_tilde_k-1 --- #
+        self.deltaRes = RingBuffer(depth)
+        self.deltaD = RingBuffer(depth)
+        self.resNormkM1 = None
+
+    def getName(self):
+        """
+        Des.
+        """
+
+        return 'Anderson'
+
+    def resetHistory(self):
+        """
+        Des.
+        """
+
+        self.deltaRes.reset()
+        self.deltaD.reset()
+
+    def addSecantPair(self, delta_res, delta_d):
+        """
+        Des.
+        """
+
+        if self.restartType == 'restart' and self.deltaRes.getSize() == self.depth:
+            mpiPrint('{} history is full, restart.'.format(self.getName()), self.mpiComm)
+            self.resetHistory()
+        self.deltaRes.push(delta_res)
+        self.deltaD.push(delta_d)
+
+    def getProjection(self, dX, dR):
+        """
+        Returns the matrix Y (as rows) of the projected system Y^T*dR*gamma = Y^T*res (Y = dR: least-squares problem).
+        """
+
+        return dR
+
+    def computeCorrection(self, res):
+        """
+        Returns the local slab of the correction of the solid interface displacement (collective call).
+        """
+
+        m = self.deltaRes.getSize()
+        if m > 0:
+            dR = self.deltaRes.getStored()
+            dX = self.deltaD.getStored() - dR
+            Y = self.getProjection(dX, dR)
+            localProducts = np.concatenate((Y.dot(dR.T).ravel(), Y.dot(res), [np.dot(res, res)]))
+        else:
+            localProducts = np.array([np.dot(res, res)])
+        products = mpiAllReduceArray(self.mpiComm, localProducts)
+
+        # --- Safeguards --- #
+        resNorm = np.sqrt(products[-1])
+        if m > 0 and self.safeguardFactor != None and self.resNormkM1 != None and resNorm > self.safeguardFactor*self.resNormkM1:
+            mpiPrint('{} safeguard: the residual has increased, restart.'.format(self.getName()), self.mpiComm)
+            m = 0
+        self.resNormkM1 = resNorm
+        if m == 0:
+            self.resetHistory()
+            return self.damping*res
+
+        # --- The oldest iterations are dropped as long as the system is too ill-conditioned --- #
+        M = products[:m*m].reshape(m, m)
+        rhs = products[m*m:m*m+m]
+        keep = np.argsort(self.deltaRes.getAges())
+        while keep.size > 0 and np.linalg.cond(M[np.ix_(keep, keep)]) > self.maxConditionNumber:
+            keep = keep[:-1]
+        if keep.size < m:
+            mpiPrint('{} safeguard: ill-conditioned system, {} oldest iteration(s) dropped.'.format(self.getName(), m-keep.size), self.mpiComm)
+            self.deltaRes.truncate(keep.size)
+            self.deltaD.truncate(keep.size)
+            if keep.size == 0:
+                return self.damping*res
+
+        gamma = np.linalg.solve(M[np.ix_(keep, keep)], rhs[keep])
+        return self.damping*res - (dX[keep] + self.damping*dR[keep]).T.dot(gamma)
+
+    def updateTimeStepHistory(self, nbFSIIter):
+        """
+        The history is not kept from one time step to the next.
+        """
+
+        self.resetHistory()
+        self.resNormkM1 = None
+
+class AlgorithmIQN_GB(AlgorithmAnderson):
+    """
+    Generalized Broyden (type I multisecant) method for strong coupling FSI: same update and history as AlgorithmAnderson,
+    gamma being the solution of dX^T*dR*gamma = dX^T*r_k (the inverse Jacobian approximation satisfies the secant equations of the last depth iterations).
+    """
+
+    def getName(self):
+        """
+        Des.
+        """
+
+        return 'IQN-GB'
+
+    def getProjection(self, dX, dR):
+        """
+        Des.
+        """
+
+        return dX
+
 # --- Solid test algorithm ---
 class FsiSolidTestAlgorithm:
     def __init__(self, _solid):
@@ -0,0 +1,164 @@
+#! /usr/bin/env python
+# -*- coding: utf8 -*-
+
+'''
+
+Copyright 2018 University of Liège
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+checkpoint.py
+Checkpoint and restart of the coupling state.
+Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
+
+'''
+
+# ----------------------------------------------------------------------
+#  Imports
+# ----------------------------------------------------------------------
+
+import numpy as np
+import os
+import pickle
+
+from utilities import *
+
+# ----------------------------------------------------------------------
+#  Checkpointer class
+# ----------------------------------------------------------------------
+
+class Checkpointer(object):
+    """
+    Writes and reads the coupling state of each process in its own file (path/checkpoint_<rank>.pkl).
+    The state is a dictionary of scalars and numpy arrays (local rows of the interface data), copied by the caller,
+    so that it is written by a worker thread while the computation goes on. A file is only replaced once it is completely written.
+    """
+
+    def __init__(self, mpiComm=None):
+        """
+        Des.
+        """
+
+        self.mpiComm = mpiComm
+        if mpiComm != None:
+            self.myid = mpiComm.Get_rank()
+            self.mpiSize = mpiComm.Get_size()
+        else:
+            self.myid = 0
+            self.mpiSize = 1
+        self.task = None
+
+    def getFileName(self, path):
+        """
+        Des.
+        """
+
+        return os.path.join(path, 'checkpoint_{:05d}.pkl'.format(self.myid))
+
+    def checkAll(self, error):
+        """
+        Raises an exception on all the processes if error (message, or None) is given on any of them (collective call).
+        """
+
+        nErrors = mpiAllReduce(self.mpiComm, 0 if error is None else 1)
+        if error != None:
+            raise Exception(error)
+        if nErrors > 0:
+            raise Exception('Checkpoint error on {} process(es), see their message!'.format(nErrors))
+
+    def write(self, path, state):
+        """
+        Starts the writing of state (collective call, the previous writing is completed first).
+        """
+
+        error = None
+        try:
+            self.wait()
+            if self.myid == 0 and not os.path.isdir(path):
+                os.makedirs(path)
+        except Exception as e:
+            error = 'The writing of the checkpoint failed: {}'.format(e)
+        # --- Also synchronizes the processes, so that the directory exists --- #
+        self.checkAll(error)
+        self.task = AsyncTask(dumpState, self.getFileName(path), state)
+
+    def wait(self):
+        """
+        Waits for the end of the current writing (and raises its exception, if any). Local call.
+        """
+
+        if self.task != None:
+            task = self.task
+            self.task = None
+            task.wait()
+
+    def read(self, path):
+        """
+        Returns the state written in path by this process (collective call).
+        The checkpoint must come from a computation with the same number of processes, and the same time step on all of them.
+        """
+
+        error = None
+        state = None
+        fileName = self.getFileName(path)
+        try:
+            self.wait()
+            if not os.path.isfile(fileName):
+                raise Exception('Checkpoint file {} not found!'.format(fileName))
+            with open(fileName, 'rb') as stateFile:
+                state = pickle.load(stateFile)
+            if state['mpiSize'] != self.mpiSize:
+                raise Exception('The checkpoint {} was written by {} processes ({} in this computation)!'.format(path, state['mpiSize'], self.mpiSize))
+        except Exception as e:
+            error = str(e)
+        self.checkAll(error)
+
+        # --- max(timeIter) and -min(timeIter) in one reduction --- #
+        maxTimeIter, minusMinTimeIter = mpiAllReduceArray(self.mpiComm, np.array([state['timeIter'], -state['timeIter']]), op='max')
+        if maxTimeIter != -minusMinTimeIter:
+            raise Exception('The checkpoint {} does not contain the same time step for all the processes (from {} to {})!'.format(path, int(-minusMinTimeIter), int(maxTimeIter)))
+        return state
+
+# ----------------------------------------------------------------------
+#  Functions
+# ----------------------------------------------------------------------
+
+def dumpState(fileName, state):
+    """
+    Des.
+    """
+
+    tmpFileName = fileName + '.tmp'
+    with open(tmpFileName, 'wb') as stateFile:
+        pickle.dump(state, stateFile, pickle.HIGHEST_PROTOCOL)
+    os.rename(tmpFileName, fileName)
+
+def getInterfaceDataState(interfData):
+    """
+    Returns a copy of the local rows of interfData (None if interfData is None).
+    """
+
+    if interfData is None:
+        return None
+    with interfData.localView() as view:
+        return view.copy()
+
+def setInterfaceDataState(interfData, array):
+    """
+    Restores the local rows of interfData (nothing is done if interfData or array is None).
+    """
+
+    if interfData is None or array is None:
+        return
+    with interfData.localView() as view:
+        view[:] = array
@@ -28,6 +28,9 @@ Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
 # ----------------------------------------------------------------------
 
 from math import *
+import numpy as np
+
+from utilities import *
 
 # ----------------------------------------------------------------------
 #    Criterion class
@@ -67,9 +70,74 @@ class Criterion:
         else:
             return True
 
+    def updateTimeStep(self, displacement):
+        """
+        Called at the end of each time step with the converged interface displacement.
+        """
+
+        pass
+
+    def getState(self):
+        """
+        Des.
+        """
+
+        return {}
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        pass
+
+    def squaredNorms(self, res, displacement=None, reference=None):
+        """
+        Returns the squared norms of the components of res (and of displacement+res-reference if displacement is given,
+        reference being a local array or None for zero).
+        The local sums are computed in one pass over the owned rows and reduced with a single Allreduce over the communicator of res.
+        """
+
+        with res.localView() as resView:
+            if displacement is None:
+                localSums = np.sum(resView**2, axis=0)
+            else:
+                with displacement.localView() as dispView:
+                    increment = dispView + resView
+                    if reference is not None:
+                        increment -= reference
+                    localSums = np.concatenate((np.sum(resView**2, axis=0), np.sum(increment**2, axis=0)))
+        return mpiAllReduceArray(res.mpiComm, localSums)
+
+    def maxNorms(self, res):
+        """
+        Returns the max norms of the components of res (single Allreduce).
+        """
+
+        with res.localView() as resView:
+            if resView.shape[0] > 0:
+                localMax = np.max(np.abs(resView), axis=0)
+            else:
+                localMax = np.zeros(resView.shape[1])
+        return mpiAllReduceArray(res.mpiComm, localMax, op='max')
+
+    def updateThermal(self, resThermal):
+        """
+        Des.
+        """
+
+        if resThermal != None:
+            norm = sqrt(np.sum(self.squaredNorms(resThermal)))
+        else:
+            norm = 1.0
+
+        self.epsilonThermal = norm
+
+        return self.epsilonThermal
+
 class DispNormCriterion(Criterion):
     """
-    Description.
+    Absolute criterion on the L2 norm of the displacement residual.
     """
 
     def __init__(self, tolerance, thermalTolerance = 1e12):
@@ -79,36 +147,112 @@ class DispNormCriterion(Criterion):
 
         Criterion.__init__(self, tolerance, thermalTolerance)
 
-    def update(self, res):
+    def update(self, res, displacement=None):
+        """
+        Des.
+        """
+
+        self.epsilon = sqrt(np.sum(self.squaredNorms(res)))
+
+        return self.epsilon
+
+class RelativeDispNormCriterion(Criterion):
+    """
+    Criterion on the L2 norm of the displacement residual, normalized by the norm of the displacement increment over the time step
+    (difference between the new interface displacement, given by the solid solver, and the one converged at the previous time step).
+    For steady computations, the increment is taken with respect to the initial configuration.
+    Falls back to the absolute norm while this increment is smaller than minReference.
+    """
+
+    def __init__(self, tolerance, thermalTolerance = 1e12, minReference = 1e-12):
+        """
+        Description.
+        """
+
+        Criterion.__init__(self, tolerance, thermalTolerance)
+        self.minReference = minReference
+        self.previousDisplacement = None
+
+    def updateTimeStep(self, displacement):
+        """
+        Stores the local rows of the converged interface displacement, reference of the next time step.
+        """
+
+        with displacement.localView() as dispView:
+            self.previousDisplacement = dispView.copy()
+
+    def getState(self):
+        """
+        Des.
+        """
+
+        return {'previousDisplacement': copyOrNone(self.previousDisplacement)}
+
+    def setState(self, state):
         """
         Des.
         """
 
-        normX, normY, normZ = res.norm()
+        self.previousDisplacement = state['previousDisplacement']
 
-        norm = sqrt(normX**2 + normY**2 + normZ**2)
+    def update(self, res, displacement=None):
+        """
+        displacement is the interface displacement the residual has been computed from (input of the solid solver).
+        """
+
+        if displacement is None:
+            raise Exception('The relative criterion needs the interface displacement!')
 
-        self.epsilon = norm
+        squaredNorms = self.squaredNorms(res, displacement, self.previousDisplacement)
+        nDim = len(squaredNorms)//2
+        norm = sqrt(np.sum(squaredNorms[:nDim]))
+        reference = sqrt(np.sum(squaredNorms[nDim:]))
+
+        self.epsilon = norm/reference if reference > self.minReference else norm
 
         return self.epsilon
 
-    def updateThermal(self, resThermal):
+class MaxNormCriterion(Criterion):
+    """
+    Absolute criterion on the max norm of the displacement residual (largest nodal displacement error).
+    """
+
+    def __init__(self, tolerance, thermalTolerance = 1e12):
+        """
+        Description.
+        """
+
+        Criterion.__init__(self, tolerance, thermalTolerance)
+
+    def update(self, res, displacement=None):
         """
         Des.
         """
 
-        if resThermal != None:
-            #normX, normY, normZ = resHeatFlux.norm()
-            normList = resThermal.norm()
-            normSquare = 0.0
-            for ii in range(len(normList)):
-                normSquare += normList[ii]**2
-
-            #norm = sqrt(normX**2 + normY**2 + normZ**2)
-            norm = sqrt(normSquare)
-        else:
-            norm = 1.0
+        self.epsilon = float(np.max(self.maxNorms(res)))
 
-        self.epsilonThermal = norm
+        return self.epsilon
 
-        return self.epsilonThermal
+class ComponentDispNormCriterion(Criterion):
+    """
+    Criterion on each component of the displacement residual: epsilon is the largest L2 norm of a component multiplied by its weight,
+    so that every weighted component has to be lower than the tolerance.
+    """
+
+    def __init__(self, tolerance, weights = (1.0, 1.0, 1.0), thermalTolerance = 1e12):
+        """
+        Description.
+        """
+
+        Criterion.__init__(self, tolerance, thermalTolerance)
+        self.weights = np.array(weights, dtype=float)
+
+    def update(self, res, displacement=None):
+        """
+        Des.
+        """
+
+        norms = np.sqrt(self.squaredNorms(res))
+        self.epsilon = float(np.max(self.weights[:len(norms)]*norms))
+
+        return self.epsilon
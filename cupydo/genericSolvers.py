@@ -71,6 +71,12 @@ class SolidSolver:
     def run(self):
         return
 
+    def setToleranceFactor(self, factor):
+        """
+        Inexact coupling: the next runs may be solved to the nominal tolerance of the solver multiplied by factor (>= 1).
+        """
+        return
+
     def __setCurrentState(self):
         return
 
@@ -199,6 +205,12 @@ class FluidSolver:
     def run(self, t1, t2):
         return
 
+    def setToleranceFactor(self, factor):
+        """
+        Inexact coupling: the next runs may be solved to the nominal tolerance of the solver multiplied by factor (>= 1).
+        """
+        return
+
     def getNodalIndex(self, iVertex):
         return
 
@@ -0,0 +1,217 @@
+#! /usr/bin/env python
+# -*- coding: utf8 -*-
+
+'''
+
+Copyright 2018 University of Liège
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+history.py
+Buffered writers of the coupling and solver histories.
+Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
+
+'''
+
+# ----------------------------------------------------------------------
+#  Imports
+# ----------------------------------------------------------------------
+
+import numpy as np
+import os
+import io
+import zipfile
+import atexit
+
+# global vars (underscore prevent them to be imported with "from module import *")
+_historyFormat = 'ascii'
+_historyFlushInterval = 10
+_theWriters = []
+
+# ----------------------------------------------------------------------
+#  HistoryWriter class
+# ----------------------------------------------------------------------
+
+class HistoryWriter(object):
+    """
+    History file with a fixed schema (list of (name, format) columns, e.g. ('Time', '12.6f')).
+    The rows are buffered in memory and written every flushInterval rows, at the end of the computation and at exit,
+    to the legacy ascii file, to an npz file (one array per flush) or to a chunked HDF5 file (dataset 'history').
+    """
+
+    def __init__(self, fileName, columns, fileFormat=None, flushInterval=None):
+        """
+        fileName is the name of the legacy ascii file (its extension is replaced by .npz or .h5 for binary formats).
+        fileFormat and flushInterval default to the values given to setHistoryOptions().
+        """
+
+        self.names = [name for name, fmt in columns]
+        self.formats = [fmt for name, fmt in columns]
+        self.fileFormat = fileFormat if fileFormat != None else _historyFormat
+        self.flushInterval = max(int(flushInterval if flushInterval != None else _historyFlushInterval), 1)
+
+        if self.fileFormat == 'ascii':
+            self.fileName = fileName
+        elif self.fileFormat == 'npz':
+            self.fileName = os.path.splitext(fileName)[0] + '.npz'
+        elif self.fileFormat == 'h5':
+            self.fileName = os.path.splitext(fileName)[0] + '.h5'
+        else:
+            raise Exception('History format {} not available! (avail: "ascii", "npz" or "h5")'.format(self.fileFormat))
+
+        self.buffer = []
+        self.nChunks = 0
+        self.__create()
+        _theWriters.append(self)
+
+    def __create(self):
+        """
+        Creates (or truncates) the file and writes the schema.
+        """
+
+        if self.fileFormat == 'ascii':
+            with open(self.fileName, 'w') as histFile:
+                histFile.write(formatHeader(self.names))
+        elif self.fileFormat == 'npz':
+            np.savez(self.fileName, names=np.array(self.names), formats=np.array(self.formats))
+        else:
+            import h5py
+            with h5py.File(self.fileName, 'w') as histFile:
+                nCols = len(self.names)
+                dataset = histFile.create_dataset('history', shape=(0, nCols), maxshape=(None, nCols), chunks=(self.flushInterval, nCols), dtype=float)
+                dataset.attrs['names'] = np.array(self.names, dtype='S')
+                dataset.attrs['formats'] = np.array(self.formats, dtype='S')
+
+    def append(self, *values):
+        """
+        Appends a row (one value per column).
+        """
+
+        if len(values) != len(self.names):
+            raise Exception('History {} expects {} values, {} given!'.format(self.fileName, len(self.names), len(values)))
+        self.buffer.append(values)
+        if len(self.buffer) >= self.flushInterval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows (one file opening).
+        """
+
+        if not self.buffer:
+            return
+
+        if self.fileFormat == 'ascii':
+            with open(self.fileName, 'a') as histFile:
+                histFile.write(''.join([formatRow(row, self.formats) for row in self.buffer]))
+        else:
+            rows = np.array(self.buffer, dtype=float)
+            if self.fileFormat == 'npz':
+                arrayBuffer = io.BytesIO()
+                np.lib.format.write_array(arrayBuffer, rows)
+                with zipfile.ZipFile(self.fileName, 'a') as histFile:
+                    histFile.writestr('chunk_{:06d}.npy'.format(self.nChunks), arrayBuffer.getvalue())
+            else:
+                import h5py
+                with h5py.File(self.fileName, 'a') as histFile:
+                    dataset = histFile['history']
+                    nRows = dataset.shape[0]
+                    dataset.resize(nRows + rows.shape[0], axis=0)
+                    dataset[nRows:] = rows
+        self.nChunks += 1
+        self.buffer = []
+
+    def close(self):
+        """
+        Des.
+        """
+
+        self.flush()
+        if self in _theWriters:
+            _theWriters.remove(self)
+
+# ----------------------------------------------------------------------
+#  Functions
+# ----------------------------------------------------------------------
+
+def formatHeader(names):
+    """
+    Header line of the legacy ascii files.
+    """
+
+    return '   '.join(['{:>12s}'.format(name) for name in names]) + '\n'
+
+def formatRow(row, formats):
+    """
+    Row of the legacy ascii files (integer columns have a 'd' format).
+    """
+
+    return '   '.join([('{:' + fmt + '}').format(int(value) if fmt.endswith('d') else value) for value, fmt in zip(row, formats)]) + '\n'
+
+def setHistoryOptions(fileFormat='ascii', flushInterval=10):
+    """
+    Sets the format ('ascii', 'npz' or 'h5') and the flush interval (number of rows) of the writers created afterwards.
+    """
+
+    global _historyFormat, _historyFlushInterval
+    _historyFormat = fileFormat
+    _historyFlushInterval = flushInterval
+
+def flushHistoryWriters():
+    """
+    Flushes all the writers of the process.
+    """
+
+    for writer in _theWriters:
+        writer.flush()
+
+def readHistory(fileName):
+    """
+    Returns the names, the formats and the (nRows x nCols) array of a binary (npz or h5) history file.
+    """
+
+    if os.path.splitext(fileName)[1] == '.h5':
+        import h5py
+        with h5py.File(fileName, 'r') as histFile:
+            dataset = histFile['history']
+            names = [str(name.decode() if isinstance(name, bytes) else name) for name in dataset.attrs['names']]
+            formats = [str(fmt.decode() if isinstance(fmt, bytes) else fmt) for fmt in dataset.attrs['formats']]
+            data = dataset[:]
+    else:
+        histFile = np.load(fileName)
+        try:
+            names = [str(name) for name in histFile['names']]
+            formats = [str(fmt) for fmt in histFile['formats']]
+            chunks = sorted([key for key in histFile.files if key.startswith('chunk_')])
+            if chunks:
+                data = np.concatenate([histFile[key] for key in chunks])
+            else:
+                data = np.zeros((0, len(names)))
+        finally:
+            histFile.close()
+    return names, formats, data
+
+def convertToAscii(fileName, asciiFileName=None):
+    """
+    Converts a binary history file to the legacy ascii format (same name with the .ascii extension by default).
+    """
+
+    names, formats, data = readHistory(fileName)
+    if asciiFileName == None:
+        asciiFileName = os.path.splitext(fileName)[0] + '.ascii'
+    with open(asciiFileName, 'w') as asciiFile:
+        asciiFile.write(formatHeader(names))
+        asciiFile.write(''.join([formatRow(row, formats) for row in data]))
+    return asciiFileName
+
+atexit.register(flushHistoryWriters)
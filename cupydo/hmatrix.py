@@ -0,0 +1,288 @@
+#! /usr/bin/env python
+# -*- coding: utf8 -*-
+
+'''
+
+Copyright 2018 University of Liège
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+hmatrix.py
+Hierarchical matrix (H-matrix) representation of radial kernels.
+Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
+
+'''
+
+# ----------------------------------------------------------------------
+#  Imports
+# ----------------------------------------------------------------------
+
+import numpy as np
+import scipy as sp
+import scipy.sparse as sparse
+import scipy.spatial.distance as spdist
+import sys
+
+from profiler import profiled
+
+np.set_printoptions(threshold=sys.maxsize)
+
+# ----------------------------------------------------------------------
+#  Kernels
+# ----------------------------------------------------------------------
+
+def PHI_TPS(r):
+    """
+    Thin plate spline kernel r^2*log10(r) (same definition as CInterpolator::PHI_TPS).
+    """
+
+    phi = np.zeros_like(r)
+    mask = r > 0.0
+    phi[mask] = r[mask]**2*np.log10(r[mask])
+    return phi
+
+# ----------------------------------------------------------------------
+#  Cluster tree class
+# ----------------------------------------------------------------------
+
+class ClusterNode(object):
+    """
+    Cluster of points, defined by a contiguous range [start, stop) of the permutation of its tree.
+    """
+
+    def __init__(self, start, stop, lo, hi):
+        """
+        Des.
+        """
+
+        self.start = start
+        self.stop = stop
+        self.lo = lo
+        self.hi = hi
+        self.children = []
+
+    def size(self):
+        """
+        Des.
+        """
+
+        return self.stop - self.start
+
+    def diameter(self):
+        """
+        Des.
+        """
+
+        return np.linalg.norm(self.hi - self.lo)
+
+    def distance(self, other):
+        """
+        Distance between the bounding boxes of two clusters.
+        """
+
+        gap = np.maximum(0.0, np.maximum(other.lo - self.hi, self.lo - other.hi))
+        return np.linalg.norm(gap)
+
+class ClusterTree(object):
+    """
+    Binary space partitioning of a point cloud (bisection of the bounding box along its largest extent).
+    """
+
+    def __init__(self, points, leafSize=64):
+        """
+        points is a (n x nDim) array.
+        """
+
+        self.points = points
+        self.leafSize = leafSize
+        self.perm = np.arange(points.shape[0])
+        self.root = self.__build(0, points.shape[0])
+
+    def __build(self, start, stop):
+        """
+        Des.
+        """
+
+        indices = self.perm[start:stop]
+        pts = self.points[indices]
+        node = ClusterNode(start, stop, pts.min(axis=0), pts.max(axis=0))
+
+        if stop - start > self.leafSize:
+            axis = np.argmax(node.hi - node.lo)
+            half = (stop - start)//2
+            order = np.argpartition(pts[:,axis], half)
+            self.perm[start:stop] = indices[order]
+            node.children = [self.__build(start, start+half), self.__build(start+half, stop)]
+
+        return node
+
+    def getIndices(self, node):
+        """
+        Returns the indices (in the original numbering) of the points of a cluster.
+        """
+
+        return self.perm[node.start:node.stop]
+
+# ----------------------------------------------------------------------
+#  H-matrix class
+# ----------------------------------------------------------------------
+
+class HMatrix(object):
+    """
+    H-matrix approximation of the kernel matrix K[i,j] = kernel(|t_i - s_j|).
+    Admissible blocks (min(diam) <= eta*dist) are compressed with adaptive cross approximation (ACA),
+    the other ones (near-field) are gathered in a sparse matrix.
+    """
+
+    def __init__(self, targetPoints, sourcePoints, kernel, leafSize=64, eta=1.0, acaTol=1e-7):
+        """
+        targetPoints and sourcePoints are (n x nDim) arrays.
+        """
+
+        self.targetPoints = targetPoints
+        self.sourcePoints = sourcePoints
+        self.kernel = kernel
+        self.eta = eta
+        self.acaTol = acaTol
+        self.shape = (targetPoints.shape[0], sourcePoints.shape[0])
+
+        self.targetTree = ClusterTree(targetPoints, leafSize)
+        self.sourceTree = ClusterTree(sourcePoints, leafSize)
+
+        self.farBlocks = []
+        self.nearRows = []
+        self.nearCols = []
+        self.nearValues = []
+        self.__buildBlocks(self.targetTree.root, self.sourceTree.root)
+
+        if self.nearValues:
+            nearRows = np.concatenate(self.nearRows)
+            nearCols = np.concatenate(self.nearCols)
+            nearValues = np.concatenate(self.nearValues)
+        else:
+            nearRows = nearCols = np.zeros(0, dtype=int)
+            nearValues = np.zeros(0)
+        self.nearField = sparse.csr_matrix((nearValues, (nearRows, nearCols)), shape=self.shape)
+        del self.nearRows, self.nearCols, self.nearValues
+
+    def __evaluate(self, rows, cols):
+        """
+        Returns the dense kernel block K[rows, cols].
+        """
+
+        return self.kernel(spdist.cdist(self.targetPoints[rows], self.sourcePoints[cols]))
+
+    def __addNearBlock(self, rows, cols, block):
+        """
+        Des.
+        """
+
+        self.nearRows.append(np.repeat(rows, len(cols)))
+        self.nearCols.append(np.tile(cols, len(rows)))
+        self.nearValues.append(block.ravel())
+
+    def __buildBlocks(self, tNode, sNode):
+        """
+        Recursive construction of the block tree.
+        """
+
+        rows = self.targetTree.getIndices(tNode)
+        cols = self.sourceTree.getIndices(sNode)
+
+        if min(tNode.diameter(), sNode.diameter()) <= self.eta*tNode.distance(sNode):
+            U, V = self.__aca(rows, cols)
+            if U is None:
+                self.__addNearBlock(rows, cols, self.__evaluate(rows, cols))
+            else:
+                self.farBlocks.append((rows, cols, U, V))
+        elif not tNode.children and not sNode.children:
+            self.__addNearBlock(rows, cols, self.__evaluate(rows, cols))
+        elif not sNode.children or (tNode.children and tNode.size() >= sNode.size()):
+            for tChild in tNode.children:
+                self.__buildBlocks(tChild, sNode)
+        else:
+            for sChild in sNode.children:
+                self.__buildBlocks(tNode, sChild)
+
+    def __aca(self, rows, cols):
+        """
+        Adaptive cross approximation with partial pivoting, K[rows, cols] ~ U*V.
+        Returns (None, None) if the block is not compressible enough (it is then stored as dense).
+        """
+
+        m, n = len(rows), len(cols)
+        maxRank = min(m, n)//2
+        U = np.zeros((m, maxRank))
+        V = np.zeros((maxRank, n))
+        usedRows = np.zeros(m, dtype=bool)
+        normSq = 0.0
+        i = 0
+        k = 0
+
+        while k < maxRank:
+            usedRows[i] = True
+            row = self.__evaluate(rows[i:i+1], cols)[0] - U[i,:k].dot(V[:k])
+            j = np.argmax(np.abs(row))
+            if abs(row[j]) < 1e-300:
+                if usedRows.all():
+                    break
+                i = np.argmin(usedRows)
+                continue
+            V[k] = row/row[j]
+            U[:,k] = self.__evaluate(rows, cols[j:j+1])[:,0] - U[:,:k].dot(V[:k,j])
+
+            uNorm = np.linalg.norm(U[:,k])
+            vNorm = np.linalg.norm(V[k])
+            normSq += (uNorm*vNorm)**2 + 2.0*np.sum(U[:,:k].T.dot(U[:,k])*V[:k].dot(V[k]))
+            k += 1
+            if uNorm*vNorm <= self.acaTol*np.sqrt(abs(normSq)):
+                return U[:,:k], V[:k]
+
+            uAbs = np.abs(U[:,k-1])
+            uAbs[usedRows] = -1.0
+            i = np.argmax(uAbs)
+            if uAbs[i] < 0.0:
+                break
+
+        return None, None
+
+    @profiled('matMult')
+    def dot(self, X):
+        """
+        Computes K*X (X can have several columns).
+        """
+
+        Y = self.nearField.dot(X)
+        for rows, cols, U, V in self.farBlocks:
+            Y[rows] += U.dot(V.dot(X[cols]))
+        return Y
+
+    def rdot(self, X):
+        """
+        Computes K^T*X (X can have several columns).
+        """
+
+        Y = self.nearField.T.dot(X)
+        for rows, cols, U, V in self.farBlocks:
+            Y[cols] += V.T.dot(U.T.dot(X[rows]))
+        return Y
+
+    def getCompressionRatio(self):
+        """
+        Returns the ratio between the number of stored entries and the size of the dense matrix.
+        """
+
+        nStored = self.nearField.nnz
+        for rows, cols, U, V in self.farBlocks:
+            nStored += U.size + V.size
+        return float(nStored)/(self.shape[0]*self.shape[1])
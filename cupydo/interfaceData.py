@@ -29,9 +29,12 @@ Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
 
 import numpy as np
 import scipy as sp
+import scipy.sparse
 import sys
+from contextlib import contextmanager
 
 import ccupydo
+from profiler import profiled
 
 np.set_printoptions(threshold=sys.maxsize)
 
@@ -253,6 +256,52 @@ class FlexInterfaceData(ccupydo.CFlexInterfaceData):
 
         return normList
 
+    def asarray(self):
+        """
+        Returns a writable (nLocal, nDim) numpy view of the local data (no copy).
+        In parallel, restoreArray() must be called once the view has been modified (see localView()).
+        """
+
+        return self.getLocalArray().T
+
+    def restoreArray(self):
+        """
+        Des.
+        """
+
+        self.restoreLocalArray()
+
+    @contextmanager
+    def localView(self):
+        """
+        Context manager giving the view returned by asarray() and restoring it on exit.
+        """
+
+        view = self.asarray()
+        try:
+            yield view
+        finally:
+            self.restoreArray()
+
+    def setRows(self, globalIndices, values):
+        """
+        Sets the rows globalIndices (contiguous, as given by Manager.getLocalGlobalIndices()) from the (n, nDim) array values.
+        The rows are written at once through the local view if they are owned by this process, with one setValues per component otherwise.
+        assemble() must be called afterwards, as after __setitem__.
+        """
+
+        values = np.asarray(values, dtype=float).reshape(-1, self.nDim)
+        if values.shape[0] == 0:
+            return
+        startIndex, stopIndex = self.getOwnershipRange()
+
+        if startIndex <= globalIndices[0] and globalIndices[-1] < stopIndex:
+            with self.localView() as view:
+                view[globalIndices[0]-startIndex:globalIndices[-1]+1-startIndex] = values
+        else:
+            for iDim in range(self.nDim):
+                self.setValues(iDim, globalIndices, np.ascontiguousarray(values[:,iDim]))
+
 # ----------------------------------------------------------------------
 #    InterfaceMatrix class
 # ----------------------------------------------------------------------
@@ -279,7 +328,24 @@ class InterfaceMatrix(ccupydo.CInterfaceMatrix):
 
         self.sizes = sizes
         self.mpiComm = mpiComm
+        self.cachedMat = None
+
+    def getMat(self):
+        """
+        Returns the underlying matrix.
+        In serial, sparse matrices are returned as a scipy CSR matrix sharing the memory of the C++ storage.
+        A matrix loaded from disk is returned as is (memory-mapped).
+        """
 
+        if self.cachedMat is not None:
+            return self.cachedMat
+        elif self.mpiComm == None and self.isSparse():
+            indptr, indices, data = self.getCSR()
+            return sp.sparse.csr_matrix((data, indices, indptr), shape=tuple(self.sizes), copy=False)
+        else:
+            return ccupydo.CInterfaceMatrix.getMat(self)
+
+    @profiled('matMult')
     def mult(self, Data , DataOut):
         """
         Performs interface matrix-data multiplication.
@@ -290,5 +356,45 @@ class InterfaceMatrix(ccupydo.CInterfaceMatrix):
         else:
             PyH = self.getMat();
             dim = Data.getDim()
+            X = PyH.dot(np.column_stack([Data.getData(iDim) for iDim in range(dim)]))
             for iDim in range(dim):
-                np.dot(PyH, Data.getData(iDim), DataOut.getData(iDim))
+                DataOut.getData(iDim)[:] = X[:,iDim]
+
+    def save(self, fileName):
+        """
+        Writes the assembled matrix to disk.
+        Serial : CSR arrays (sparse) or full array (dense) in .npy format. Parallel : PETSc binary format.
+        """
+
+        if self.mpiComm != None:
+            from petsc4py import PETSc
+            viewer = PETSc.Viewer().createBinary(fileName + '.dat', 'w', comm=self.mpiComm)
+            self.getMat().view(viewer)
+            viewer.destroy()
+        else:
+            PyH = self.getMat()
+            if sp.sparse.issparse(PyH):
+                np.save(fileName + '_indptr.npy', PyH.indptr)
+                np.save(fileName + '_indices.npy', PyH.indices)
+                np.save(fileName + '_data.npy', PyH.data)
+            else:
+                np.save(fileName + '.npy', PyH)
+
+    def load(self, fileName):
+        """
+        Reads a matrix written by save().
+        In serial, the arrays are memory-mapped and the C++ storage is left empty.
+        """
+
+        if self.mpiComm != None:
+            from petsc4py import PETSc
+            viewer = PETSc.Viewer().createBinary(fileName + '.dat', 'r', comm=self.mpiComm)
+            self.getMat().load(viewer)
+            viewer.destroy()
+        elif self.isSparse():
+            indptr = np.load(fileName + '_indptr.npy', mmap_mode='r')
+            indices = np.load(fileName + '_indices.npy', mmap_mode='r')
+            data = np.load(fileName + '_data.npy', mmap_mode='r')
+            self.cachedMat = sp.sparse.csr_matrix((data, indices, indptr), shape=tuple(self.sizes), copy=False)
+        else:
+            self.cachedMat = np.load(fileName + '.npy', mmap_mode='r')
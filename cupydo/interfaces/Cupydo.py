@@ -24,6 +24,9 @@ Authors: Adrien CROVATO
 '''
 
 import cupydo.utilities as cupyutil
+import cupydo.profiler as cupyprof
+import cupydo.history as cupyhist
+import cupydo.predictor as cupypred
 import cupydo.manager as cupyman
 import cupydo.interpolator as cupyinterp
 import cupydo.criterion as cupycrit
@@ -35,6 +38,21 @@ class CUPyDO():
         withMPI, comm, myId, numberPart = cupyutil.getMpi()
         rootProcess = 0
 
+        # --- Set up the logger --- #
+        logLevel = getattr(cupyutil.Logger, p['logLevel']) if 'logLevel' in p else cupyutil.Logger.INFO
+        logFlush = p['logFlush'] if 'logFlush' in p else 1.0
+        logFile = p['logFile'] if 'logFile' in p else None
+        cupyutil.setLogger(cupyutil.Logger(comm, logLevel, logFlush, logFile))
+
+        # --- Set up the profiler --- #
+        self.profile = p['profile'] if 'profile' in p else None
+        cupyprof.setProfiler(cupyprof.Profiler(comm, enabled=(self.profile != None)))
+
+        # --- Set up the history writers --- #
+        historyFormat = p['historyFormat'] if 'historyFormat' in p else 'ascii'
+        historyFlush = p['historyFlush'] if 'historyFlush' in p else 10
+        cupyhist.setHistoryOptions(historyFormat, historyFlush)
+
         # --- Initialize the fluid and solid solvers --- #
         fluidSolver = self.__initFluid(p, withMPI, comm)
         cupyutil.mpiBarrier(comm)
@@ -46,14 +64,18 @@ class CUPyDO():
         cupyutil.mpiBarrier()
 
         # --- Initialize the interpolator --- #
+        nThreads = p['nThreads'] if 'nThreads' in p else 1
+        cacheDir = p['interpCache'] if 'interpCache' in p else None
         if p['interpolator'] == 'Matching':
-            interpolator = cupyinterp.MatchingMeshesInterpolator(manager, fluidSolver, solidSolver, comm)
+            interpolator = cupyinterp.MatchingMeshesInterpolator(manager, fluidSolver, solidSolver, comm, nThreads=nThreads, cacheDir=cacheDir)
         elif p['interpolator'] == 'RBF':
-            interpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['rbfRadius'], comm)
+            interpolator = cupyinterp.RBFInterpolator(manager, fluidSolver, solidSolver, p['rbfRadius'], comm, nThreads=nThreads, cacheDir=cacheDir)
         elif p['interpolator'] == 'TPS':
-            interpolator = cupyinterp.TPSInterpolator(manager, fluidSolver, solidSolver, comm)
+            interpolator = cupyinterp.TPSInterpolator(manager, fluidSolver, solidSolver, comm, nThreads=nThreads, cacheDir=cacheDir)
+        elif p['interpolator'] == 'TPS-H':
+            interpolator = cupyinterp.HierarchicalTPSInterpolator(manager, fluidSolver, solidSolver, comm, nThreads=nThreads, cacheDir=cacheDir)
         else:
-            raise RuntimeError(p['interpolator'], 'not available! (avail: "Matching", "RBF" or "TPS").\n')
+            raise RuntimeError(p['interpolator'], 'not available! (avail: "Matching", "RBF", "TPS" or "TPS-H").\n')
         # if petsc is used, then some options can be set
         if withMPI and 'interpOpts' in p:
             for linSolver in interpolator.getLinearSolvers():
@@ -63,10 +85,18 @@ class CUPyDO():
         # --- Initialize the FSI criterion --- #
         if p['algorithm'] == 'Explicit':
             print 'Explicit simulations requested, criterion redefined to None.'
+        tolThermal = p['tolThermal'] if 'tolThermal' in p else 1e12
         if p['criterion'] == 'Displacements':
-            criterion = cupycrit.DispNormCriterion(p['tol'])
+            criterion = cupycrit.DispNormCriterion(p['tol'], tolThermal)
+        elif p['criterion'] == 'RelativeDisplacements':
+            criterion = cupycrit.RelativeDispNormCriterion(p['tol'], tolThermal)
+        elif p['criterion'] == 'MaxDisplacements':
+            criterion = cupycrit.MaxNormCriterion(p['tol'], tolThermal)
+        elif p['criterion'] == 'ComponentDisplacements':
+            weights = p['critWeights'] if 'critWeights' in p else (1.0, 1.0, 1.0)
+            criterion = cupycrit.ComponentDispNormCriterion(p['tol'], weights, tolThermal)
         else:
-            raise RuntimeError(p['criterion'], 'not available! (avail: "Displacements").\n')
+            raise RuntimeError(p['criterion'], 'not available! (avail: "Displacements", "RelativeDisplacements", "MaxDisplacements" or "ComponentDisplacements").\n')
         cupyutil.mpiBarrier()
 
         # --- Initialize the FSI algorithm --- #
@@ -82,8 +112,33 @@ class CUPyDO():
         elif p ['algorithm'] == 'IQN_ILS':
             self.algorithm = cupyalgo.AlgorithmIQN_ILS(manager, fluidSolver, solidSolver, interpolator, criterion,
                 p['maxIt'], p['dt'], p['tTot'], p['timeItTresh'], p['omega'], p['nSteps'], p['firstItTgtMat'], comm)
+        elif p['algorithm'] == 'IQN_MVJ':
+            restartType = p['mvjRestart'] if 'mvjRestart' in p else 'SVD'
+            maxRank = p['mvjRank'] if 'mvjRank' in p else 100
+            svdTol = p['mvjTol'] if 'mvjTol' in p else 1e-4
+            restartInterval = p['mvjRestartInterval'] if 'mvjRestartInterval' in p else 8
+            self.algorithm = cupyalgo.AlgorithmIQN_MVJ(manager, fluidSolver, solidSolver, interpolator, criterion,
+                p['maxIt'], p['dt'], p['tTot'], p['timeItTresh'], p['omega'], restartType, maxRank, svdTol, restartInterval, p['firstItTgtMat'], comm)
+        elif p['algorithm'] == 'Anderson' or p['algorithm'] == 'IQN_GB':
+            depth = p['andersonDepth'] if 'andersonDepth' in p else 5
+            damping = p['andersonDamping'] if 'andersonDamping' in p else 1.0
+            restartType = p['andersonRestart'] if 'andersonRestart' in p else 'window'
+            safeguardFactor = p['andersonSafeguard'] if 'andersonSafeguard' in p else None
+            algorithmClass = cupyalgo.AlgorithmAnderson if p['algorithm'] == 'Anderson' else cupyalgo.AlgorithmIQN_GB
+            self.algorithm = algorithmClass(manager, fluidSolver, solidSolver, interpolator, criterion,
+                p['maxIt'], p['dt'], p['tTot'], p['timeItTresh'], p['omega'], depth, damping, restartType, safeguardFactor, comm)
         else:
-            raise RuntimeError(p['algorithm'], 'not available! (avail: "Explicit", "StaticBGS", "AitkenBGS" or "IQN_ILS").\n')
+            raise RuntimeError(p['algorithm'], 'not available! (avail: "Explicit", "StaticBGS", "AitkenBGS", "IQN_ILS", "IQN_MVJ", "Anderson" or "IQN_GB").\n')
+        self.algorithm.pipelined = p['pipelined'] if 'pipelined' in p else False
+        self.algorithm.adaptiveTolerance = p['adaptTol'] if 'adaptTol' in p else False
+        if 'adaptTolMax' in p:
+            self.algorithm.toleranceFactorMax = p['adaptTolMax']
+        if 'adaptTolEta' in p:
+            self.algorithm.toleranceEta = p['adaptTolEta']
+        self.__initPredictors(p)
+        self.algorithm.checkpointPath = p['checkpoint'] if 'checkpoint' in p else None
+        self.algorithm.checkpointInterval = p['checkpointInterval'] if 'checkpointInterval' in p else 10
+        self.algorithm.restartPath = p['restart'] if 'restart' in p else None
         cupyutil.mpiBarrier()
 
     def run(self):
@@ -91,6 +146,25 @@ class CUPyDO():
         Adrien Crovato
         """
         self.algorithm.run()
+        cupyutil.getLogger().flush()
+        if self.profile != None:
+            profiler = cupyprof.getProfiler()
+            profiler.printSummary(profiler.write(self.profile))
+
+    def __initPredictors(self, p):
+        """Initialize the predictors of the interface data
+        """
+        order = p['predictorOrder'] if 'predictorOrder' in p else 2
+        if 'predictor' not in p or p['predictor'] == 'Velocity':
+            self.algorithm.displacementPredictor = cupypred.VelocityPredictor(order)
+        elif p['predictor'] == 'Polynomial':
+            self.algorithm.displacementPredictor = cupypred.PolynomialPredictor(order)
+        elif p['predictor'] == 'Correction':
+            self.algorithm.displacementPredictor = cupypred.CorrectionPredictor()
+        elif p['predictor'] == 'None':
+            self.algorithm.predictor = False
+        else:
+            raise RuntimeError(p['predictor'], 'predictor not available! (avail: "Velocity", "Polynomial", "Correction" or "None").\n')
 
     def __initFluid(self, p, withMPI, comm):
         """Initialize fluid solver interface
@@ -146,9 +220,9 @@ class CUPyDO():
 # - p['csdFile'], path to solid cfg file'
 
 # FSI objects
-# - p['interpolator'], interpolator type available: Matching, RBF, TPS
-# - p['criterion'], convergence criterion available: Displacements
-# - p['algorithm'], FSI algorithms available: Explicit, StaticBGS, AitkenBGS, IQN_ILS
+# - p['interpolator'], interpolator type available: Matching, RBF, TPS, TPS-H (hierarchical TPS for large interfaces, serial only)
+# - p['criterion'], convergence criterion available: Displacements (L2 norm), RelativeDisplacements (L2 norm divided by the norm of the interface displacement increment over the time step), MaxDisplacements (max norm), ComponentDisplacements (largest weighted L2 norm of a component)
+# - p['algorithm'], FSI algorithms available: Explicit, StaticBGS, AitkenBGS, IQN_ILS, IQN_MVJ, Anderson, IQN_GB
 
 # FSI parameters
 # needed by all algos
@@ -161,13 +235,54 @@ class CUPyDO():
 # - p['tol'], tolerance on displacements
 # - p['maxIt'], maximu number of iterations
 # - p['omega'], relaxation parameter
+# optional for the criterion
+# - p['tolThermal'], tolerance on the thermal residual for thermal and conjugate heat transfer coupling (default 1e12, not checked)
+# - p['critWeights'], weights of the x, y and z components for the ComponentDisplacements criterion (default (1.0, 1.0, 1.0))
 # needed by IQN-ILS
 # - p['firstItTgtMat'], compute the Tangent matrix based on first iteration (True or False)
 # - p['nSteps'], number of time steps to keep
+# needed by parallel IQN-ILS
+# - p['firstItTgtMat'], compute the Tangent matrix based on first iteration (True or False)
+# needed by IQN-MVJ
+# - p['firstItTgtMat'], compute the Tangent matrix based on first iteration (True or False)
+# optional for IQN-MVJ
+# - p['mvjRestart'], restart of the inverse Jacobian approximation: SVD (truncation of its low-rank part) or zero (reset) (default SVD)
+# - p['mvjRank'], maximum rank kept by the SVD restart (default 100)
+# - p['mvjTol'], singular values lower than mvjTol times the largest one are removed by the SVD restart (default 1e-4)
+# - p['mvjRestartInterval'], number of time steps between two zero restarts (default 8)
+# optional for Anderson and IQN_GB (p['omega'] is used for the first iteration of each time step)
+# - p['andersonDepth'], number of previous iterations of the time step used by the update (default 5)
+# - p['andersonDamping'], damping factor of the residual in the update (default 1.0)
+# - p['andersonRestart'], behaviour when the history is full: window (the oldest iteration is dropped) or restart (the history is emptied) (default window)
+# - p['andersonSafeguard'], the history is emptied if the residual norm grows by more than this factor in one iteration (default None, only the conditioning safeguard is used)
 # needed by RBF interpolator
 # - p['rbfRadius'], radius of interpolation for RBF
 # optional for RBF/TPS interpolators
 # - p['interpOpts'], optional options for interpolator, [0] = max number of iterations, [1] = preconditionner type
+# optional for all interpolators
+# - p['nThreads'], number of threads used to assemble the interpolation matrices (OpenMP, default 1)
+# - p['interpCache'], directory where the interpolation matrices are cached between runs (default None, no cache)
+# optional for all algorithms (except Explicit)
+# - p['pipelined'], start the solid to fluid transfers of the next time step (interpolation and non-blocking redistribution, or worker thread in serial) before the preprocessing of the solvers (default False)
+# - p['adaptTol'], inexact coupling: the solvers tolerance is relaxed by a factor following the coupling error (SU2: steady runs only, Flow: relative tolerance, Metafor: Newton-Raphson tolerance if the model gives p['tolNR']) (default False)
+# - p['adaptTolMax'], maximum factor applied to the solvers tolerance (default 100)
+# - p['adaptTolEta'], factor = adaptTolEta*(expected coupling error)/tol, clipped to [1, adaptTolMax] (default 0.1)
+# optional predictor parameters (all algorithms except Explicit)
+# - p['predictor'], predictor of the solid interface displacement: Velocity (first or second order, from the solid velocity), Polynomial (extrapolation of the last converged time steps), Correction (re-uses the coupling correction of the previous time step) or None (default Velocity)
+# - p['predictorOrder'], order of the Velocity (1 or 2) and Polynomial predictors (default 2)
+# optional logging parameters
+# - p['logLevel'], minimum level of the messages: DEBUG, INFO, WARNING or ERROR (default INFO)
+# - p['logFlush'], interval (in s) between two flushes of the DEBUG messages buffered on the root process, other messages are written immediately (default 1.0)
+# - p['logFile'], name of the per-process log files, formatted with the rank, e.g. 'cupydo_{}.log' (default None)
+# optional profiling parameters
+# - p['profile'], prefix of the profiling output files (prefix.json: per region calls and min/avg/max time over the processes, per time step and FSI iteration breakdown; prefix_trace.json: Chrome trace) (default None, no profiling)
+# optional checkpoint parameters (coupling state only, the solvers must be restarted with their own mechanisms)
+# - p['checkpoint'], directory where the coupling state (algorithm, interface data and predictors) is written, one file per process, by a worker thread (default None, no checkpoint)
+# - p['checkpointInterval'], number of time steps between two checkpoints (default 10)
+# - p['restart'], directory of the checkpoint the computation restarts from, written with the same number of processes (default None)
+# optional history parameters (FSIhistory and solver histories)
+# - p['historyFormat'], ascii (legacy files), npz or h5 (binary files, h5 needs h5py; see cupydo.history.convertToAscii) (default ascii)
+# - p['historyFlush'], number of rows buffered in memory between two writes of a history file (default 10)
 
 # Solver parameters that should be moved to solver cfg files and handled by the solver interface
 # - p['nodalLoadsType'], SU2
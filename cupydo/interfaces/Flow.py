@@ -24,6 +24,7 @@ Authors A. Crovato
 import sys
 import numpy as np
 from cupydo.genericSolvers import FluidSolver
+from cupydo.history import HistoryWriter
 
 # ----------------------------------------------------------------------
 #  FlowSolver class
@@ -155,6 +156,7 @@ class Flow(FluidSolver):
             raise RuntimeError('Available nonlinear solver type: Picard or Newton, but ' + p['NSolver'] + ' was given!\n')
         self.solver.nthreads = _nthreads
         self.solver.relTol = p['Rel_tol']
+        self.relTol = p['Rel_tol'] # nominal relative tolerance (see setToleranceFactor)
         self.solver.absTol = p['Abs_tol']
         self.solver.maxIt = p['Max_it']
         print "Number of threads: ", self.solver.nthreads
@@ -163,6 +165,11 @@ class Flow(FluidSolver):
         print "Objective absolute residual: ", self.solver.absTol
         print '\n'
         
+    def setToleranceFactor(self, factor):
+        """Relax the relative tolerance of the nonlinear solver (inexact coupling)
+        """
+        self.solver.relTol = self.relTol*factor
+
     def run(self, t1, t2):
         """Run the solver for one steady (time) iteration.
         Adrien Crovato
@@ -236,18 +243,14 @@ class Flow(FluidSolver):
         """Initialize history file
         Adrien Crovato
         """
-        histFile = open('FlowHistory.dat', 'w')
-        histFile.write('{0:>12s}   {1:>12s}   {2:>12s}   {3:>12s}   {4:>12s}\n'.format('Time', 'FSI_Iter', 'C_Lift', 'C_Drag', 'C_Moment'))
-        histFile.close()
+        self.historyWriter = HistoryWriter('FlowHistory.dat', [('Time', '12.6f'), ('FSI_Iter', '12d'), ('C_Lift', '12.6f'), ('C_Drag', '12.6f'), ('C_Moment', '12.6f')])
 
     def saveRealTimeData(self, time, nFSIIter):
         """Save data at each fsi iteration
         Adrien Crovato
         """
         # history at each iteration
-        histFile = open('FlowHistory.dat', 'a')
-        histFile.write('{0:12.6f}   {1:12d}   {2:12.6f}   {3:12.6f}   {4:12.6f}\n'.format(time, nFSIIter, self.solver.Cl, self.solver.Cd, self.solver.Cm))
-        histFile.close()
+        self.historyWriter.append(time, nFSIIter, self.solver.Cl, self.solver.Cd, self.solver.Cm)
         # full solution at user-defined frequency
         if np.mod(nFSIIter+1, self.saveFreq) == 0:
             self.solver.save(1000000+int(nFSIIter+1)/int(self.saveFreq), self.mshWriter)
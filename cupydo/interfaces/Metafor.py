@@ -34,6 +34,7 @@ import toolbox.fac as fac
 from wrap import *
 import numpy as np
 from cupydo.genericSolvers import SolidSolver
+from cupydo.history import HistoryWriter
 
 # ----------------------------------------------------------------------
 #  Nodal Load class
@@ -91,6 +92,10 @@ class Metafor(SolidSolver):
         self.saveAllFacs = p['saveAllFacs'] # True: the Fac corresponding to the end of the time step is conserved, False: Facs are erased at the end of each time step
         self.runOK = True
         self.computationType = computationType  # computation type : steady (default) or unsteady
+        if 'tolNR' in p:
+            self.tolNR = p['tolNR']             # nominal Newton-Raphson tolerance (see setToleranceFactor)
+        else:
+            self.tolNR = None
 
         # --- Retrieves the f/s boundary and the related nodes --- #
         self.bndno = p['bndno']                                                 # physical group of the f/s interface
@@ -150,6 +155,15 @@ class Metafor(SolidSolver):
 
         self.__setCurrentState(False)
 
+    def setToleranceFactor(self, factor):
+        """
+        Relaxes the Newton-Raphson residual tolerance (inexact coupling), if the nominal one is given by the model parameters (p['tolNR']).
+        """
+
+        if self.tolNR != None:
+            mim = self.metafor.getMechanicalIterationManager()
+            mim.setResidualTolerance(self.tolNR*factor)
+
     def __firstRun(self, t1, t2):
         """
         performs a first run of metafor with all the required preprocessing.
@@ -359,30 +373,21 @@ class Metafor(SolidSolver):
         Des.
         """
         
+        self.realTimeWriters = []
         for extractor in self.realTimeExtractorsList:
             data = extractor.extract()
             extractorName = extractor.buildName()
-            solFile = open(extractorName + '.ascii', "w")
-            solFile.write("{0:>12s}   {1:>12s}".format("Time", "FSI_Iter"))
-            for ii in range(len(data)):
-                solFile.write("   {0:>12s}".format("Value_"+str(ii)))
-            solFile.write("\n")
-            solFile.close()
+            columns = [("Time", '12.6f'), ("FSI_Iter", '12d')] + [("Value_"+str(ii), '12.6f') for ii in range(len(data))]
+            self.realTimeWriters.append(HistoryWriter(extractorName + '.ascii', columns))
 
     def saveRealTimeData(self, time, nFSIIter):
         """
         Des.
         """
         
-        for extractor in self.realTimeExtractorsList:
+        for extractor, writer in zip(self.realTimeExtractorsList, self.realTimeWriters):
             data = extractor.extract()
-            extractorName = extractor.buildName()
-            solFile = open(extractorName + '.ascii', "a")
-            solFile.write("{0:12.6f}   {1:12d}".format(time, nFSIIter))
-            for d in data:
-                solFile.write("   {0:12.6f}".format(d))
-            solFile.write("\n")
-            solFile.close()
+            writer.append(time, nFSIIter, *data)
 
     def printRealTimeData(self, time, nFSIIter):
         """
@@ -31,6 +31,7 @@ import os, os.path, sys, time, string
 import math
 import numpy as np
 from cupydo.genericSolvers import FluidSolver
+from cupydo.history import HistoryWriter
 
 # ----------------------------------------------------------------------
 #  Pfem solver interface class
@@ -201,30 +202,21 @@ class Pfem(FluidSolver):
         Des.
         """
         
+        self.realTimeWriters = []
         for extractor in self.realTimeExtractorsList:
             data = extractor.extract()
             extractorName = extractor.buildName()
-            solFile = open(extractorName + '.ascii', "w")
-            solFile.write("{0:>12s}   {1:>12s}".format("Time", "FSI_Iter"))
-            for ii in range(len(data)):
-                solFile.write("   {0:>12s}".format("Value_"+str(ii)))
-            solFile.write("\n")
-            solFile.close()
+            columns = [("Time", '12.6f'), ("FSI_Iter", '12d')] + [("Value_"+str(ii), '12.6f') for ii in range(len(data))]
+            self.realTimeWriters.append(HistoryWriter(extractorName + '.ascii', columns))
     
     def saveRealTimeData(self, time, nFSIIter):
         """
         Des.
         """
         
-        for extractor in self.realTimeExtractorsList:
+        for extractor, writer in zip(self.realTimeExtractorsList, self.realTimeWriters):
             data = extractor.extract()
-            extractorName = extractor.buildName()
-            solFile = open(extractorName + '.ascii', "a")
-            solFile.write("{0:12.6f}   {1:12d}".format(time, nFSIIter))
-            for d in data:
-                solFile.write("   {0:12.6f}".format(d))
-            solFile.write("\n")
-            solFile.close()
+            writer.append(time, nFSIIter, *data)
     
     def printRealTimeData(self, time, nFSIIter):
         """
@@ -31,6 +31,7 @@ import pysu2
 import math
 import numpy as np
 from cupydo.genericSolvers import FluidSolver
+from cupydo.history import HistoryWriter
 
 # ----------------------------------------------------------------------
 #  SU2 solver interface class
@@ -82,6 +83,8 @@ class SU2(FluidSolver):
 
         self.computationType = computationType                                    # computation type : steady (default) or unsteady
         self.nodalLoadsType = nodalLoadsType                                      # nodal loads type to extract : force (in N, default) or pressure (in Pa)
+        self.toleranceFactor = 1.0                                                # inexact coupling (see setToleranceFactor)
+        self.residualOrders = 6.0
 
         # --- Calculate the number of nodes (on each partition) --- #
         self.nNodes = 0
@@ -138,6 +141,14 @@ class SU2(FluidSolver):
 
         self.__setCurrentState()
 
+    def setToleranceFactor(self, factor):
+        """
+        Inexact coupling. The convergence criterion of SU2 cannot be changed through the wrapper, so the number of pseudo-time iterations of a steady run is reduced instead,
+        assuming a linear convergence over residualOrders orders of magnitude. Unsteady runs (dual time stepping) are not affected.
+        """
+
+        self.toleranceFactor = factor
+
     def __unsteadyRun(self, t1, t2):
         """
         Run SU2 on one time step.
@@ -153,6 +164,8 @@ class SU2(FluidSolver):
 
         self.SU2.ResetConvergence()
         NbIter = self.SU2.GetnExtIter()
+        if self.toleranceFactor > 1.0:
+            NbIter = max(1, int(math.ceil(NbIter*max(1.0 - math.log10(self.toleranceFactor)/self.residualOrders, 0.0))))
         Iter = 0
         while Iter < NbIter:
             self.SU2.PreprocessExtIter(Iter)
@@ -306,9 +319,7 @@ class SU2(FluidSolver):
         Description.
         """
 
-        solFile = open('AerodynamicCoeff.ascii', "w")
-        solFile.write("{0:>12s}   {1:>12s}   {2:>12s}   {3:>12s}\n".format("Time", "FSI_Iter", "C_Lift", "C_Drag"))
-        solFile.close()
+        self.historyWriter = HistoryWriter('AerodynamicCoeff.ascii', [("Time", '12.6f'), ("FSI_Iter", '12d'), ("C_Lift", '12.6f'), ("C_Drag", '12.6f')])
     
     def saveRealTimeData(self, time, nFSIIter):
         """
@@ -318,9 +329,7 @@ class SU2(FluidSolver):
         CLift = self.SU2.Get_LiftCoeff()
         CDrag = self.SU2.Get_DragCoeff()
 
-        solFile = open('AerodynamicCoeff.ascii', "a")
-        solFile.write("{0:12.6f}   {1:12d}   {2:12.6f}   {3:12.6f}\n".format(time, nFSIIter, CLift, CDrag))
-        solFile.close()
+        self.historyWriter.append(time, nFSIIter, CLift, CDrag)
 
     def printRealTimeData(self, time, nFSIIter):
         """
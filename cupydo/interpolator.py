@@ -28,6 +28,8 @@ Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
 # ----------------------------------------------------------------------
 
 import numpy as np
+import hashlib
+import os
 import sys
 
 import ccupydo
@@ -35,9 +37,113 @@ from utilities import *
 from interfaceData import FlexInterfaceData
 from interfaceData import InterfaceMatrix
 from linearSolver import LinearSolver
+from linearSolver import HMatrixLinearSolver
+from hmatrix import HMatrix, PHI_TPS
+from profiler import profiled
+from checkpoint import getInterfaceDataState, setInterfaceDataState
 
 np.set_printoptions(threshold=sys.maxsize)
 
+# ----------------------------------------------------------------------
+#    Interpolation operators cache
+# ----------------------------------------------------------------------
+
+class InterpolatorCache(object):
+    """
+    On-disk cache of the interpolation matrices (and of their dense factorization, if any).
+    Entries are stored in cacheDir/<key>/, the key being a hash of the initial interface coordinates,
+    the interpolator type, the RBF radius, nDim, the number of processes and the format version.
+    FORMAT_VERSION must be incremented whenever the assembly of the matrices or the format of the stored files changes,
+    so that the entries written before are not reused.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, cacheDir, mpiComm=None):
+        """
+        Des.
+        """
+
+        self.cacheDir = cacheDir
+        self.mpiComm = mpiComm
+        self.path = None
+
+    def setKey(self, interpolator):
+        """
+        Computes the key of the interpolator and the corresponding cache entry.
+        """
+
+        sha = hashlib.sha1()
+        if interpolator.myid in interpolator.manager.getSolidInterfaceProcessors():
+            for array in interpolator.SolidSolver.getNodalInitialPositions():
+                sha.update(np.ascontiguousarray(array, dtype=float).tostring())
+        if interpolator.myid in interpolator.manager.getFluidInterfaceProcessors():
+            for array in interpolator.FluidSolver.getNodalInitialPositions():
+                sha.update(np.ascontiguousarray(array, dtype=float).tostring())
+        localKey = sha.hexdigest()
+
+        if self.mpiComm != None:
+            localKeys = self.mpiComm.allgather(localKey)
+        else:
+            localKeys = [localKey]
+
+        sha = hashlib.sha1()
+        sha.update('format {}'.format(InterpolatorCache.FORMAT_VERSION))
+        sha.update(type(interpolator).__name__)
+        sha.update(repr((interpolator.nDim, interpolator.ns, interpolator.nf, getattr(interpolator, 'radius', None), len(localKeys))))
+        for key in localKeys:
+            sha.update(key)
+        self.path = os.path.join(self.cacheDir, sha.hexdigest())
+
+    def isAvailable(self):
+        """
+        Returns True if the cache entry has been completely written by a previous run.
+        """
+
+        return os.path.isfile(os.path.join(self.path, 'complete'))
+
+    def loadMatrices(self, matrices):
+        """
+        Loads the matrices of the dict {name : InterfaceMatrix}.
+        """
+
+        mpiPrint('\nLoading interpolation matrices from {}...'.format(self.path), self.mpiComm)
+        for name, matrix in matrices.iteritems():
+            matrix.load(os.path.join(self.path, name))
+
+    def loadFactorization(self, name):
+        """
+        Returns the stored dense factorization (lu, piv) of matrix name, or None.
+        """
+
+        fileName = os.path.join(self.path, name)
+        if self.mpiComm == None and os.path.isfile(fileName + '_lu.npy'):
+            return (np.load(fileName + '_lu.npy', mmap_mode='r'), np.load(fileName + '_piv.npy'))
+        else:
+            return None
+
+    def save(self, matrices, solvers={}):
+        """
+        Writes the matrices of the dict {name : InterfaceMatrix} and the factorizations of the dict {name : LinearSolver}.
+        The entry is only marked as complete once everything has been written.
+        """
+
+        mpiPrint('\nWriting interpolation matrices to {}...'.format(self.path), self.mpiComm)
+        myid = self.mpiComm.Get_rank() if self.mpiComm != None else 0
+        if myid == 0 and not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        mpiBarrier(self.mpiComm)
+        for name, matrix in matrices.iteritems():
+            matrix.save(os.path.join(self.path, name))
+        for name, solver in solvers.iteritems():
+            LU = solver.getFactorization()
+            if LU != None:
+                np.save(os.path.join(self.path, name + '_lu.npy'), LU[0])
+                np.save(os.path.join(self.path, name + '_piv.npy'), LU[1])
+        mpiBarrier(self.mpiComm)
+        if myid == 0:
+            open(os.path.join(self.path, 'complete'), 'w').close()
+
 # ----------------------------------------------------------------------
 #    Interpolator class
 # ----------------------------------------------------------------------
@@ -57,20 +163,23 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         -distance()
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, nThreads=1, cacheDir=None):
         """
         Description.
+        nThreads is the number of threads used to assemble the interpolation matrices (OpenMP).
+        cacheDir is the directory of the on-disk cache of interpolation matrices (disabled if None).
         """
 
         mpiPrint('\n***************************** Initializing FSI interpolator *****************************', mpiComm)
 
         ccupydo.CInterpolator.__init__(self, Manager)
+        self.setNumberOfThreads(nThreads)
 
         self.manager = Manager
         self.SolidSolver = SolidSolver
         self.FluidSolver = FluidSolver
 
-        self.mappingTimer = Timer()
+        self.mappingTimer = Timer('mapping')
 
         self.nf = self.manager.getNumberOfFluidInterfaceNodes()
         self.ns = self.manager.getNumberOfSolidInterfaceNodes()
@@ -102,6 +211,16 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
             self.myid = 0
             self.mpiSize = 1
 
+        if cacheDir != None:
+            self.cache = InterpolatorCache(cacheDir, self.mpiComm)
+        else:
+            self.cache = None
+
+        # Redistribution plans of the interface data, built at the first transfer of each vector layout
+        self.redistributionPlans = {}
+        # Transfers to the fluid solver started in advance (see postTransferToFluidSolver())
+        self.pendingTransfers = {}
+
         self.solidInterfaceDisplacement = None
         self.fluidInterfaceDisplacement = None
         self.solidInterfaceLoads = None
@@ -115,6 +234,9 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         self.solidInterfaceNormalHeatFlux = None
         self.fluidInterfaceRobinTemperature = None
         self.solidInterfaceRobinTemperature = None
+        self.interfaceDataNames = ['solidInterfaceDisplacement', 'fluidInterfaceDisplacement', 'solidInterfaceLoads', 'fluidInterfaceLoads',
+                                   'solidInterfaceHeatFlux', 'fluidInterfaceHeatFlux', 'solidInterfaceTemperature', 'fluidInterfaceTemperature',
+                                   'fluidInterfaceNormalHeatFlux', 'solidInterfaceNormalHeatFlux', 'fluidInterfaceRobinTemperature', 'solidInterfaceRobinTemperature']
 
     def checkTotalLoad(self):
         """
@@ -136,9 +258,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         if self.myid in self.manager.getSolidInterfaceProcessors():
             localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z = self.SolidSolver.getNodalDisplacements()
-            for iVertex in range(self.ns_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                self.solidInterfaceDisplacement[iGlobalVertex] = [localSolidInterfaceDisp_X[iVertex], localSolidInterfaceDisp_Y[iVertex], localSolidInterfaceDisp_Z[iVertex]]
+            self.solidInterfaceDisplacement.setRows(self.manager.getLocalGlobalIndices('solid'), np.column_stack((localSolidInterfaceDisp_X, localSolidInterfaceDisp_Y, localSolidInterfaceDisp_Z))[:self.ns_loc])
 
         self.solidInterfaceDisplacement.assemble()
 
@@ -149,9 +269,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         if self.myid in self.manager.getSolidInterfaceProcessors():
             localSolidInterfaceHeatFlux_X, localSolidInterfaceHeatFlux_Y, localSolidInterfaceHeatFlux_Z = self.SolidSolver.getNodalHeatFluxes()
-            for iVertex in range(self.ns_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('solid', self.myid, iVertex)
-                self.solidInterfaceHeatFlux[iGlobalVertex] = [localSolidInterfaceHeatFlux_X[iVertex], localSolidInterfaceHeatFlux_Y[iVertex], localSolidInterfaceHeatFlux_Z[iVertex]]
+            self.solidInterfaceHeatFlux.setRows(self.manager.getLocalGlobalIndices('solid'), np.column_stack((localSolidInterfaceHeatFlux_X, localSolidInterfaceHeatFlux_Y, localSolidInterfaceHeatFlux_Z))[:self.ns_loc])
 
         self.solidInterfaceHeatFlux.assemble()
 
@@ -162,9 +280,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         if self.myid in self.manager.getFluidInterfaceProcessors():
             localFluidInterfaceLoad_X, localFluidInterfaceLoad_Y, localFluidInterfaceLoad_Z = self.FluidSolver.getNodalLoads()
-            for iVertex in range(self.nf_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('fluid', self.myid, iVertex)
-                self.fluidInterfaceLoads[iGlobalVertex] = [localFluidInterfaceLoad_X[iVertex], localFluidInterfaceLoad_Y[iVertex], localFluidInterfaceLoad_Z[iVertex]]
+            self.fluidInterfaceLoads.setRows(self.manager.getLocalGlobalIndices('fluid'), np.column_stack((localFluidInterfaceLoad_X, localFluidInterfaceLoad_Y, localFluidInterfaceLoad_Z))[:self.nf_loc])
 
         self.fluidInterfaceLoads.assemble()
 
@@ -175,9 +291,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         if self.myid in self.manager.getFluidInterfaceProcessors():
             localFluidInterfaceTemperature = self.FluidSolver.getNodalTemperatures()
-            for iVertex in range(self.nf_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('fluid', self.myid, iVertex)
-                self.fluidInterfaceTemperature[iGlobalVertex] = [localFluidInterfaceTemperature[iVertex]]
+            self.fluidInterfaceTemperature.setRows(self.manager.getLocalGlobalIndices('fluid'), np.reshape(localFluidInterfaceTemperature, (-1,1))[:self.nf_loc])
 
         self.fluidInterfaceTemperature.assemble()
 
@@ -190,9 +304,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
             localFluidInterfaceNormalHeatFlux = self.FluidSolver.getNodalNormalHeatFlux()
             localFluidInterfaceTemperature = self.FluidSolver.getNodalTemperatures()
             localFluidInterfaceRobinTemperature = localFluidInterfaceTemperature - (localFluidInterfaceNormalHeatFlux/self.heatTransferCoeff)
-            for iVertex in range(self.nf_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('fluid', self.myid, iVertex)
-                self.fluidInterfaceRobinTemperature[iGlobalVertex] = [localFluidInterfaceRobinTemperature[iVertex]]
+            self.fluidInterfaceRobinTemperature.setRows(self.manager.getLocalGlobalIndices('fluid'), np.reshape(localFluidInterfaceRobinTemperature, (-1,1))[:self.nf_loc])
 
         self.fluidInterfaceRobinTemperature.assemble()
 
@@ -204,162 +316,128 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         if self.myid in self.manager.getFluidInterfaceProcessors():
             localFluidInterfaceHeatFlux_X, localFluidInterfaceHeatFlux_Y, localFluidInterfaceHeatFlux_Z = self.FluidSolver.getNodalHeatFluxes()
             localFluidInterfaceNormalHeatFlux = self.FluidSolver.getNodalNormalHeatFlux()
-            for iVertex in range(self.nf_loc):
-                iGlobalVertex = self.manager.getGlobalIndex('fluid', self.myid, iVertex)
-                self.fluidInterfaceHeatFlux[iGlobalVertex] = [localFluidInterfaceHeatFlux_X[iVertex], localFluidInterfaceHeatFlux_Y[iVertex], localFluidInterfaceHeatFlux_Z[iVertex]]
-                self.fluidInterfaceNormalHeatFlux[iGlobalVertex] = [localFluidInterfaceNormalHeatFlux[iVertex]]
+            globalIndices = self.manager.getLocalGlobalIndices('fluid')
+            self.fluidInterfaceHeatFlux.setRows(globalIndices, np.column_stack((localFluidInterfaceHeatFlux_X, localFluidInterfaceHeatFlux_Y, localFluidInterfaceHeatFlux_Z))[:self.nf_loc])
+            self.fluidInterfaceNormalHeatFlux.setRows(globalIndices, np.reshape(localFluidInterfaceNormalHeatFlux, (-1,1))[:self.nf_loc])
 
         self.fluidInterfaceHeatFlux.assemble()
         self.fluidInterfaceNormalHeatFlux.assemble()
 
-    def redistributeDataToFluidSolver(self, fluidInterfaceData):
+    def getRedistributionPlan(self, domain, interfData):
         """
-        Description
+        Returns the redistribution plan of the interface data to the fluid or solid solver.
+        The plan (and the list of local halo nodes) is computed once for each vector layout. Collective call.
         """
 
-        localFluidInterfaceData_array = None
+        key = (domain, interfData.nPoint)
+        if key not in self.redistributionPlans:
+            if domain == 'fluid':
+                interfaceProcessors = self.manager.getFluidInterfaceProcessors()
+                haloNodesList = self.manager.getFluidHaloNodesList()
+                indexing = self.manager.getFluidIndexing()
+            else:
+                interfaceProcessors = self.manager.getSolidInterfaceProcessors()
+                haloNodesList = self.manager.getSolidHaloNodesList()
+                indexing = self.manager.getSolidIndexing()
+
+            if self.myid in interfaceProcessors:
+                haloKeys = list(haloNodesList[self.myid].keys())
+                haloIndices = np.array([indexing[haloKey] for haloKey in haloKeys], dtype=int)
+                globalIndices = np.concatenate((self.manager.getLocalGlobalIndices(domain), haloIndices))
+            else:
+                haloKeys = []
+                globalIndices = np.zeros(0, dtype=int)
+
+            plan = RedistributionPlan(globalIndices, interfData.getOwnershipRange(), self.mpiComm)
+            self.redistributionPlans[key] = (plan, haloKeys)
+
+        return self.redistributionPlans[key]
+
+    @profiled('redistribution')
+    def redistributeData(self, domain, interfData, interfaceProcessors, nLocal, pending=None):
+        """
+        Returns the local (physical) data of the interface processes as a list of component arrays, and the data of their halo nodes as a dict.
+        If given, pending is the redistribution of interfData posted in advance (see postTransferToFluidSolver()).
+        """
+
+        localInterfaceData_array = None
         haloNodesData = {}
 
         if self.mpiComm != None:
-            localSize = fluidInterfaceData.getDataArray(0).shape[0]
-            fluidInterfaceData_array_recon = []
-            for iDim in range(fluidInterfaceData.nDim):
-                array_recon = mpiGatherv(fluidInterfaceData.getDataArray(iDim), localSize, self.nf, self.mpiComm, 0)
-                fluidInterfaceData_array_recon.append(array_recon)
-            haloNodesData = {}
-            haloNodesData_bis = {}
-            if self.myid == 0:
-                for iProc in self.manager.getFluidInterfaceProcessors():
-                    fluidPhysicalInterfaceNodesDistribution = self.manager.getFluidPhysicalInterfaceNodesDistribution()
-                    fluidGlobalIndexRange = self.manager.getFluidGlobalIndexRange()
-                    sendBuff = []
-                    for iDim in range(fluidInterfaceData.nDim):
-                        sendBuff_i = np.zeros(fluidPhysicalInterfaceNodesDistribution[iProc])
-                        sendBuff.append(sendBuff_i)
-                    globalIndex = fluidGlobalIndexRange[iProc][0]
-                    sendBuffHalo = {}
-                    for iVertex in range(fluidPhysicalInterfaceNodesDistribution[iProc]):
-                        for iDim in range(fluidInterfaceData.nDim):
-                            sendBuff[iDim][iVertex] = fluidInterfaceData_array_recon[iDim][globalIndex]
-                        globalIndex += 1
-                    fluidHaloNodesList = self.manager.getFluidHaloNodesList()
-                    fluidIndexing = self.manager.getFluidIndexing()
-                    for key in fluidHaloNodesList[iProc].keys():
-                        globalIndex = fluidIndexing[key]
-                        sendBuffHalo[key] = []
-                        for iDim in range(fluidInterfaceData.nDim):
-                            sendBuffHalo[key].append(fluidInterfaceData_array_recon[iDim][globalIndex])
-                    iTagSend = 1
-                    for iDim in range(fluidInterfaceData.nDim):
-                        self.mpiComm.Isend(sendBuff[iDim], dest=iProc, tag = iTagSend)
-                        iTagSend += 1
-                    #self.mpiComm.send(sendBuffHalo, dest = iProc, tag=iTagSend)
-                    sendBuffHalo_key = np.array(sendBuffHalo.keys())
-                    sendBuffHalo_values = np.empty((sendBuffHalo_key.size, 3),dtype=float)
-                    for ii in range(sendBuffHalo_key.size):
-                        sendBuffHalo_values[ii] = np.array(sendBuffHalo[sendBuffHalo_key[ii]])
-                    self.mpiComm.Isend(np.array(sendBuffHalo_key.size), dest=iProc, tag=101)
-                    self.mpiComm.Isend(sendBuffHalo_key, dest=iProc, tag=102)
-                    self.mpiComm.Isend(sendBuffHalo_values, dest=iProc, tag=103)
-            if self.myid in self.manager.getFluidInterfaceProcessors():
-                localFluidInterfaceData_array = []
-                iTagRec = 1
-                for iDim in range(fluidInterfaceData.nDim):
-                    local_array = np.zeros(self.nf_loc)
-                    req = self.mpiComm.Irecv(local_array, source=0, tag=iTagRec)
-                    req.Wait()
-                    localFluidInterfaceData_array.append(local_array)
-                    iTagRec += 1
-                #haloNodesData = self.mpiComm.recv(source=0, tag=iTagRec)
-                nHaloNodesRcv = np.empty(1, dtype=int)
-                req = self.mpiComm.Irecv(nHaloNodesRcv, source=0, tag=101)
-                req.Wait()
-                rcvBuffHalo_keyBuff = np.empty(nHaloNodesRcv[0], dtype=int)
-                req = self.mpiComm.Irecv(rcvBuffHalo_keyBuff, source=0, tag=102)
-                req.Wait()
-                rcvBuffHalo_values = np.empty((nHaloNodesRcv[0],3), dtype=float)
-                req = self.mpiComm.Irecv(rcvBuffHalo_values, source=0, tag=103)
-                req.Wait()
-                for ii in range(len(rcvBuffHalo_keyBuff)):
-                    haloNodesData_bis[rcvBuffHalo_keyBuff[ii]] = list(rcvBuffHalo_values[ii])
-                haloNodesData = haloNodesData_bis
-
-
-        return (localFluidInterfaceData_array, haloNodesData)
+            plan, haloKeys = self.getRedistributionPlan(domain, interfData)
+            if pending != None:
+                data = pending.wait()
+            else:
+                data = plan.execute(interfData)
+            if self.myid in interfaceProcessors:
+                localInterfaceData_array = [data[:nLocal,iDim].copy() for iDim in range(interfData.nDim)]
+                for ii, haloKey in enumerate(haloKeys):
+                    haloNodesData[haloKey] = list(data[nLocal+ii])
 
-    def redistributeDataToSolidSolver(self, solidInterfaceData):
+        return (localInterfaceData_array, haloNodesData)
+
+    def redistributeDataToFluidSolver(self, fluidInterfaceData, pending=None):
         """
-        Des.
+        Description
         """
 
-        localSolidInterfaceData_array = None
-        haloNodesData = {}
-        haloNodesData_bis = {}
+        return self.redistributeData('fluid', fluidInterfaceData, self.manager.getFluidInterfaceProcessors(), self.nf_loc, pending)
+
+    def postTransferToFluidSolver(self, name, interpolate, fluidInterfaceData):
+        """
+        Starts the transfer name of solid interface data to the fluid solver, to be completed by the corresponding set*ToFluidSolver() call.
+        In parallel, the data are interpolated (interpolate()) and their redistribution is posted as a non-blocking MPI request,
+        in serial the interpolation is run in a worker thread. Collective call.
+        """
 
         if self.mpiComm != None:
-            localSize = solidInterfaceData.getDataArray(0).shape[0]
-            solidInterfaceData_array_recon = []
-            for iDim in range(solidInterfaceData.nDim):
-                array_recon = mpiGatherv(solidInterfaceData.getDataArray(iDim), localSize, self.ns+self.d, self.mpiComm, 0)
-                solidInterfaceData_array_recon.append(array_recon)
-            haloNodesData = {}
-            if self.myid == 0:
-                for iProc in self.manager.getSolidInterfaceProcessors():
-                    solidPhysicalInterfaceNodesDistribution = self.manager.getSolidPhysicalInterfaceNodesDistribution()
-                    solidGlobalIndexRange = self.manager.getSolidGlobalIndexRange()
-                    sendBuff = []
-                    for iDim in range(solidInterfaceData.nDim):
-                        sendBuff_i = np.zeros(solidPhysicalInterfaceNodesDistribution[iProc])
-                        sendBuff.append(sendBuff_i)
-                    globalIndex = solidGlobalIndexRange[iProc][0]
-                    sendBuffHalo = {}
-                    for iVertex in range(solidPhysicalInterfaceNodesDistribution[iProc]):
-                        for iDim in range(solidInterfaceData.nDim):
-                            sendBuff[iDim][iVertex] = solidInterfaceData_array_recon[iDim][globalIndex]
-                        globalIndex += 1
-                    solidHaloNodesList = self.manager.getSolidHaloNodesList()
-                    solidIndexing = self.manager.getSolidIndexing()
-                    for key in solidHaloNodesList[iProc].keys():
-                        globalIndex = solidIndexing[key]
-                        sendBuffHalo[key] = []
-                        for iDim in range(solidInterfaceData.nDim):
-                            sendBuffHalo[key].append(solidInterfaceData_array_recon[iDim][globalIndex])
-                    iTagSend = 1
-                    for iDim in range(solidInterfaceData.nDim):
-                        self.mpiComm.Isend(sendBuff[iDim], dest=iProc, tag = iTagSend)
-                        iTagSend += 1
-                    #self.mpiComm.send(sendBuffHalo, dest = iProc, tag=iTagSend)
-                    sendBuffHalo_key = np.array(sendBuffHalo.keys())
-                    sendBuffHalo_values = np.empty((sendBuffHalo_key.size, 3),dtype=float)
-                    for ii in range(sendBuffHalo_key.size):
-                        sendBuffHalo_values[ii] = np.array(sendBuffHalo[sendBuffHalo_key[ii]])
-                    self.mpiComm.Isend(np.array(sendBuffHalo_key.size), dest=iProc, tag=101)
-                    self.mpiComm.Isend(sendBuffHalo_key, dest=iProc, tag=102)
-                    self.mpiComm.Isend(sendBuffHalo_values, dest=iProc, tag=103)
-            if self.myid in self.manager.getSolidInterfaceProcessors():
-                localSolidInterfaceData_array = []
-                iTagRec = 1
-                for iDim in range(solidInterfaceData.nDim):
-                    local_array = np.zeros(self.ns_loc)
-                    req = self.mpiComm.Irecv(local_array, source=0, tag = iTagRec)
-                    req.Wait()
-                    localSolidInterfaceData_array.append(local_array)
-                    iTagRec += 1
-                #haloNodesData = self.mpiComm.recv(source=0, tag=iTagRec)
-                nHaloNodesRcv = np.empty(1, dtype=int)
-                req = self.mpiComm.Irecv(nHaloNodesRcv, source=0, tag=101)
-                req.Wait()
-                rcvBuffHalo_keyBuff = np.empty(nHaloNodesRcv[0], dtype=int)
-                req = self.mpiComm.Irecv(rcvBuffHalo_keyBuff, source=0, tag=102)
-                req.Wait()
-                rcvBuffHalo_values = np.empty((nHaloNodesRcv[0],3), dtype=float)
-                req = self.mpiComm.Irecv(rcvBuffHalo_values, source=0, tag=103)
-                req.Wait()
-                for ii in range(len(rcvBuffHalo_keyBuff)):
-                    haloNodesData_bis[rcvBuffHalo_keyBuff[ii]] = list(rcvBuffHalo_values[ii])
-                haloNodesData = haloNodesData_bis
-
-        return (localSolidInterfaceData_array, haloNodesData)
+            interpolate()
+            plan, haloKeys = self.getRedistributionPlan('fluid', fluidInterfaceData)
+            self.pendingTransfers[name] = plan.post(fluidInterfaceData)
+        else:
+            self.pendingTransfers[name] = AsyncTask(interpolate)
+
+    def postDisplacementToFluidSolver(self):
+        """
+        Des.
+        """
+
+        self.postTransferToFluidSolver('displacement', self.interpolateSolidDisplacementOnFluidMesh, self.fluidInterfaceDisplacement)
+
+    def postThermalDataToFluidSolver(self):
+        """
+        Des.
+        """
+
+        if self.chtTransferMethod == 'TFFB' or self.chtTransferMethod == 'hFFB':
+            self.postTransferToFluidSolver('heatFlux', self.interpolateSolidHeatFluxOnFluidMesh, self.fluidInterfaceHeatFlux)
+        elif self.chtTransferMethod == 'FFTB' or self.chtTransferMethod == 'hFTB':
+            self.postTransferToFluidSolver('temperature', self.interpolateSolidTemperatureOnFluidMesh, self.fluidInterfaceTemperature)
+
+    def isTransferPending(self, name):
+        """
+        Des.
+        """
+
+        return name in self.pendingTransfers
+
+    def completeTransfer(self, name):
+        """
+        Waits for the interpolation of a posted transfer (serial) or returns its pending redistribution (parallel), None if the transfer has not been posted.
+        """
+
+        pending = self.pendingTransfers.pop(name, None)
+        if pending != None and self.mpiComm == None:
+            pending.wait()
+            pending = None
+        return pending
+
+    def redistributeDataToSolidSolver(self, solidInterfaceData):
+        """
+        Des.
+        """
+
+        return self.redistributeData('solid', solidInterfaceData, self.manager.getSolidInterfaceProcessors(), self.ns_loc)
 
     def setLoadsToSolidSolver(self, time):
         """
@@ -400,10 +478,12 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         Des.
         """
 
+        pending = self.completeTransfer('displacement')
+
         self.checkConservation()
 
         if self.mpiComm != None:
-            (localFluidInterfaceDisplacement, haloNodesDisplacements) = self.redistributeDataToFluidSolver(self.fluidInterfaceDisplacement)
+            (localFluidInterfaceDisplacement, haloNodesDisplacements) = self.redistributeDataToFluidSolver(self.fluidInterfaceDisplacement, pending)
             if self.myid in self.manager.getFluidInterfaceProcessors():
                 self.FluidSolver.applyNodalDisplacements(localFluidInterfaceDisplacement[0], localFluidInterfaceDisplacement[1], localFluidInterfaceDisplacement[2], localFluidInterfaceDisplacement[0], localFluidInterfaceDisplacement[1], localFluidInterfaceDisplacement[2], haloNodesDisplacements, time)
         else:
@@ -414,8 +494,10 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         Description.
         """
 
+        pending = self.completeTransfer('heatFlux')
+
         if self.mpiComm != None:
-            (localFluidInterfaceHeatFlux, haloNodesHeatFlux) = self.redistributeDataToFluidSolver(self.fluidInterfaceHeatFlux)
+            (localFluidInterfaceHeatFlux, haloNodesHeatFlux) = self.redistributeDataToFluidSolver(self.fluidInterfaceHeatFlux, pending)
             if self.myid in self.manager.getFluidInterfaceProcessors():
                 self.FluidSolver.applyNodalHeatFluxes(localFluidInterfaceHeatFlux[0], localFluidInterfaceHeatFlux[1], localFluidInterfaceHeatFlux[2], time)
         else:
@@ -426,8 +508,10 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         Des.
         """
 
+        pending = self.completeTransfer('temperature')
+
         if self.mpiComm != None:
-            (localFluidInterfaceTemperature, haloNodesTemperature) = self.redistributeDataToFluidSolver(self.fluidInterfaceTemperature)
+            (localFluidInterfaceTemperature, haloNodesTemperature) = self.redistributeDataToFluidSolver(self.fluidInterfaceTemperature, pending)
             if self.myid in self.manager.getFluidInterfaceProcessors():
                 self.FluidSolver.applyNodalTemperatures(localFluidInterfaceTemperature[0], time)
         else:
@@ -473,6 +557,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         else:
             self.SolidSolver.applyNodalNormalHeatFluxes(self.solidInterfaceNormalHeatFlux.getDataArray(0), time)
 
+    @profiled('interpolation')
     def interpolateFluidLoadsOnSolidMesh(self):
         """
         Description
@@ -480,6 +565,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         self.interpolateFluidToSolid(self.fluidInterfaceLoads, self.solidInterfaceLoads)
 
+    @profiled('interpolation')
     def interpolateSolidDisplacementOnFluidMesh(self):
         """
         Description.
@@ -487,6 +573,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         self.interpolateSolidToFluid(self.solidInterfaceDisplacement, self.fluidInterfaceDisplacement)
 
+    @profiled('interpolation')
     def interpolateSolidHeatFluxOnFluidMesh(self):
         """
         Description.
@@ -495,6 +582,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         self.interpolateSolidToFluid(self.solidInterfaceHeatFlux, self.fluidInterfaceHeatFlux)
 
 
+    @profiled('interpolation')
     def interpolateSolidTemperatureOnFluidMesh(self):
         """
         Description
@@ -502,6 +590,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         self.interpolateSolidToFluid(self.solidInterfaceTemperature, self.fluidInterfaceTemperature)
 
+    @profiled('interpolation')
     def interpolateFluidHeatFluxOnSolidMesh(self):
         """
         Description.
@@ -510,6 +599,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
         self.interpolateFluidToSolid(self.fluidInterfaceHeatFlux, self.solidInterfaceHeatFlux)
         self.interpolateFluidToSolid(self.fluidInterfaceNormalHeatFlux, self.solidInterfaceNormalHeatFlux)
 
+    @profiled('interpolation')
     def interpolateFluidTemperatureOnSolidMesh(self):
         """
         Description.
@@ -517,6 +607,7 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         self.interpolateFluidToSolid(self.fluidInterfaceTemperature, self.solidInterfaceTemperature)
 
+    @profiled('interpolation')
     def interpolateFluidRobinTemperatureOnSolidMesh(self):
         """
         Des.
@@ -545,17 +636,35 @@ class InterfaceInterpolator(ccupydo.CInterpolator):
 
         return self.d
 
+    def getState(self):
+        """
+        Returns a copy of the local rows of the interface data, restored by setState() (see checkpoint.py).
+        """
+
+        state = {}
+        for name in self.interfaceDataNames:
+            state[name] = getInterfaceDataState(getattr(self, name))
+        return state
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        for name in self.interfaceDataNames:
+            setInterfaceDataState(getattr(self, name), state.get(name))
+
 class MatchingMeshesInterpolator(InterfaceInterpolator):
     """
     Description.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, nThreads=1, cacheDir=None):
         """
         Description
         """
 
-        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, nThreads, cacheDir)
 
         mpiPrint('\nSetting matching meshes interpolator...', mpiComm)
 
@@ -629,9 +738,18 @@ class MatchingMeshesInterpolator(InterfaceInterpolator):
         fluidInterfaceProcessors = self.manager.getFluidInterfaceProcessors()
         solidPhysicalInterfaceNodesDistribution = self.manager.getSolidPhysicalInterfaceNodesDistribution()
 
+        self.mappingTimer.start()
+
+        if self.cache != None:
+            self.cache.setKey(self)
+            if self.cache.isAvailable():
+                self.cache.loadMatrices({'H': self.H, 'H_T': self.H_T})
+                self.mappingTimer.stop()
+                self.mappingTimer.cumul()
+                return
+
         mpiPrint('\nBuilding interpolation matrix...', self.mpiComm)
         mpiPrint('\nBuilding matrix H of size {} X {}...'.format(self.nf, self.ns), self.mpiComm)
-        self.mappingTimer.start()
 
         if self.mpiComm != None:
             for iProc in solidInterfaceProcessors:
@@ -671,6 +789,9 @@ class MatchingMeshesInterpolator(InterfaceInterpolator):
         mpiPrint('Assembly performed in {} s'.format(stop-start), self.mpiComm)
         mpiPrint('Matrix H is built.', self.mpiComm)
 
+        if self.cache != None:
+            self.cache.save({'H': self.H, 'H_T': self.H_T})
+
         self.mappingTimer.stop()
         self.mappingTimer.cumul()
 
@@ -718,12 +839,12 @@ class ConservativeInterpolator(InterfaceInterpolator):
     Description.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, nThreads=1, cacheDir=None):
         """
         Des.
         """
 
-        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, nThreads, cacheDir)
 
         mpiPrint('\nSetting non-matching conservative interpolator...', mpiComm)
 
@@ -800,6 +921,14 @@ class ConservativeInterpolator(InterfaceInterpolator):
         fluidInterfaceProcessors = self.manager.getFluidInterfaceProcessors()
         solidPhysicalInterfaceNodesDistribution = self.manager.getSolidPhysicalInterfaceNodesDistribution()
 
+        if self.cache != None:
+            self.cache.setKey(self)
+            if self.cache.isAvailable():
+                self.cache.loadMatrices({'A': self.A, 'A_T': self.A_T, 'B': self.B, 'B_T': self.B_T})
+                self.SolverA = LinearSolver(self.A, self.mpiComm, self.cache.loadFactorization('A'))
+                self.SolverA_T = LinearSolver(self.A_T, self.mpiComm, self.cache.loadFactorization('A_T'))
+                return
+
         mpiPrint('\nBuilding interpolation matrices...', self.mpiComm)
 
         mpiPrint('\nBuilding matrix A of size {} X {}...'.format(self.ns, self.ns), self.mpiComm)
@@ -877,6 +1006,9 @@ class ConservativeInterpolator(InterfaceInterpolator):
         self.SolverA = LinearSolver(self.A, self.mpiComm)
         self.SolverA_T = LinearSolver(self.A_T, self.mpiComm)
 
+        if self.cache != None:
+            self.cache.save({'A': self.A, 'A_T': self.A_T, 'B': self.B, 'B_T': self.B_T}, {'A': self.SolverA, 'A_T': self.SolverA_T})
+
     def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
         """
         des.
@@ -905,12 +1037,12 @@ class ConsistentInterpolator(InterfaceInterpolator):
     Description.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, nThreads=1, cacheDir=None):
         """
         Des.
         """
 
-        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        InterfaceInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, nThreads, cacheDir)
 
         mpiPrint('\nSetting non-matching consistent interpolator...', mpiComm)
 
@@ -982,6 +1114,14 @@ class ConsistentInterpolator(InterfaceInterpolator):
         solidPhysicalInterfaceNodesDistribution = self.manager.getSolidPhysicalInterfaceNodesDistribution()
         fluidPhysicalInterfaceNodesDistribution = self.manager.getFluidPhysicalInterfaceNodesDistribution()
 
+        if self.cache != None:
+            self.cache.setKey(self)
+            if self.cache.isAvailable():
+                self.cache.loadMatrices({'A': self.A, 'B': self.B, 'C': self.C, 'D': self.D})
+                self.SolverA = LinearSolver(self.A, self.mpiComm, self.cache.loadFactorization('A'))
+                self.SolverC = LinearSolver(self.C, self.mpiComm, self.cache.loadFactorization('C'))
+                return
+
         mpiPrint('\nBuilding interpolation matrices...', self.mpiComm)
 
         mpiPrint('\nBuilding matrix A of size {} X {}...'.format(self.ns, self.ns), self.mpiComm)
@@ -1089,6 +1229,9 @@ class ConsistentInterpolator(InterfaceInterpolator):
         self.SolverA = LinearSolver(self.A, self.mpiComm)
         self.SolverC = LinearSolver(self.C, self.mpiComm)
 
+        if self.cache != None:
+            self.cache.save({'A': self.A, 'B': self.B, 'C': self.C, 'D': self.D}, {'A': self.SolverA, 'C': self.SolverC})
+
     def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
         """
         des.
@@ -1116,12 +1259,12 @@ class RBFInterpolator(ConservativeInterpolator):
     Description.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, RBFradius=0.1, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, RBFradius=0.1, mpiComm = None, chtTransferMethod=None, heatTransferCoeff=1.0, nThreads=1, cacheDir=None):
         """"
         Description.
         """
 
-        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, nThreads, cacheDir)
 
         mpiPrint('\nSetting interpolation with Radial Basis Functions...', mpiComm)
 
@@ -1178,12 +1321,12 @@ class ConsistentRBFInterpolator(ConsistentInterpolator):
     Description.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, RBFradius = 0.1, mpiComm= None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, RBFradius = 0.1, mpiComm= None, chtTransferMethod=None, heatTransferCoeff=1.0, nThreads=1, cacheDir=None):
         """
         Des.
         """
 
-        ConsistentInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        ConsistentInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, nThreads, cacheDir)
 
         mpiPrint('\nSetting interpolation with Radial Basis Functions...', mpiComm)
 
@@ -1249,12 +1392,12 @@ class TPSInterpolator(ConservativeInterpolator):
     Des.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm=None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm=None, chtTransferMethod=None, heatTransferCoeff=1.0, nThreads=1, cacheDir=None):
         """
         des.
         """
 
-        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, nThreads, cacheDir)
 
         mpiPrint('\nSetting interpolation with Thin Plate Spline...', self.mpiComm)
 
@@ -1307,12 +1450,12 @@ class ConsistentTPSInterpolator(ConsistentInterpolator):
     Description.
     """
 
-    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm= None, chtTransferMethod=None, heatTransferCoeff=1.0):
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm= None, chtTransferMethod=None, heatTransferCoeff=1.0, nThreads=1, cacheDir=None):
         """
         Des.
         """
 
-        ConsistentInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff)
+        ConsistentInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, nThreads, cacheDir)
 
         mpiPrint('\nSetting consistent interpolation with Thin Plate Spline...', self.mpiComm)
 
@@ -1369,3 +1512,100 @@ class ConsistentTPSInterpolator(ConsistentInterpolator):
                                               fluidInterfaceBuffRcv_X, fluidInterfaceBuffRcv_Y, fluidInterfaceBuffRcv_Z, self.C, iProc)
         stop = tm.time()
         print('Built C on rank {} in {} s'.format(self.myid,stop-start))
+
+class HierarchicalTPSInterpolator(ConservativeInterpolator):
+    """
+    Conservative Thin Plate Spline interpolator for large interfaces (serial only).
+    The dense TPS kernel blocks are replaced by H-matrices (near-field + ACA compressed far-field)
+    and the TPS system is solved by preconditioned GMRES (see HMatrixLinearSolver).
+    """
+
+    def __init__(self, Manager, FluidSolver, SolidSolver, mpiComm=None, chtTransferMethod=None, heatTransferCoeff=1.0, nThreads=1, cacheDir=None):
+        """
+        des.
+        """
+
+        ConservativeInterpolator.__init__(self, Manager, FluidSolver, SolidSolver, mpiComm, chtTransferMethod, heatTransferCoeff, nThreads, cacheDir)
+
+        mpiPrint('\nSetting interpolation with hierarchical Thin Plate Spline...', self.mpiComm)
+
+        if self.mpiComm != None:
+            raise Exception("Hierarchical TPS interpolator is only available in serial ! ")
+
+        self.generateInterfaceData()
+
+        self.generateMapping()
+
+    def generateInterfaceData(self):
+        """
+        Des.
+        """
+
+        ConservativeInterpolator.generateInterfaceData(self)
+
+        mpiPrint('Generating interface data for hierarchical TPS interpolator...', self.mpiComm)
+
+        # A and B are replaced by H-matrices (see generateMapping)
+        self.A = None
+        self.A_T = None
+        self.B = None
+        self.B_T = None
+
+    def generateMapping(self):
+        """
+        Des.
+        """
+
+        if self.cache != None:
+            mpiPrint('Interpolation cache not available for the hierarchical TPS interpolator.', self.mpiComm)
+
+        solidPoints = np.column_stack(self.SolidSolver.getNodalInitialPositions())[:,:self.nDim]
+        fluidPoints = np.column_stack(self.FluidSolver.getNodalInitialPositions())[:,:self.nDim]
+        self.Ps = np.column_stack((np.ones(self.ns), solidPoints))
+        self.Pf = np.column_stack((np.ones(self.nf), fluidPoints))
+
+        mpiPrint('\nBuilding hierarchical matrix A of size {} X {}...'.format(self.ns, self.ns), self.mpiComm)
+        start = tm.time()
+        self.PhiSS = HMatrix(solidPoints, solidPoints, PHI_TPS)
+        stop = tm.time()
+        mpiPrint('Built A in {} s (compression ratio {})'.format(stop-start, self.PhiSS.getCompressionRatio()), self.mpiComm)
+
+        mpiPrint('\nBuilding hierarchical matrix B of size {} X {}...'.format(self.nf, self.ns), self.mpiComm)
+        start = tm.time()
+        self.PhiFS = HMatrix(fluidPoints, solidPoints, PHI_TPS)
+        stop = tm.time()
+        mpiPrint('Built B in {} s (compression ratio {})'.format(stop-start, self.PhiFS.getCompressionRatio()), self.mpiComm)
+
+        mpiPrint('\nBuilding preconditioner...', self.mpiComm)
+        start = tm.time()
+        self.SolverA = HMatrixLinearSolver(self.PhiSS, self.Ps, solidPoints, PHI_TPS)
+        # A is symmetric (the initial guesses of the two transfers are kept apart, see solveArray())
+        self.SolverA_T = self.SolverA
+        stop = tm.time()
+        mpiPrint('Built preconditioner in {} s'.format(stop-start), self.mpiComm)
+
+    def interpolateFluidToSolid(self, fluidInterfaceData, solidInterfaceData):
+        """
+        des.
+        """
+
+        dim = fluidInterfaceData.getDim()
+        F = np.column_stack([fluidInterfaceData.getData(iDim) for iDim in range(dim)])
+
+        gamma = np.vstack((self.PhiFS.rdot(F), self.Pf.T.dot(F)))
+        X = self.SolverA_T.solveArray(gamma, 'A_T')
+        for iDim in range(dim):
+            solidInterfaceData.setData(iDim, X[:,iDim])
+
+    def interpolateSolidToFluid(self, solidInterfaceData, fluidInterfaceData):
+        """
+        Des.
+        """
+
+        dim = solidInterfaceData.getDim()
+        S = np.column_stack([solidInterfaceData.getData(iDim) for iDim in range(dim)])
+
+        gamma = self.SolverA.solveArray(S, 'A')
+        X = self.PhiFS.dot(gamma[:self.ns]) + self.Pf.dot(gamma[self.ns:])
+        for iDim in range(dim):
+            fluidInterfaceData.setData(iDim, X[:,iDim])
@@ -29,10 +29,15 @@ Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
 
 import numpy as np
 import scipy as sp
+import scipy.linalg as linalg
+import scipy.sparse as sparse
 import scipy.sparse.linalg as splinalg
+from scipy.spatial import cKDTree as KDTree
 import sys
 
 import ccupydo
+from profiler import profiled
+from utilities import mpiPrint, Logger
 
 np.set_printoptions(threshold=sys.maxsize)
 
@@ -46,12 +51,14 @@ class LinearSolver(ccupydo.CLinearSolver):
     Designed to be used with InterfaceData and InterfaceMatrix classes.
     Inherited public members :
         -solve()
+    In serial, the operator is factorized once at construction and the factorization is reused by every solve.
     """
 
-    def __init__(self, MatrixOperator, mpiComm=None):
+    def __init__(self, MatrixOperator, mpiComm=None, LU=None):
         """
         Constructor.
         MatrixOperator is of type InterfaceMatrix
+        LU is an optional dense factorization of MatrixOperator (as returned by getFactorization()), reused instead of factorizing again.
         """
 
         ccupydo.CLinearSolver.__init__(self, MatrixOperator)
@@ -60,7 +67,33 @@ class LinearSolver(ccupydo.CLinearSolver):
 
         if mpiComm == None:
             self.LinOperator = MatrixOperator.getMat()
+            if LU != None and not sparse.issparse(self.LinOperator):
+                self.LU = LU
+            else:
+                self.factorize()
 
+    def factorize(self):
+        """
+        Factorizes the serial operator : sparse LU (RBF) or dense LU (TPS).
+        The RBF/TPS systems are symmetric but indefinite (polynomial block), hence LU rather than Cholesky.
+        """
+
+        if sparse.issparse(self.LinOperator):
+            self.LU = splinalg.splu(sparse.csc_matrix(self.LinOperator))
+        else:
+            self.LU = linalg.lu_factor(self.LinOperator)
+
+    def getFactorization(self):
+        """
+        Returns the dense factorization (lu, piv) of the serial operator, or None if it cannot be stored (sparse LU, parallel).
+        """
+
+        if self.mpiComm == None and not sparse.issparse(self.LinOperator):
+            return self.LU
+        else:
+            return None
+
+    @profiled('linearSolve')
     def solve(self, DataB, DataX):
         """
         Solve system MatrixOperator*VecX = VecB.
@@ -71,6 +104,150 @@ class LinearSolver(ccupydo.CLinearSolver):
             ccupydo.CLinearSolver.solve(self, DataB, DataX)
         else:
             dim = DataB.getDim()
+            B = np.column_stack([DataB.getData(iDim) for iDim in range(dim)])
+            if sparse.issparse(self.LinOperator):
+                X = self.LU.solve(B)
+            else:
+                X = linalg.lu_solve(self.LU, B)
             for iDim in range(dim):
-                XX = splinalg.spsolve(self.LinOperator, DataB.getData(iDim))
-                DataX.setData(iDim, XX)
+                DataX.setData(iDim, X[:,iDim])
+
+# ----------------------------------------------------------------------
+#  H-matrix linear solver class
+# ----------------------------------------------------------------------
+
+class HMatrixLinearSolver(object):
+    """
+    Serial iterative solver (GMRES) of the radial basis function interpolation system
+        [Phi  P] [lambda]   [f]
+        [P^T  0] [  a   ] = [g]
+    where Phi is stored as an H-matrix (see hmatrix.py) and P = [1, x, y, (z)].
+    The system is right preconditioned by approximate cardinal functions. For each node, they are computed from the
+    interpolation problem restricted to its nNeighbours closest nodes (near-field) and to nCoarse nodes spread over the
+    whole interface (which makes them decay far from the node). Their coefficients satisfy the polynomial constraints,
+    so the iterations only have to find the cardinal weights of the nodes and the polynomial coefficients
+    (the cardinal functions of d unisolvent nodes are replaced by the polynomial unknowns).
+    GMRES starts from the previous solution of the same system (right-hand sides of the same key and component).
+    Same interface as LinearSolver.
+    """
+
+    def __init__(self, Phi, P, points, kernel, nNeighbours=50, nCoarse=50, tol=1e-7, maxIter=1000):
+        """
+        Constructor.
+        Phi is of type HMatrix, P is the (n x d) polynomial matrix, points is the (n x nDim) array of nodes.
+        """
+
+        self.Phi = Phi
+        self.P = P
+        self.tol = tol
+        self.maxIter = maxIter
+        self.n, self.d = P.shape
+        self.lastSolutions = {}
+
+        # d unisolvent nodes, chosen by a pivoted QR of P^T
+        piv = linalg.qr(P.T, mode='r', pivoting=True)[1]
+        self.unisolventNodes = np.sort(piv[:self.d])
+        self.otherNodes = np.setdiff1d(np.arange(self.n), self.unisolventNodes)
+        self.PInv = linalg.inv(P[self.unisolventNodes].T)
+
+        coarseNodes = self.__getCoarseNodes(points, min(max(nCoarse, self.d), self.n))
+        self.C = self.__computeCardinalFunctions(points, kernel, coarseNodes, min(nNeighbours, self.n - len(coarseNodes)))
+        self.Operator = splinalg.LinearOperator((self.n, self.n), matvec=self.__matvec)
+
+    def __getCoarseNodes(self, points, nCoarse):
+        """
+        Farthest point sampling of the nodes, starting from the unisolvent ones.
+        """
+
+        coarseNodes = list(self.unisolventNodes)
+        dist = np.min([np.linalg.norm(points - points[iNode], axis=1) for iNode in coarseNodes], axis=0)
+        while len(coarseNodes) < nCoarse:
+            iNode = np.argmax(dist)
+            coarseNodes.append(iNode)
+            dist = np.minimum(dist, np.linalg.norm(points - points[iNode], axis=1))
+        return np.array(coarseNodes)
+
+    def __computeCardinalFunctions(self, points, kernel, coarseNodes, k, chunkSize=200):
+        """
+        Returns the sparse (n x n-d) matrix of the approximate cardinal function coefficients of the other nodes.
+        """
+
+        fineNodes = np.setdiff1d(np.arange(self.n), coarseNodes)
+        neighbours = np.zeros((len(self.otherNodes), k+len(coarseNodes)), dtype=int)
+        if k > 0:
+            neighbours[:,:k] = fineNodes[KDTree(points[fineNodes]).query(points[self.otherNodes], k)[1].reshape(-1, k)]
+        neighbours[:,k:] = coarseNodes
+        kk = neighbours.shape[1]
+
+        rows, cols, values = [], [], []
+        for start in range(0, len(self.otherNodes), chunkSize):
+            nb = neighbours[start:start+chunkSize]
+            m = nb.shape[0]
+            X = points[nb]
+            ALoc = np.zeros((m, kk+self.d, kk+self.d))
+            ALoc[:,:kk,:kk] = kernel(np.sqrt(np.sum((X[:,:,np.newaxis,:] - X[:,np.newaxis,:,:])**2, axis=3)))
+            ALoc[:,:kk,kk:] = self.P[nb]
+            ALoc[:,kk:,:kk] = np.transpose(self.P[nb], (0,2,1))
+            # the cardinal function is 1 on the node itself, 0 on the other ones
+            rhs = np.zeros((m, kk+self.d, 1))
+            rhs[:,:kk,0] = (nb == self.otherNodes[start:start+m,np.newaxis])
+            try:
+                coeffs = np.linalg.solve(ALoc, rhs)[:,:kk,0]
+            except np.linalg.LinAlgError:
+                coeffs = np.matmul(np.linalg.pinv(ALoc), rhs)[:,:kk,0]
+            rows.append(nb.ravel())
+            cols.append(np.repeat(np.arange(start, start+m), kk))
+            values.append(coeffs.ravel())
+
+        return sparse.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(self.n, len(self.otherNodes)))
+
+    def __matvec(self, v):
+        """
+        Preconditioned operator.
+        """
+
+        return self.Phi.dot(self.C.dot(v[self.otherNodes])) + self.P.dot(v[self.unisolventNodes])
+
+    def setMaxNumberIterations(self, maxIter):
+        """
+        Des.
+        """
+
+        self.maxIter = maxIter
+
+    @profiled('linearSolve')
+    def solveArray(self, B, key=None):
+        """
+        Solves the system for each column of the (n+d x dim) array B.
+        key identifies the sequence of right-hand sides the previous solutions are taken from as initial guesses
+        (e.g. the displacement and the load transfers, which share the matrix but not the scale of their solutions).
+        """
+
+        X = np.zeros_like(B)
+        for iDim in range(B.shape[1]):
+            f, g = B[:self.n,iDim], B[self.n:,iDim]
+            # particular solution of the polynomial constraints P^T*lambda = g, supported by the unisolvent nodes
+            lambda0 = np.zeros(self.n)
+            lambda0[self.unisolventNodes] = self.PInv.dot(g)
+            rhs = f - self.Phi.dot(lambda0)
+            if np.linalg.norm(rhs) == 0.0:
+                v = np.zeros(self.n)
+            else:
+                v, info = splinalg.gmres(self.Operator, rhs, x0=self.lastSolutions.get((key, iDim)), tol=self.tol, restart=100, maxiter=self.maxIter)
+                if info > 0:
+                    mpiPrint('WARNING: GMRES did not converge in {} iterations'.format(info), None, Logger.WARNING)
+            self.lastSolutions[(key, iDim)] = v
+            X[:self.n,iDim] = lambda0 + self.C.dot(v[self.otherNodes])
+            X[self.n:,iDim] = v[self.unisolventNodes]
+        return X
+
+    def solve(self, DataB, DataX):
+        """
+        Solve system MatrixOperator*VecX = VecB.
+        VecX and VecB are InterfaceData types.
+        """
+
+        dim = DataB.getDim()
+        X = self.solveArray(np.column_stack([DataB.getData(iDim) for iDim in range(dim)]))
+        for iDim in range(dim):
+            DataX.setData(iDim, X[:,iDim])
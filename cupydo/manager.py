@@ -45,6 +45,8 @@ class Manager(ccupydo.CManager):
     Inherited public members :
         -setGlobalIndexing()
         -getGlobalIndex()
+        -getGlobalIndexRange()
+        -getLocalGlobalIndices()
     """
 
     def __init__(self, FluidSolver, SolidSolver, nDim, computationType='steady', mpiComm=None):
@@ -142,7 +144,8 @@ class Manager(ccupydo.CManager):
         mpiBarrier(mpiComm)
 
         # --- Get the list of the halo nodes on the f/s interface --- #
-        self.fluidHaloNodesList = FluidSolver.haloNodeList
+        if myid in self.fluidSolverProcessors:
+            self.fluidHaloNodesList = FluidSolver.haloNodeList
         if myid in self.solidSolverProcessors:
             self.solidHaloNodesList = SolidSolver.haloNodeList
         if self.mpiComm != None:
@@ -153,7 +156,8 @@ class Manager(ccupydo.CManager):
             self.solidHaloNodesList = [{}]
 
         # --- Get the number of physical (= not halo) nodes on the f/s interface --- #
-        self.nLocalFluidInterfacePhysicalNodes = FluidSolver.nPhysicalNodes
+        if myid in self.fluidSolverProcessors:
+            self.nLocalFluidInterfacePhysicalNodes = FluidSolver.nPhysicalNodes
         if myid in self.solidSolverProcessors:
             self.nLocalSolidInterfacePhysicalNodes = SolidSolver.nPhysicalNodes
 
@@ -211,6 +215,10 @@ class Manager(ccupydo.CManager):
             self.solidGlobalIndexRange = list()
             self.solidGlobalIndexRange.append(temp)
 
+        # --- Store the (contiguous) global indices of the local physical interface nodes --- #
+        self.fluidLocalGlobalIndices = np.arange(self.fluidGlobalIndexRange[myid][0], self.fluidGlobalIndexRange[myid][0] + self.nLocalFluidInterfacePhysicalNodes, dtype=np.int32)
+        self.solidLocalGlobalIndices = np.arange(self.solidGlobalIndexRange[myid][0], self.solidGlobalIndexRange[myid][0] + self.nLocalSolidInterfacePhysicalNodes, dtype=np.int32)
+
         # --- Map the FSI indexing with the solvers indexing --- #
         fluidIndexing_temp = {}
         localIndex = 0
@@ -246,19 +254,51 @@ class Manager(ccupydo.CManager):
             self.solidIndexing = solidIndexing_temp.copy()
         del fluidIndexing_temp, solidIndexing_temp
 
+    def getGlobalIndexRange(self, domain, iProc):
+        """
+        Returns the (start, stop) global indices of the physical interface nodes of iProc.
+        domain is 'fluid'/'solid' or CManager.FLUID/CManager.SOLID.
+        """
+
+        if domain in ('fluid', ccupydo.CManager.FLUID):
+            return self.fluidGlobalIndexRange[iProc]
+        elif domain in ('solid', ccupydo.CManager.SOLID):
+            return self.solidGlobalIndexRange[iProc]
+        else:
+            raise NameError('Unknown domain {}'.format(domain))
+
     def getGlobalIndex(self, domain, iProc, iLocalVertex):
         """
         Description.
         """
 
-        if domain == 'fluid':
-            globalStartIndex = self.fluidGlobalIndexRange[iProc][0]
-        elif domain == 'solid':
-            globalStartIndex = self.solidGlobalIndexRange[iProc][0]
+        globalStartIndex = self.getGlobalIndexRange(domain, iProc)[0]
         globalIndex = globalStartIndex + iLocalVertex
 
         return globalIndex
 
+    def getGlobalIndices(self, domain, iProc, iLocalVertices):
+        """
+        Vectorized getGlobalIndex, returns the global indices of an array of local indices.
+        """
+
+        globalStartIndex = self.getGlobalIndexRange(domain, iProc)[0]
+
+        return globalStartIndex + np.asarray(iLocalVertices, dtype=int)
+
+    def getLocalGlobalIndices(self, domain):
+        """
+        Returns the global indices of the local physical interface nodes (precomputed, int32).
+        domain is 'fluid'/'solid' or CManager.FLUID/CManager.SOLID.
+        """
+
+        if domain in ('fluid', ccupydo.CManager.FLUID):
+            return self.fluidLocalGlobalIndices
+        elif domain in ('solid', ccupydo.CManager.SOLID):
+            return self.solidLocalGlobalIndices
+        else:
+            raise NameError('Unknown domain {}'.format(domain))
+
     def getNumberOfFluidInterfaceNodes(self):
         """
         Description.
@@ -287,6 +327,13 @@ class Manager(ccupydo.CManager):
 
         return self.nLocalSolidInterfacePhysicalNodes
 
+    def getFluidSolverProcessors(self):
+        """
+        Des.
+        """
+
+        return self.fluidSolverProcessors
+
     def getSolidSolverProcessors(self):
         """
         Des.
@@ -0,0 +1,242 @@
+#! /usr/bin/env python
+# -*- coding: utf8 -*-
+
+'''
+
+Copyright 2018 University of Liège
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+predictor.py
+Predictors of the interface data at the beginning of a time step.
+Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
+
+'''
+
+# ----------------------------------------------------------------------
+#  Imports
+# ----------------------------------------------------------------------
+
+import numpy as np
+
+from utilities import RingBuffer
+
+# ----------------------------------------------------------------------
+#  Predictor class
+# ----------------------------------------------------------------------
+
+class Predictor(object):
+    """
+    Base class of the predictors.
+    The converged interface data of the last time steps are kept in a ring buffer (local rows only, so that the prediction does not need any communication).
+    At the end of each time step, update() stores the converged data and predict() sets the initial guess of the next time step.
+    """
+
+    needsVelocity = False
+
+    def __init__(self, historySize):
+        """
+        Des.
+        """
+
+        self.history = RingBuffer(historySize)
+
+    def reset(self):
+        """
+        Des.
+        """
+
+        self.history.reset()
+
+    def update(self, interfData):
+        """
+        Stores the converged interfData (FlexInterfaceData) of the time step.
+        """
+
+        with interfData.localView() as view:
+            self.history.push(view)
+
+    def getState(self):
+        """
+        Returns a copy of the history (local rows), restored by setState().
+        """
+
+        return {'history': self.history.getState()}
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        self.history.setState(state['history'])
+
+    def predict(self, interfData, deltaT, velocity=None, velocityNm1=None):
+        """
+        Sets interfData to the prediction for the next time step (velocity and velocityNm1 are only used by the velocity based predictor).
+        """
+
+        pass
+
+    def describe(self):
+        """
+        Des.
+        """
+
+        return 'No predictor.'
+
+class VelocityPredictor(Predictor):
+    """
+    First or second order prediction of the solid interface displacement from the solid interface velocity (current and previous time step).
+    """
+
+    needsVelocity = True
+
+    def __init__(self, order=2, alpha_0=1.0, alpha_1=0.5):
+        """
+        Des.
+        """
+
+        Predictor.__init__(self, 1)
+        self.order = order
+        self.alpha_0 = alpha_0
+        self.alpha_1 = alpha_1
+
+    def update(self, interfData):
+        """
+        No history is needed.
+        """
+
+        pass
+
+    def predict(self, interfData, deltaT, velocity=None, velocityNm1=None):
+        """
+        Des.
+        """
+
+        if self.order == 1:
+            interfData += (self.alpha_0*deltaT*velocity)
+        else:
+            interfData += (self.alpha_0*deltaT*velocity + self.alpha_1*deltaT*(velocity-velocityNm1))
+
+    def describe(self):
+        """
+        Des.
+        """
+
+        if self.order == 1:
+            return 'First order predictor.'
+        else:
+            return 'Second order predictor.'
+
+class PolynomialPredictor(Predictor):
+    """
+    Extrapolation of the polynomial of degree order going through the converged data of the last order+1 time steps (constant time step).
+    The order is reduced as long as not enough time steps are stored.
+    """
+
+    def __init__(self, order=2):
+        """
+        Des.
+        """
+
+        Predictor.__init__(self, order+1)
+        self.order = order
+
+    def getCoefficients(self, order):
+        """
+        Returns the weights of the last order+1 values (newest first): x_n+1 = sum_j (-1)^j C(order+1, j+1) x_n-j.
+        """
+
+        coefficients = np.zeros(order+1)
+        binomial = 1.0
+        for j in range(order+1):
+            binomial *= float(order+1-j)/(j+1)
+            coefficients[j] = (-1)**j*binomial
+        return coefficients
+
+    def predict(self, interfData, deltaT, velocity=None, velocityNm1=None):
+        """
+        Des.
+        """
+
+        nStored = self.history.getSize()
+        if nStored == 0:
+            return
+        coefficients = self.getCoefficients(min(self.order, nStored-1))
+        with interfData.localView() as view:
+            view[:] = 0.0
+            for j, coefficient in enumerate(coefficients):
+                view += coefficient*self.history.get(j)
+
+    def describe(self):
+        """
+        Des.
+        """
+
+        return 'Polynomial extrapolation predictor (order {}).'.format(min(self.order, max(self.history.getSize()-1, 0)))
+
+class CorrectionPredictor(Predictor):
+    """
+    Re-uses the correction brought by the coupling iterations (e.g. IQN) at the previous time step: x0_n+1 = x_n + (x_n - x0_n),
+    x0_n being the initial guess of the previous time step.
+    """
+
+    def __init__(self):
+        """
+        Des.
+        """
+
+        Predictor.__init__(self, 1)
+        self.initialGuess = RingBuffer(1)
+
+    def reset(self):
+        """
+        Des.
+        """
+
+        Predictor.reset(self)
+        self.initialGuess.reset()
+
+    def getState(self):
+        """
+        Des.
+        """
+
+        state = Predictor.getState(self)
+        state['initialGuess'] = self.initialGuess.getState()
+        return state
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        Predictor.setState(self, state)
+        self.initialGuess.setState(state['initialGuess'])
+
+    def predict(self, interfData, deltaT, velocity=None, velocityNm1=None):
+        """
+        Des.
+        """
+
+        with interfData.localView() as view:
+            if self.initialGuess.getSize() > 0 and self.history.getSize() > 0:
+                view[:] = 2.0*self.history.get(0) - self.initialGuess.get(0)
+            self.initialGuess.push(view)
+
+    def describe(self):
+        """
+        Des.
+        """
+
+        return 'Coupling correction predictor.'
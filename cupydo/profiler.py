@@ -0,0 +1,238 @@
+#! /usr/bin/env python
+# -*- coding: utf8 -*-
+
+'''
+
+Copyright 2018 University of Liège
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+profiler.py
+Hierarchical instrumentation of the coupling loop.
+Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN
+
+'''
+
+# ----------------------------------------------------------------------
+#  Imports
+# ----------------------------------------------------------------------
+
+import numpy as np
+import time as tm
+import json
+import functools
+import threading
+from contextlib import contextmanager
+
+# global vars (underscore prevent them to be imported with "from module import *")
+_theProfiler = None
+
+# ----------------------------------------------------------------------
+#  Profiler class
+# ----------------------------------------------------------------------
+
+class Profiler(object):
+    """
+    Records the time spent in named, nested regions (e.g. 'timeStep/fsiIteration/fluidSolver').
+    Each region keeps its number of calls and its total time, globally and for every (time step, FSI iteration).
+    The results of all the processes are aggregated (min/max/avg) at the end and can be exported as JSON and as a Chrome trace.
+    """
+
+    def __init__(self, mpiComm=None, enabled=True, maxEvents=1000000):
+        """
+        maxEvents is the maximum number of events kept (per process) for the Chrome trace.
+        """
+
+        self.mpiComm = mpiComm
+        if mpiComm != None:
+            self.myid = mpiComm.Get_rank()
+        else:
+            self.myid = 0
+        self.enabled = enabled
+        self.maxEvents = maxEvents
+
+        self.stack = []
+        self.calls = {}
+        self.totals = {}
+        self.stepTotals = {}
+        self.events = []
+        self.timeIter = 0
+        self.FSIIter = 0
+        self.origin = tm.time()
+        # only the regions of the thread which created the profiler are recorded (see utilities.AsyncTask)
+        self.thread = threading.current_thread()
+
+    def setTimeIteration(self, timeIter):
+        """
+        Des.
+        """
+
+        self.timeIter = timeIter
+        self.FSIIter = 0
+
+    def setFSIIteration(self, FSIIter):
+        """
+        Des.
+        """
+
+        self.FSIIter = FSIIter
+
+    def start(self, name):
+        """
+        Enters the region name (nested in the current region).
+        """
+
+        if self.enabled and threading.current_thread() is self.thread:
+            self.stack.append((name, tm.time()))
+
+    def stop(self, name):
+        """
+        Leaves the region name.
+        """
+
+        if not self.enabled or threading.current_thread() is not self.thread:
+            return
+        names = [region for region, startTime in self.stack]
+        if name not in names:
+            return
+        # regions left open (e.g. by an exception) are closed with their parent
+        while self.stack[-1][0] != name:
+            self.stop(self.stack[-1][0])
+
+        stopTime = tm.time()
+        path = '/'.join([region for region, startTime in self.stack])
+        startTime = self.stack.pop()[1]
+        elapsedTime = stopTime - startTime
+
+        self.calls[path] = self.calls.get(path, 0) + 1
+        self.totals[path] = self.totals.get(path, 0.0) + elapsedTime
+        step = self.stepTotals.setdefault((self.timeIter, self.FSIIter), {})
+        step[path] = step.get(path, 0.0) + elapsedTime
+        if len(self.events) < self.maxEvents:
+            self.events.append({'name': name, 'cat': path, 'ph': 'X', 'pid': self.myid, 'tid': 0,
+                                'ts': (startTime - self.origin)*1e6, 'dur': elapsedTime*1e6,
+                                'args': {'timeIter': self.timeIter, 'FSIIter': self.FSIIter}})
+
+    @contextmanager
+    def region(self, name):
+        """
+        Context manager version of start/stop.
+        """
+
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def __gather(self, value):
+        """
+        Des.
+        """
+
+        if self.mpiComm != None:
+            return self.mpiComm.gather(value, root=0)
+        else:
+            return [value]
+
+    def summarize(self):
+        """
+        Aggregates the results of all the processes (collective call).
+        Returns the summary on the root process and None on the other ones.
+        """
+
+        allTotals = self.__gather(self.totals)
+        allCalls = self.__gather(self.calls)
+        allStepTotals = self.__gather(self.stepTotals)
+        if self.myid != 0:
+            return None
+
+        nProc = len(allTotals)
+        paths = sorted(set().union(*[totals.keys() for totals in allTotals]))
+        regions = {}
+        for path in paths:
+            times = np.array([totals.get(path, 0.0) for totals in allTotals])
+            calls = [procCalls.get(path, 0) for procCalls in allCalls]
+            regions[path] = {'calls': max(calls), 'min': times.min(), 'max': times.max(), 'avg': times.mean(),
+                             'imbalance': times.max()/times.mean() if times.mean() > 0.0 else 1.0}
+
+        # time of the slowest process in each step
+        steps = {}
+        for stepTotals in allStepTotals:
+            for key, totals in stepTotals.iteritems():
+                step = steps.setdefault(key, {})
+                for path, time in totals.iteritems():
+                    step[path] = max(step.get(path, 0.0), time)
+        steps = [{'timeIter': key[0], 'FSIIter': key[1], 'regions': steps[key]} for key in sorted(steps.keys())]
+
+        return {'nProcesses': nProc, 'regions': regions, 'steps': steps}
+
+    def printSummary(self, summary):
+        """
+        Prints the (root) summary as a table.
+        """
+
+        if summary == None:
+            return
+        print('\n{:<60s} {:>8s} {:>12s} {:>12s} {:>12s} {:>8s}'.format('[Profiler] region', 'calls', 'min [s]', 'avg [s]', 'max [s]', 'max/avg'))
+        for path in sorted(summary['regions'].keys()):
+            region = summary['regions'][path]
+            print('{:<60s} {:>8d} {:>12.4f} {:>12.4f} {:>12.4f} {:>8.2f}'.format(path, region['calls'], region['min'], region['avg'], region['max'], region['imbalance']))
+
+    def write(self, fileName):
+        """
+        Writes the summary to fileName.json and the Chrome trace (chrome://tracing) of all the processes to fileName_trace.json (collective call).
+        """
+
+        summary = self.summarize()
+        allEvents = self.__gather(self.events)
+        if self.myid == 0:
+            with open(fileName + '.json', 'w') as summaryFile:
+                json.dump(summary, summaryFile, indent=1)
+            with open(fileName + '_trace.json', 'w') as traceFile:
+                json.dump({'traceEvents': [event for events in allEvents for event in events], 'displayTimeUnit': 'ms'}, traceFile)
+        return summary
+
+def getProfiler():
+    """
+    Returns the profiler of the process (disabled by default).
+    """
+
+    global _theProfiler
+    if _theProfiler == None:
+        _theProfiler = Profiler(enabled=False)
+    return _theProfiler
+
+def setProfiler(profiler):
+    """
+    Des.
+    """
+
+    global _theProfiler
+    _theProfiler = profiler
+
+def profiled(name):
+    """
+    Decorator recording each call of a function as the region name of the process profiler.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = getProfiler()
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            with profiler.region(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
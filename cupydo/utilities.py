@@ -30,11 +30,13 @@ Authors : David THOMAS, Marco Lucio CERQUAGLIA, Romain BOMAN, Adrien CROVATO
 from math import *
 import numpy as np
 import scipy as sp
+import scipy.linalg
 import os, os.path, sys, string
 import time as tm
 
-import socket, fnmatch
+import socket, fnmatch, atexit, threading
 import fsi_pyutils
+from profiler import getProfiler
 
 np.set_printoptions(threshold=sys.maxsize)
 
@@ -42,6 +44,7 @@ np.set_printoptions(threshold=sys.maxsize)
 _theModule  = None
 _theWDir    = None # workspace directory
 _theWDirRoot = os.getcwd()  # base directory du workspace
+_theLogger = None # logger used by mpiPrint
 
 # ----------------------------------------------------------------------
 #  Utilities
@@ -50,75 +53,552 @@ _theWDirRoot = os.getcwd()  # base directory du workspace
 def solve_upper_triangular_mod(U, y, toll):
 
     # 'Modified' backward solve Ux = y with U upper triangular. 'Modified' because if the value of a diagonal element is close to zero (i.e. <= toll) the corresponding element in the solution is set to zero
+    # (the other elements are then the solution of the triangular system restricted to the remaining rows and columns, solved by LAPACK trtrs)
 
-    n = y.shape[0]
-    x = np.zeros((n,))
+    x = np.zeros((y.shape[0],))
+    keep = np.flatnonzero(np.abs(np.diag(U)) > toll)
+    if keep.size > 0:
+        x[keep] = sp.linalg.solve_triangular(U[np.ix_(keep, keep)], y[keep])
+    return x
 
-    for i in range (n - 1, -1, -1):
-        if abs(U[i, i]) <= toll:
-            x[i] = 0.
-        else:
-            x[i] = y[i];
-            for j in range (i + 1, n):
-                  x[i] -= U[i, j] * x[j]
-            x[i] /= U[i, i]
-    return x.T
+def qrPositive(V):
+    """
+    Economic QR factorization of V with a positive diagonal of R (as given by Gram-Schmidt).
+    """
+
+    Q, R = sp.linalg.qr(V, mode='economic')
+    signs = np.where(np.diag(R) < 0.0, -1.0, 1.0)
+    return Q*signs, R*signs[:,np.newaxis]
+
+def filterColumnsHaelterman(R, norms, toll):
+    """
+    Returns the indices of the columns of V = Q*R kept by the 'modified' QR filtering of Haelterman et al.: column i is removed if
+    its part orthogonal to the kept columns 0..i-1 has a norm lower than toll*norms[i] (norms[i] = |V[:,i]|, the first column is always kept).
+    The columns are checked in one pass, on R only (|Q*x| = |x|).
+    """
+
+    k = R.shape[1]
+    if k == 0:
+        return []
+    keep = [0]
+    basis = np.zeros((R.shape[0], k))
+    basis[:,0] = R[:,0]/np.linalg.norm(R[:,0])
+    for i in range(1, k):
+        B = basis[:,:len(keep)]
+        r = R[:,i] - B.dot(B.T.dot(R[:,i]))
+        r -= B.dot(B.T.dot(r))
+        rNorm = np.linalg.norm(r)
+        if rNorm >= toll*norms[i]:
+            basis[:,len(keep)] = r/rNorm
+            keep.append(i)
+    return keep
+
+def filterColumnsDegroote(R, toll):
+    """
+    Returns the indices of the columns of V = Q*R kept by the QR filtering of Degroote et al.: the first column with |R[i,i]| < toll*|R|
+    is removed, until there is none left. The factorizations of the remaining columns are computed on R only (small, k x k).
+    """
+
+    keep = list(range(R.shape[1]))
+    Rk = R
+    while keep:
+        small = np.flatnonzero(np.abs(np.diag(Rk)) < toll*np.linalg.norm(Rk, 2))
+        if small.size == 0:
+            break
+        del keep[small[0]]
+        if keep:
+            Rk = sp.linalg.qr(R[:,keep], mode='r', overwrite_a=True)[0][:len(keep)]
+    return keep
 
 def QRfiltering(V, W, toll):
-    
-    while True:
-        n = V.shape[0]
-        s = V.shape[1]
-        
-        flag = True
-        
-        Q, R = sp.linalg.qr(V, mode='economic')
-        
-        for i in range(0, s): # REMEMBER: range(a, b) starts at a but ends at b-1!
-            if abs(R[i,i]) < toll*np.linalg.norm(R, 2):
-                V = np.delete(V, i, 1)
-                W = np.delete(W, i, 1)
-                if i == s-1:
-                    flag = False
-                else:
-                    flag = True
-                break
-        if i >= s-1 and flag == True:
-            return (Q, R, V, W)
+    """
+    QR factorization of V after the removal of its (almost) linearly dependent columns (see filterColumnsDegroote()).
+    Returns (Q, R, V, W) for the kept columns.
+    """
+
+    Q, R = qrPositive(V)
+    keep = filterColumnsDegroote(R, toll)
+    if len(keep) < V.shape[1]:
+        V, W = V[:,keep], W[:,keep]
+        Q, R = qrPositive(V)
+    return (Q, R, V, W)
 
 def QRfiltering_mod(V, W, toll):
-    
-    while True:
-        n = V.shape[0]
-        s = V.shape[1]
-        Q = np.zeros((n, s))
-        R = np.zeros((s, s))
-        
-        flag = True
-        
-        i = 0
-        V0 = V[:,i]
-        R[i,i] = np.linalg.norm(V0, 2)
-        Q[:,i] = np.dot(V0, 1.0/R[i,i])
-        
-        for i in range(1, s): # REMEMBER: range(a, b) starts at a but ends at b-1!
-            vbar = V[:,i]
-            for j in range(0, i): # REMEMBER: range(a, b) starts at a but ends at b-1!
-                R[j,i] = np.dot(Q[:,j].T,vbar)
-                vbar = vbar - np.dot(Q[:,j], R[j,i])
-            if np.linalg.norm(vbar, 2) < toll*np.linalg.norm(V[:,i], 2):
-                V = np.delete(V, i, 1)
-                W = np.delete(W, i, 1)
-                if i == s-1:
-                    flag = False
-                else:
-                    flag = True
-                break
-            else:
-                R[i,i] = np.linalg.norm(vbar, 2)
-                Q[:,i] = np.dot(vbar, 1.0/R[i,i])
-        if i >= s-1 and flag == True:
-            return (Q, R, V, W)
+    """
+    QR factorization of V after the removal of its (almost) linearly dependent columns (see filterColumnsHaelterman()).
+    Returns (Q, R, V, W) for the kept columns.
+    """
+
+    Q, R = qrPositive(V)
+    keep = filterColumnsHaelterman(R, np.linalg.norm(V, axis=0), toll)
+    if len(keep) < V.shape[1]:
+        V, W = V[:,keep], W[:,keep]
+        Q, R = qrPositive(V)
+    return (Q, R, V, W)
+
+def copyOrNone(array):
+    """
+    Des.
+    """
+
+    if array is None:
+        return None
+    return array.copy()
+
+class ColumnBuffer(object):
+    """
+    Preallocated column-major (nRows x capacity) storage of a matrix whose columns are inserted at both ends, e.g. the IQN-ILS V and W matrices (newest columns first).
+    The columns in use are data[:,head:tail], given as a view by get(). Inserting a column at either end copies this column only, as long as there is room on that side.
+    Otherwise the columns are moved to the other end of the storage, which is enlarged to twice the number of columns if needed, so that insertion is O(1) amortized
+    and no memory is allocated once the number of columns has stabilized.
+    """
+
+    def __init__(self, capacity=16):
+        """
+        Des.
+        """
+
+        self.capacity = capacity
+        self.data = None
+        self.head = 0
+        self.tail = 0
+
+    def reset(self):
+        """
+        Removes all the columns (the storage is kept).
+        """
+
+        self.head = self.tail = self.capacity//2
+
+    def getNumberOfColumns(self):
+        """
+        Des.
+        """
+
+        return self.tail - self.head
+
+    def get(self):
+        """
+        Returns the columns in use (view), or None if there is none.
+        """
+
+        if self.tail == self.head:
+            return None
+        return self.data[:,self.head:self.tail]
+
+    def __reserve(self, nRows, atFront):
+        """
+        Makes room for one more column at the front (or at the back) of the columns in use.
+        """
+
+        k = self.tail - self.head
+        if self.data is None or self.data.shape[0] != nRows:
+            self.data = np.zeros((nRows, self.capacity), order='F')
+            self.reset()
+            k = 0
+        if (atFront and self.head > 0) or (not atFront and self.tail < self.capacity):
+            return
+
+        capacity = max(self.capacity, 2*(k+1))
+        head = capacity - k if atFront else 0
+        if capacity != self.capacity:
+            data = np.zeros((nRows, capacity), order='F')
+            data[:,head:head+k] = self.data[:,self.head:self.tail]
+            self.data = data
+            self.capacity = capacity
+        else:
+            self.data[:,head:head+k] = self.data[:,self.head:self.tail].copy()
+        self.head, self.tail = head, head+k
+
+    def prepend(self, column):
+        """
+        Inserts column as the first one.
+        """
+
+        self.__reserve(column.shape[0], True)
+        self.head -= 1
+        self.data[:,self.head] = column
+
+    def append(self, column):
+        """
+        Inserts column as the last one.
+        """
+
+        self.__reserve(column.shape[0], False)
+        self.data[:,self.tail] = column
+        self.tail += 1
+
+    def truncate(self, m):
+        """
+        Keeps only the m first columns.
+        """
+
+        self.tail = self.head + max(min(m, self.tail-self.head), 0)
+
+    def delete(self, i):
+        """
+        Removes the column i (the columns on its shortest side are shifted).
+        """
+
+        k = self.tail - self.head
+        if i < k//2:
+            self.data[:,self.head+1:self.head+i+1] = self.data[:,self.head:self.head+i].copy()
+            self.head += 1
+        else:
+            self.data[:,self.head+i:self.tail-1] = self.data[:,self.head+i+1:self.tail].copy()
+            self.tail -= 1
+
+    def set(self, matrix):
+        """
+        Replaces the columns by the ones of matrix (copied, None for no column).
+        """
+
+        if matrix is None or matrix.shape[1] == 0:
+            self.reset()
+            return
+        k = matrix.shape[1]
+        if self.data is None or self.data.shape[0] != matrix.shape[0] or self.capacity < k:
+            self.capacity = max(self.capacity, 2*k)
+            self.data = np.zeros((matrix.shape[0], self.capacity), order='F')
+        self.head = (self.capacity - k)//2
+        self.tail = self.head + k
+        self.data[:,self.head:self.tail] = matrix
+
+class IncrementalQR(object):
+    """
+    Thin QR factorization V = Q*R of the IQN-ILS matrix V (and the associated matrix W), updated with Givens rotations.
+    Columns are prepended (newest first), deleted (filtering) or truncated (aging), each update costing O(n*k) instead of O(n*k^2) for a new factorization.
+    Each column carries a tag (e.g. the time step it comes from).
+    In parallel, V, W and Q are distributed by rows (each process stores its slab) and R is replicated: the inner products are summed with Allreduce.
+    V, W and Q are views of preallocated column buffers (see ColumnBuffer), updated in place.
+    """
+
+    def __init__(self, mpiComm=None):
+        """
+        Des.
+        """
+
+        self.mpiComm = mpiComm
+        if mpiComm != None:
+            self.random = np.random.RandomState(mpiComm.Get_rank())
+        else:
+            self.random = np.random.RandomState(0)
+        self.QBuffer = ColumnBuffer()
+        self.VBuffer = ColumnBuffer()
+        self.WBuffer = ColumnBuffer()
+        self.reset()
+
+    @property
+    def Q(self):
+        return self.QBuffer.get()
+
+    @property
+    def V(self):
+        return self.VBuffer.get()
+
+    @property
+    def W(self):
+        return self.WBuffer.get()
+
+    def dot(self, v):
+        """
+        Returns Q^T*v (v is the local slab of a global vector).
+        """
+
+        return mpiAllReduceArray(self.mpiComm, self.Q.T.dot(v))
+
+    def norm(self, v):
+        """
+        Returns the global norm of the vector whose local slab is v.
+        """
+
+        return np.sqrt(mpiAllReduceArray(self.mpiComm, np.dot(v, v)))
+
+    def reset(self):
+        """
+        Removes all the columns.
+        """
+
+        self.QBuffer.reset()
+        self.VBuffer.reset()
+        self.WBuffer.reset()
+        self.R = np.zeros((0,0))
+        self.norms = np.zeros(0)
+        self.tags = np.zeros(0, dtype=int)
+        self.nRows = 0
+
+    def getNumberOfColumns(self):
+        """
+        Des.
+        """
+
+        return self.R.shape[0]
+
+    def getState(self):
+        """
+        Returns a copy of the factorization (local slabs), restored by setState().
+        """
+
+        return {'Q': copyOrNone(self.Q), 'R': self.R.copy(), 'V': copyOrNone(self.V), 'W': copyOrNone(self.W),
+                'norms': self.norms.copy(), 'tags': self.tags.copy(), 'nRows': self.nRows}
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        self.QBuffer.set(state['Q'])
+        self.R = state['R']
+        self.VBuffer.set(state['V'])
+        self.WBuffer.set(state['W'])
+        self.norms = state['norms']
+        self.tags = state['tags']
+        self.nRows = state['nRows']
+
+    def __rotate(self, R, Q, i, j, a, b):
+        """
+        Applies the Givens rotation zeroing b in (a, b) to the rows i, j of R and to the columns i, j of Q.
+        """
+
+        r = np.hypot(a, b)
+        if r == 0.0:
+            return
+        c, s = a/r, b/r
+        Ri, Rj = R[i].copy(), R[j].copy()
+        R[i], R[j] = c*Ri + s*Rj, c*Rj - s*Ri
+        if Q.shape[0] > 0:
+            # --- In place (the columns of Q are contiguous), the assignment is only a safeguard --- #
+            Q[:,i], Q[:,j] = sp.linalg.blas.drot(Q[:,i], Q[:,j], c, s, overwrite_x=1, overwrite_y=1)
+
+    def prepend(self, v, w, tag=0):
+        """
+        Inserts the columns v and w in the first position of V and W.
+        Returns False if v is zero (the columns are then not inserted). Collective call.
+        """
+
+        vNorm = self.norm(v)
+        if vNorm == 0.0:
+            return False
+
+        k = self.getNumberOfColumns()
+        if k == 0:
+            self.nRows = int(mpiAllReduceArray(self.mpiComm, float(v.shape[0])))
+            self.QBuffer.append(v/vNorm)
+            self.R = np.array([[vNorm]])
+            self.VBuffer.prepend(v)
+            self.WBuffer.prepend(w)
+            self.norms = np.array([vNorm])
+            self.tags = np.array([tag])
+            return True
+
+        if k == self.nRows: # the factorization cannot be extended, the oldest column is removed
+            self.truncate(k-1)
+            k -= 1
+
+        # --- Orthogonalize v against Q (twice, for stability) --- #
+        coeff = self.dot(v)
+        r = v - self.Q.dot(coeff)
+        correction = self.dot(r)
+        r -= self.Q.dot(correction)
+        coeff += correction
+        rho = self.norm(r)
+        if rho > 1e-14*vNorm:
+            q = r/rho
+        else: # v is in span(Q), any unit vector orthogonal to Q completes the basis
+            rho = 0.0
+            q = self.random.rand(v.shape[0])
+            q -= self.Q.dot(self.dot(q))
+            q -= self.Q.dot(self.dot(q))
+            q /= self.norm(q)
+
+        # --- [v V] = [Q q]*H, with H upper triangular except for its first column --- #
+        self.QBuffer.append(q)
+        Q = self.Q
+        H = np.zeros((k+1, k+1))
+        H[:k,0] = coeff
+        H[k,0] = rho
+        H[:k,1:] = self.R
+        for j in range(k-1, -1, -1):
+            self.__rotate(H, Q, j, j+1, H[j,0], H[j+1,0])
+            H[j+1,0] = 0.0
+
+        self.R = H
+        self.VBuffer.prepend(v)
+        self.WBuffer.prepend(w)
+        self.norms = np.concatenate(([vNorm], self.norms))
+        self.tags = np.concatenate(([tag], self.tags))
+        return True
+
+    def delete(self, i):
+        """
+        Removes the column i of V and W.
+        """
+
+        k = self.getNumberOfColumns()
+        H = np.delete(self.R, i, 1)
+        Q = self.Q
+        for j in range(i, k-1):
+            self.__rotate(H, Q, j, j+1, H[j,j], H[j+1,j])
+            H[j+1,j] = 0.0
+
+        self.QBuffer.truncate(k-1)
+        self.R = H[:k-1,:]
+        self.VBuffer.delete(i)
+        self.WBuffer.delete(i)
+        self.norms = np.delete(self.norms, i)
+        self.tags = np.delete(self.tags, i)
+
+    def truncate(self, m):
+        """
+        Keeps only the m first (newest) columns of V and W.
+        """
+
+        if m <= 0:
+            self.reset()
+        elif m < self.getNumberOfColumns():
+            self.QBuffer.truncate(m)
+            self.R = self.R[:m,:m]
+            self.VBuffer.truncate(m)
+            self.WBuffer.truncate(m)
+            self.norms = self.norms[:m]
+            self.tags = self.tags[:m]
+
+    def keepColumns(self, keep):
+        """
+        Keeps only the columns keep (sorted indices) of V and W.
+        The factorization of the kept columns is obtained from the one of R[:,keep] (small), Q being updated with one matrix product.
+        """
+
+        if len(keep) == 0:
+            self.reset()
+            return
+        Qs, Rs = qrPositive(self.R[:,keep])
+        self.QBuffer.set(self.Q.dot(Qs))
+        self.R = Rs
+        self.VBuffer.set(self.V[:,keep])
+        self.WBuffer.set(self.W[:,keep])
+        self.norms = self.norms[keep]
+        self.tags = self.tags[keep]
+
+    def filter(self, method, toll):
+        """
+        Removes the (almost) linearly dependent columns, in a single update of the factorization.
+        'Haelterman' : column i is removed if |R[i,i]| < toll*|V[:,i]| (same criterion as QRfiltering_mod, see filterColumnsHaelterman()).
+        'Degroote2' : the first column with |R[i,i]| < toll*|R| is removed, until there is none left (same criterion as QRfiltering, see filterColumnsDegroote()).
+        The columns to remove are determined from R only (replicated), so that no communication is needed.
+        Returns the number of removed columns.
+        """
+
+        k = self.getNumberOfColumns()
+        if method == 'Haelterman':
+            keep = filterColumnsHaelterman(self.R, self.norms, toll)
+        elif method == 'Degroote2':
+            keep = filterColumnsDegroote(self.R, toll)
+        else:
+            raise NameError('IncrementalQR: the QR filtering technique is unknown!')
+        if len(keep) < k:
+            self.keepColumns(keep)
+        return k - len(keep)
+
+class RingBuffer(object):
+    """
+    Fixed-size history of arrays of the same shape (e.g. local views of interface data), the newest first.
+    The storage is allocated once, at the first push, and the oldest array is overwritten when the buffer is full.
+    """
+
+    def __init__(self, size):
+        """
+        Des.
+        """
+
+        self.size = size
+        self.data = None
+        self.start = 0
+        self.count = 0
+
+    def reset(self):
+        """
+        Des.
+        """
+
+        self.start = 0
+        self.count = 0
+
+    def getSize(self):
+        """
+        Returns the number of arrays stored.
+        """
+
+        return self.count
+
+    def push(self, array):
+        """
+        Copies array in the buffer (as the newest one).
+        """
+
+        array = np.asarray(array)
+        if self.data is None or self.data.shape[1:] != array.shape:
+            self.data = np.zeros((self.size,) + array.shape)
+            self.reset()
+        self.start = (self.start - 1) % self.size
+        self.data[self.start] = array
+        self.count = min(self.count + 1, self.size)
+
+    def get(self, i):
+        """
+        Returns the i-th newest array (0 is the newest one), without copy.
+        """
+
+        if i >= self.count:
+            raise IndexError('RingBuffer: only {} arrays are stored!'.format(self.count))
+        return self.data[(self.start + i) % self.size]
+
+    def truncate(self, m):
+        """
+        Keeps only the m newest arrays.
+        """
+
+        self.count = max(min(self.count, m), 0)
+
+    def getStored(self):
+        """
+        Returns the stored arrays as a single array in storage order (not sorted by age, see getAges()), without copy unless the stored part wraps around the buffer end.
+        Buffers filled, reset and truncated together give their arrays in the same order.
+        """
+
+        if self.data is None:
+            return None
+        if self.count == self.size:
+            return self.data
+        if self.start + self.count <= self.size:
+            return self.data[self.start:self.start+self.count]
+        return np.concatenate((self.data[self.start:], self.data[:self.start+self.count-self.size]))
+
+    def getAges(self):
+        """
+        Returns the age (0 for the newest one) of the arrays given by getStored().
+        """
+
+        if self.count == self.size:
+            return (np.arange(self.size) - self.start) % self.size
+        return np.arange(self.count)
+
+    def getState(self):
+        """
+        Returns a copy of the buffer, restored by setState().
+        """
+
+        return {'size': self.size, 'data': copyOrNone(self.data), 'start': self.start, 'count': self.count}
+
+    def setState(self, state):
+        """
+        Des.
+        """
+
+        self.size = state['size']
+        self.data = state['data']
+        self.start = state['start']
+        self.count = state['count']
 
 # ------------------------------------------------------------------------------
 
@@ -167,23 +647,161 @@ def getMpi():
     return cmpi.haveMPI, comm, myid, numberPart
 
 # ----------------------------------------------------------------------
-#    MPI Functions
+#    Logger class
 # ----------------------------------------------------------------------
 
-def mpiPrint(message, mpiComm = None):
+class Logger(object):
     """
-    Description.
+    Logger that never synchronizes the processes.
+    Messages of the root process are written to stdout immediately (so that they keep their order with the output of the solvers),
+    except for debug messages which are buffered and written periodically (every flushInterval seconds).
+    If rankFileName is given (e.g. 'cupydo_{}.log'), every process also writes its own messages to its file.
+    The rank is taken from mpiComm, or from MPI.COMM_WORLD if mpiComm is None and mpi4py is available.
     """
 
-    if mpiComm != None:
-        myid = mpiComm.Get_rank()
-    else:
-        myid = 0
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+
+    def __init__(self, mpiComm=None, level=20, flushInterval=1.0, rankFileName=None):
+        """
+        Des.
+        """
+
+        if mpiComm != None:
+            self.myid = mpiComm.Get_rank()
+        else:
+            self.myid = getWorldRank()
+        self.level = level
+        self.flushInterval = flushInterval
+        self.buffer = []
+        self.lastFlush = tm.time()
+        if rankFileName != None:
+            self.rankFile = open(rankFileName.format(self.myid), 'w')
+        else:
+            self.rankFile = None
+
+    def log(self, message, level=None, allRanks=False):
+        """
+        Logs a message from the root process (or from all the processes if allRanks is True).
+        """
+
+        if level == None:
+            level = Logger.INFO
+        if level < self.level:
+            return
+
+        message = str(message)
+        if self.rankFile != None:
+            self.rankFile.write(message + '\n')
+        if self.myid == 0 or allRanks:
+            self.buffer.append(message)
+            if level >= Logger.INFO or tm.time() - self.lastFlush >= self.flushInterval:
+                self.flush()
+
+    def debug(self, message):
+        """
+        Des.
+        """
 
-    if myid == 0:
-        print(message)
+        self.log(message, Logger.DEBUG)
+
+    def info(self, message):
+        """
+        Des.
+        """
+
+        self.log(message, Logger.INFO)
+
+    def warning(self, message):
+        """
+        Des.
+        """
+
+        self.log(message, Logger.WARNING)
+
+    def error(self, message):
+        """
+        Des.
+        """
+
+        self.log(message, Logger.ERROR, allRanks=True)
+
+    def flush(self):
+        """
+        Writes the buffered messages (local operation).
+        """
 
-    mpiBarrier(mpiComm)
+        if self.buffer:
+            sys.stdout.write('\n'.join(self.buffer) + '\n')
+            self.buffer = []
+        sys.stdout.flush()
+        if self.rankFile != None:
+            self.rankFile.flush()
+        self.lastFlush = tm.time()
+
+    def close(self):
+        """
+        Des.
+        """
+
+        self.flush()
+        if self.rankFile != None:
+            self.rankFile.close()
+            self.rankFile = None
+
+def getWorldRank():
+    """
+    Returns the rank of the process in MPI.COMM_WORLD (0 for a serial build, MPI is not initialized as in getMpi()).
+    """
+
+    from ccupydo import CMpi
+    if not CMpi().haveMPI:
+        return 0
+    from mpi4py import MPI
+    return MPI.COMM_WORLD.Get_rank()
+
+def getLogger(mpiComm = None):
+    """
+    Returns the logger of the process (created with the default settings at the first call).
+    """
+
+    global _theLogger
+    if _theLogger == None:
+        setLogger(Logger(mpiComm))
+    return _theLogger
+
+def setLogger(logger):
+    """
+    Replaces the logger of the process (the previous one is closed).
+    """
+
+    global _theLogger
+    if _theLogger != None:
+        _theLogger.close()
+    _theLogger = logger
+
+def _closeLogger():
+    """
+    Flushes the logger at exit.
+    """
+
+    if _theLogger != None:
+        _theLogger.close()
+
+atexit.register(_closeLogger)
+
+# ----------------------------------------------------------------------
+#    MPI Functions
+# ----------------------------------------------------------------------
+
+def mpiPrint(message, mpiComm = None, level = None):
+    """
+    Prints a message from the root process through the logger (no synchronization).
+    """
+
+    getLogger(mpiComm).log(message, level)
 
 def mpiBarrier(mpiComm = None):
     """
@@ -206,6 +824,20 @@ def mpiAllReduce(mpiComm = None, value = 0):
     else:
         return value
 
+def mpiAllReduceArray(mpiComm = None, array = None, op = 'sum'):
+    """
+    Sum (or max if op is 'max') of a numpy array over the processes (no communication in serial).
+    """
+
+    if mpiComm != None:
+        from mpi4py import MPI
+        sendBuff = np.ascontiguousarray(array, dtype=float)
+        rcvBuff = np.zeros_like(sendBuff)
+        mpiComm.Allreduce(sendBuff, rcvBuff, MPI.MAX if op == 'max' else MPI.SUM)
+        return rcvBuff
+    else:
+        return array
+
 def mpiAllGather(mpiComm = None, value = 0):
     """
     Description
@@ -265,6 +897,140 @@ def mpiGatherInterfaceData(interfData, globalSize, mpiComm = None, rootProcess =
 
     return interfData_Gat
 
+# ----------------------------------------------------------------------
+#   Redistribution plan class
+# ----------------------------------------------------------------------
+
+class RedistributionPlan(object):
+    """
+    Point-to-point redistribution of a distributed interface vector.
+    Each process receives the rows globalIndices (physical and halo nodes) directly from the processes that own them.
+    The communication pattern is computed once, then each transfer is a single Alltoallv.
+    """
+
+    def __init__(self, globalIndices, ownershipRange, mpiComm):
+        """
+        globalIndices are the rows needed by this process, ownershipRange is the (start, stop) range of the rows it owns.
+        Collective call.
+        """
+
+        from mpi4py import MPI
+
+        self.mpiComm = mpiComm
+        mpiSize = mpiComm.Get_size()
+        globalIndices = np.asarray(globalIndices, dtype=np.int64)
+        self.nRecv = globalIndices.shape[0]
+        self.ownershipStart = ownershipRange[0]
+
+        # --- Find the owner of each needed row --- #
+        starts = np.array(mpiComm.allgather(ownershipRange[0]), dtype=np.int64)
+        owners = np.searchsorted(starts, globalIndices, side='right') - 1
+        self.recvOrder = np.argsort(owners, kind='mergesort')
+        self.recvCounts = np.bincount(owners, minlength=mpiSize).astype(np.int64)
+        self.recvDispl = np.concatenate(([0], np.cumsum(self.recvCounts)[:-1])).astype(np.int64)
+
+        # --- Tell the owners which rows they will have to send --- #
+        self.sendCounts = np.zeros(mpiSize, dtype=np.int64)
+        mpiComm.Alltoall(self.recvCounts, self.sendCounts)
+        self.sendDispl = np.concatenate(([0], np.cumsum(self.sendCounts)[:-1])).astype(np.int64)
+        requested = np.ascontiguousarray(globalIndices[self.recvOrder])
+        sendIndices = np.zeros(self.sendCounts.sum(), dtype=np.int64)
+        mpiComm.Alltoallv([requested, (self.recvCounts, self.recvDispl), MPI.INT64_T], [sendIndices, (self.sendCounts, self.sendDispl), MPI.INT64_T])
+        self.sendIndices = sendIndices - self.ownershipStart
+
+    def execute(self, interfData):
+        """
+        Returns the (nRecv x nDim) array of the needed rows of interfData (FlexInterfaceData). Collective call.
+        """
+
+        return self.post(interfData).wait()
+
+    def post(self, interfData):
+        """
+        Starts the redistribution of interfData without blocking (the data to send are copied, interfData can be modified afterwards).
+        Returns a PendingRequest whose wait() returns the (nRecv x nDim) array of the needed rows. Collective call.
+        """
+
+        from mpi4py import MPI
+
+        nDim = interfData.nDim
+        with interfData.localView() as view:
+            sendBuff = np.ascontiguousarray(view[self.sendIndices])
+        rcvBuff = np.zeros((self.nRecv, nDim))
+        request = self.mpiComm.Ialltoallv([sendBuff, (nDim*self.sendCounts, nDim*self.sendDispl), MPI.DOUBLE], [rcvBuff, (nDim*self.recvCounts, nDim*self.recvDispl), MPI.DOUBLE])
+
+        def unpack():
+            data = np.zeros((self.nRecv, nDim))
+            data[self.recvOrder] = rcvBuff
+            return data
+
+        return PendingRequest(request, unpack, [sendBuff, rcvBuff])
+
+# ----------------------------------------------------------------------
+#   Asynchronous operations
+# ----------------------------------------------------------------------
+
+class PendingRequest(object):
+    """
+    Non-blocking MPI operation. wait() completes it and returns the result of finalize().
+    buffers are kept alive until the operation is completed.
+    """
+
+    def __init__(self, request, finalize, buffers=[]):
+        """
+        Des.
+        """
+
+        self.request = request
+        self.finalize = finalize
+        self.buffers = buffers
+
+    def wait(self):
+        """
+        Des.
+        """
+
+        self.request.Wait()
+        self.buffers = []
+        return self.finalize()
+
+class AsyncTask(object):
+    """
+    Runs function(*args) in a worker thread. wait() joins the thread and returns the result of the function (or raises its exception).
+    The function must not call MPI nor use data modified by the main thread before wait().
+    """
+
+    def __init__(self, function, *args):
+        """
+        Des.
+        """
+
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self.__run, args=(function, args))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def __run(self, function, args):
+        """
+        Des.
+        """
+
+        try:
+            self.result = function(*args)
+        except Exception:
+            self.error = sys.exc_info()
+
+    def wait(self):
+        """
+        Des.
+        """
+
+        self.thread.join()
+        if self.error != None:
+            raise self.error[0], self.error[1], self.error[2]
+        return self.result
+
 # ----------------------------------------------------------------------
 #   Timer class
 # ----------------------------------------------------------------------
@@ -274,11 +1040,12 @@ class Timer:
     Description
     """
 
-    def __init__(self):
+    def __init__(self, name=None):
         """
-        Des.
+        If name is given, the timed sections are also recorded as the region name of the profiler.
         """
 
+        self.name = name
         self.startTime = 0.0
         self.stopTime = 0.0
         self.elapsedTime = 0.0
@@ -291,6 +1058,8 @@ class Timer:
         """
 
         if not self.isRunning:
+            if self.name != None:
+                getProfiler().start(self.name)
             self.startTime = tm.time()
             self.isRunning = True
         else:
@@ -305,6 +1074,8 @@ class Timer:
             self.stopTime = tm.time()
             self.elapsedTime = self.stopTime - self.startTime
             self.isRunning = False
+            if self.name != None:
+                getProfiler().stop(self.name)
 
     def cumul(self):
         """
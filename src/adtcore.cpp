@@ -501,8 +501,9 @@ void ADT_PointType::queryNearestNeighboor(double *coord, double &dist, int &poin
 
     dist = computeDistanceSquare(coord, coordTarget);
 
-    /* Traverse the tree to find the nearest node and start at the root. */
-    frontLeaves.clear();      // Make sure to wipe out any data from aprevious search.
+    /* Traverse the tree to find the nearest node and start at the root.
+       The fronts are local so that concurrent queries (OpenMP) do not share any state. */
+    std::vector<int> frontLeaves, frontLeavesNew;
     frontLeaves.push_back(0); // Initialize frontLeaves such that it only contains the root leaf.
 
     /* Infinite loop of the tree traversal. */
@@ -574,7 +575,7 @@ void ADT_PointType::queryNearestNeighboor(double *coord, double &dist, int &poin
         }
 
         /* Update the data for the next round*/
-        frontLeaves = frontLeavesNew;
+        frontLeaves.swap(frontLeavesNew);
 
         /* If the new front is empty, it means we have reached a terminal leaf and the search is over. */
         if (frontLeaves.size() == 0)
@@ -601,7 +602,7 @@ void ADT_PointType::queryBallNeighboors(double *coord, double const &radius, std
     pointID.clear();
     rankID = -1;
 
-    frontLeaves.clear();
+    std::vector<int> frontLeaves, frontLeavesNew;
     frontLeaves.push_back(0);
 
     while (1)
@@ -650,7 +651,7 @@ void ADT_PointType::queryBallNeighboors(double *coord, double const &radius, std
             }
         }
 
-        frontLeaves = frontLeavesNew;
+        frontLeaves.swap(frontLeavesNew);
         if (frontLeaves.size() == 0)
             break;
     }
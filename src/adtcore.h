@@ -111,8 +111,6 @@ public:
 class ADT_PointType : public ADT_BaseType
 {
 private:
-    std::vector<int> frontLeaves;
-    std::vector<int> frontLeavesNew;
     std::vector<double> coordPoints;
     std::vector<int> localPointIDs;
     std::vector<int> ranksOfPoints;
@@ -26,6 +26,7 @@
 
 #ifdef HAVE_MPI
 #include "petscvec.h"
+#include "petscmat.h"
 #endif //HAVE_MPI
 
 #include "cMpi.h"
@@ -36,21 +37,7 @@ using namespace std;
 CFlexInterfaceData::CFlexInterfaceData(int const &val_nPoint, int const &val_nDim, Cupydo_Comm val_comm) : nPoint(val_nPoint), nDim(val_nDim), comm(val_comm)
 {
 
-    dataContainer.resize(nDim);
-
-#ifdef HAVE_MPI
-    for (int ii = 0; ii < nDim; ii++)
-    {
-        VecCreateMPI(comm, PETSC_DECIDE, nPoint, &(dataContainer[ii]));
-        VecSet(dataContainer[ii], 0.0);
-    }
-#else  //HAVE_MPI
-    for (int ii = 0; ii < nDim; ii++)
-    {
-        dataContainer[ii] = new double[nPoint];
-        fill(dataContainer[ii], dataContainer[ii] + nPoint, 0.0);
-    }
-#endif //HAVE_MPI
+    allocate();
 }
 
 CFlexInterfaceData::CFlexInterfaceData(CFlexInterfaceData &data)
@@ -60,23 +47,31 @@ CFlexInterfaceData::CFlexInterfaceData(CFlexInterfaceData &data)
     nDim = data.nDim;
     comm = data.comm;
 
+    allocate();
+    set(data);
+}
+
+void CFlexInterfaceData::allocate()
+{
+    // The vectors (or component pointers) are views of the buffer, so that the whole local data can be exposed at once
+
     dataContainer.resize(nDim);
 
 #ifdef HAVE_MPI
+    int localLength = PETSC_DECIDE;
+    PetscSplitOwnership(comm, &localLength, &nPoint);
+    buffer = new double[nDim * localLength];
+    fill(buffer, buffer + nDim * localLength, 0.0);
     for (int ii = 0; ii < nDim; ii++)
     {
-        VecCreateMPI(comm, PETSC_DECIDE, nPoint, &(dataContainer[ii]));
-        VecCopy(data.getData(ii), dataContainer[ii]);
+        VecCreateMPIWithArray(comm, 1, localLength, nPoint, buffer + ii * localLength, &(dataContainer[ii]));
     }
 #else  //HAVE_MPI
-    double *dataToCopy;
-    int size;
+    buffer = new double[nDim * nPoint];
+    fill(buffer, buffer + nDim * nPoint, 0.0);
     for (int ii = 0; ii < nDim; ii++)
     {
-        dataContainer[ii] = new double[nPoint];
-        data.getData(ii, &size, &dataToCopy);
-        assert(size == nPoint);
-        std::copy(dataToCopy, dataToCopy + size, dataContainer[ii]);
+        dataContainer[ii] = buffer + ii * nPoint;
     }
 #endif //HAVE_MPI
 }
@@ -88,21 +83,7 @@ CFlexInterfaceData::~CFlexInterfaceData()
     cout << "Calling CFlexInterfaceData::~CFlexInterfaceData()" << endl;
 #endif //NDEBUG
 
-#ifdef HAVE_MPI
-    for (int ii = 0; ii < nDim; ii++)
-    {
-        if (dataContainer[ii])
-        {
-            VecDestroy(&(dataContainer[ii]));
-        }
-    }
-#else  //HAVE_MPI
-    for (int ii = 0; ii < nDim; ii++)
-    {
-        if (dataContainer[ii] != NULL)
-            delete[] dataContainer[ii];
-    }
-#endif //HAVE_MPI
+    destroy();
 }
 
 void CFlexInterfaceData::destroy()
@@ -112,21 +93,23 @@ void CFlexInterfaceData::destroy()
     cout << "Calling CFlexInterfaceData::destroy()" << endl;
 #endif //NDEBUG
 
-#ifdef HAVE_MPI
+    // The vectors do not own the buffer, they are destroyed first
     for (int ii = 0; ii < nDim; ii++)
     {
+#ifdef HAVE_MPI
         if (dataContainer[ii])
         {
             VecDestroy(&(dataContainer[ii]));
         }
-    }
 #else  //HAVE_MPI
-    for (int ii = 0; ii < nDim; ii++)
+        dataContainer[ii] = NULL;
+#endif //HAVE_MPI
+    }
+    if (buffer != NULL)
     {
-        if (dataContainer[ii] != NULL)
-            delete[] dataContainer[ii];
+        delete[] buffer;
+        buffer = NULL;
     }
-#endif //HAVE_MPI
 }
 
 void CFlexInterfaceData::view(const int &iDim)
@@ -229,6 +212,41 @@ void CFlexInterfaceData::setData(const int &iDim, int size, double *data)
 
 #endif //HAVE_MPI
 
+#ifdef HAVE_MPI
+Mat CFlexInterfaceData::getDenseMat()
+{
+    // Returns a new (nPoint x nDim) dense matrix with the same row distribution as the data, to be destroyed by the caller
+    // The local column major storage of the matrix is the buffer itself (no copy)
+
+    Mat mat;
+    int localLength = getLocalLength();
+
+    MatCreateDense(comm, localLength, PETSC_DECIDE, nPoint, nDim, buffer, &mat);
+    MatAssemblyBegin(mat, MAT_FINAL_ASSEMBLY);
+    MatAssemblyEnd(mat, MAT_FINAL_ASSEMBLY);
+
+    return mat;
+}
+
+void CFlexInterfaceData::setDenseMat(Mat mat)
+{
+
+    PetscScalar *matArray, *vecArray;
+    int localLength = getLocalLength();
+
+    // Nothing to copy if mat comes from getDenseMat(), but the vectors must know that their values have changed
+    MatDenseGetArray(mat, &matArray);
+    for (int ii = 0; ii < nDim; ii++)
+    {
+        VecGetArray(dataContainer[ii], &vecArray);
+        if (matArray != buffer)
+            std::copy(matArray + ii * localLength, matArray + (ii + 1) * localLength, vecArray);
+        VecRestoreArray(dataContainer[ii], &vecArray);
+    }
+    MatDenseRestoreArray(mat, &matArray);
+}
+#endif //HAVE_MPI
+
 void CFlexInterfaceData::getDataArray(const int &iDim, int *size, double **data_array)
 {
 
@@ -241,6 +259,36 @@ void CFlexInterfaceData::getDataArray(const int &iDim, int *size, double **data_
 #endif
 }
 
+void CFlexInterfaceData::getLocalArray(int *size1, int *size2, double **mat_array)
+{
+    // (nDim x nLocal) view of the local data, restoreLocalArray() must be called once it has been modified
+
+    *size1 = nDim;
+    *size2 = getLocalLength();
+#ifdef HAVE_MPI
+    double *vecArray;
+    for (int ii = 0; ii < nDim; ii++)
+    {
+        VecGetArray(dataContainer[ii], &vecArray);
+    }
+#endif //HAVE_MPI
+    *mat_array = buffer;
+}
+
+void CFlexInterfaceData::restoreLocalArray()
+{
+
+#ifdef HAVE_MPI
+    int localLength = getLocalLength();
+    double *vecArray;
+    for (int ii = 0; ii < nDim; ii++)
+    {
+        vecArray = buffer + ii * localLength;
+        VecRestoreArray(dataContainer[ii], &vecArray);
+    }
+#endif //HAVE_MPI
+}
+
 void CFlexInterfaceData::assemble()
 {
 
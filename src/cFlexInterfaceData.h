@@ -26,17 +26,22 @@
 
 #ifdef HAVE_MPI
 #include "petscvec.h"
+#include "petscmat.h"
 #endif //HAVE_MPI
 
 #include "cMpi.h"
 
 class CFlexInterfaceData
 {
+    // All the components are stored in a single local buffer, one after the other (nDim x nLocal, row major)
+    double *buffer;
 #ifdef HAVE_MPI
     std::vector<Vec> dataContainer;
 #else  //HAVE_MPI
     std::vector<double *> dataContainer;
 #endif //HAVE_MPI
+    void allocate();
+
 public:
     //Public members
     CFlexInterfaceData(int const &val_nPoint, int const &val_nDim, Cupydo_Comm val_comm);
@@ -54,11 +59,15 @@ public:
     //void getDataContainer();
 #ifdef HAVE_MPI
     Vec getData(const int &iDim);
+    Mat getDenseMat();
+    void setDenseMat(Mat mat);
 #else  //HAVE_MPI
     void getData(const int &iDim, int *size, double **data_array);
     void setData(const int &iDim, int size, double *data);
 #endif //HAVE_MPI
     void getDataArray(const int &iDim, int *size, double **data_array);
+    void getLocalArray(int *size1, int *size2, double **mat_array);
+    void restoreLocalArray();
     void assemble();
     std::vector<double> norm();
     std::vector<double> sum();
@@ -21,6 +21,7 @@
 
 #include <iostream>
 #include <vector>
+#include <algorithm>
 #include <cassert>
 
 #ifdef HAVE_MPI
@@ -32,7 +33,11 @@
 
 using namespace std;
 
+#ifdef HAVE_MPI
 CInterfaceMatrix::CInterfaceMatrix(int const &val_M, int const &val_N) : M(val_M), N(val_N) {}
+#else  //HAVE_MPI
+CInterfaceMatrix::CInterfaceMatrix(int const &val_M, int const &val_N) : sparse(false), M(val_M), N(val_N) {}
+#endif //HAVE_MPI
 
 CInterfaceMatrix::~CInterfaceMatrix()
 {
@@ -69,7 +74,10 @@ void CInterfaceMatrix::createSparse(int val_dnz, int val_onz)
 #ifdef HAVE_MPI
     MatCreateAIJ(MPI_COMM_WORLD, PETSC_DECIDE, PETSC_DECIDE, M, N, val_dnz, NULL, val_onz, NULL, &H);
 #else  //HAVE_MPI
-    H.resize(M * N);
+    sparse = true;
+    cooRows.reserve(val_dnz * M);
+    cooCols.reserve(val_dnz * M);
+    cooValues.reserve(val_dnz * M);
 #endif //HAVE_MPI
 }
 
@@ -79,7 +87,8 @@ void CInterfaceMatrix::createSparseFullAlloc()
 #ifdef HAVE_MPI
     MatCreateAIJ(MPI_COMM_WORLD, PETSC_DECIDE, PETSC_DECIDE, M, N, N, NULL, N, NULL, &H);
 #else  //HAVE_MPI
-    H.resize(M * N);
+    // The number of nonzeros is not known in advance, the triplets simply grow until assemble()
+    sparse = true;
 #endif //HAVE_MPI
 }
 
@@ -89,7 +98,16 @@ void CInterfaceMatrix::setValue(const int &iGlobalIndex, const int &jGlobalIndex
 #ifdef HAVE_MPI
     MatSetValue(H, iGlobalIndex, jGlobalIndex, value, INSERT_VALUES);
 #else  //HAVE_MPI
-    H[iGlobalIndex * N + jGlobalIndex] = value;
+    if (sparse)
+    {
+        cooRows.push_back(iGlobalIndex);
+        cooCols.push_back(jGlobalIndex);
+        cooValues.push_back(value);
+    }
+    else
+    {
+        H[iGlobalIndex * N + jGlobalIndex] = value;
+    }
 #endif //HAVE_MPI
 }
 
@@ -103,7 +121,7 @@ void CInterfaceMatrix::setValues(int const &m, int const iGlobalIndices[], int c
     {
         for (int jj = 0; jj < n; jj++)
         {
-            H[iGlobalIndices[ii] * N + jGlobalIndices[jj]] = values[ii * n + jj];
+            setValue(iGlobalIndices[ii], jGlobalIndices[jj], values[ii * n + jj]);
         }
     }
 #endif //HAVE_MPI
@@ -115,6 +133,70 @@ void CInterfaceMatrix::assemble()
 #ifdef HAVE_MPI
     MatAssemblyBegin(H, MAT_FINAL_ASSEMBLY);
     MatAssemblyEnd(H, MAT_FINAL_ASSEMBLY);
+#else  //HAVE_MPI
+    if (!sparse)
+        return;
+
+    // Entries from a previous assembly go in front of the pending ones, so that the latter overwrite them (INSERT_VALUES)
+    if (!rowPtr.empty())
+    {
+        vector<int> prevRows(csrValues.size());
+        for (int ii = 0; ii < M; ii++)
+        {
+            fill(prevRows.begin() + rowPtr[ii], prevRows.begin() + rowPtr[ii + 1], ii);
+        }
+        cooRows.insert(cooRows.begin(), prevRows.begin(), prevRows.end());
+        cooCols.insert(cooCols.begin(), colInd.begin(), colInd.end());
+        cooValues.insert(cooValues.begin(), csrValues.begin(), csrValues.end());
+    }
+
+    // Bucket the triplets by row, keeping their insertion order within each row
+    int nnz = cooValues.size();
+    vector<int> rowStart(M + 1, 0);
+    for (int kk = 0; kk < nnz; kk++)
+    {
+        rowStart[cooRows[kk] + 1]++;
+    }
+    for (int ii = 0; ii < M; ii++)
+    {
+        rowStart[ii + 1] += rowStart[ii];
+    }
+    vector<int> perm(nnz);
+    vector<int> rowNext(rowStart.begin(), rowStart.end() - 1);
+    for (int kk = 0; kk < nnz; kk++)
+    {
+        perm[rowNext[cooRows[kk]]++] = kk;
+    }
+
+    // Sort each row by column (stable, so the last inserted duplicate comes last) and merge the duplicates
+    rowPtr.assign(M + 1, 0);
+    colInd.clear();
+    csrValues.clear();
+    colInd.reserve(nnz);
+    csrValues.reserve(nnz);
+    for (int ii = 0; ii < M; ii++)
+    {
+        stable_sort(perm.begin() + rowStart[ii], perm.begin() + rowStart[ii + 1],
+                    [this](int const &a, int const &b) { return cooCols[a] < cooCols[b]; });
+        for (int kk = rowStart[ii]; kk < rowStart[ii + 1]; kk++)
+        {
+            int jj = cooCols[perm[kk]];
+            if ((int)colInd.size() > rowPtr[ii] && colInd.back() == jj)
+            {
+                csrValues.back() = cooValues[perm[kk]];
+            }
+            else
+            {
+                colInd.push_back(jj);
+                csrValues.push_back(cooValues[perm[kk]]);
+            }
+        }
+        rowPtr[ii + 1] = colInd.size();
+    }
+
+    vector<int>().swap(cooRows);
+    vector<int>().swap(cooCols);
+    vector<double>().swap(cooValues);
 #endif //HAVE_MPI
 }
 
@@ -124,9 +206,19 @@ void CInterfaceMatrix::mult(CFlexInterfaceData *B, CFlexInterfaceData *X)
     assert(B->getDim() == X->getDim());
 
 #ifdef HAVE_MPI
-    for (int i = 0; i < X->getDim(); i++)
+    if (X->getDim() == 1)
+    {
+        MatMult(H, B->getData(0), X->getData(0));
+    }
+    else
     {
-        MatMult(H, B->getData(i), X->getData(i));
+        // All the components in a single pass over H
+        Mat BMat = B->getDenseMat();
+        Mat XMat;
+        MatMatMult(H, BMat, MAT_INITIAL_MATRIX, PETSC_DEFAULT, &XMat);
+        X->setDenseMat(XMat);
+        MatDestroy(&BMat);
+        MatDestroy(&XMat);
     }
 #endif //HAVE_MPI
 }
@@ -138,12 +230,33 @@ Mat CInterfaceMatrix::getMat()
     return H;
 }
 #else //HAVE_MPI
+bool CInterfaceMatrix::isSparse() const
+{
+
+    return sparse;
+}
+
 void CInterfaceMatrix::getMat(int *size1, int *size2, double **mat_array)
 {
 
+    assert(!sparse);
+
     *size1 = M;
     *size2 = N;
     *mat_array = &(H.front());
 }
 
+void CInterfaceMatrix::getCSR(int *size_indptr, int **indptr_array, int *size_indices, int **indices_array, int *size_data, double **data_array)
+{
+
+    assert(sparse);
+
+    *size_indptr = rowPtr.size();
+    *indptr_array = rowPtr.data();
+    *size_indices = colInd.size();
+    *indices_array = colInd.data();
+    *size_data = csrValues.size();
+    *data_array = csrValues.data();
+}
+
 #endif //HAVE_MPI
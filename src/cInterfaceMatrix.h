@@ -37,7 +37,12 @@ class CInterfaceMatrix
 #ifdef HAVE_MPI
     Mat H;
 #else  //HAVE_MPI
+    bool sparse;
     std::vector<double> H;
+    std::vector<int> cooRows, cooCols;
+    std::vector<double> cooValues;
+    std::vector<int> rowPtr, colInd;
+    std::vector<double> csrValues;
 #endif //HAVE_MPI
     int M, N;
 
@@ -54,7 +59,9 @@ public:
 #ifdef HAVE_MPI
     Mat getMat();
 #else  //HAVE_MPI
+    bool isSparse() const;
     void getMat(int *size1, int *size2, double **mat_array);
+    void getCSR(int *size_indptr, int **indptr_array, int *size_indices, int **indices_array, int *size_data, double **data_array);
 #endif //HAVE_MPI
 };
 
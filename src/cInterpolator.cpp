@@ -32,6 +32,9 @@
 
 using namespace std;
 
+// Typical number of donors within the radius of a compact RBF, used to size the row buffers
+#define RBF_ROW_LENGTH 64
+
 CInterpolator::CInterpolator(CManager *val_manager) : manager(val_manager)
 {
 
@@ -42,6 +45,8 @@ CInterpolator::CInterpolator(CManager *val_manager) : manager(val_manager)
 
     minDist = nullptr;
     jGlobalVertexSolid_array = nullptr;
+
+    nThreads = 1;
 }
 
 CInterpolator::~CInterpolator()
@@ -72,9 +77,7 @@ void CInterpolator::matching_search(int size_loc_x, double *array_loc_x, int siz
                                     int iProc) const
 {
 
-    double fluidPoint[3] = {0.0, 0.0, 0.0};
-    double dist;
-    int jVertex(100);
+    int const buffSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, iProc)[0];
 
     assert(nf_loc == size_loc_x);
     assert(nf_loc == size_loc_y);
@@ -85,16 +88,17 @@ void CInterpolator::matching_search(int size_loc_x, double *array_loc_x, int siz
     assert(size_buff_x == size_buff_z);
 
     ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
+#pragma omp parallel for schedule(dynamic, 64) num_threads(nThreads)
     for (int iVertex = 0; iVertex < nf_loc; iVertex++)
     {
-        fluidPoint[0] = array_loc_x[iVertex];
-        fluidPoint[1] = array_loc_y[iVertex];
-        fluidPoint[2] = array_loc_z[iVertex];
+        double fluidPoint[3] = {array_loc_x[iVertex], array_loc_y[iVertex], array_loc_z[iVertex]};
+        double dist;
+        int jVertex(100);
         ADT.queryNN(3, fluidPoint, jVertex, dist);
         if (dist < minDist[iVertex])
         {
             minDist[iVertex] = dist;
-            jGlobalVertexSolid_array[iVertex] = manager->getGlobalIndex("solid", iProc, jVertex);
+            jGlobalVertexSolid_array[iVertex] = buffSolidOffset + jVertex;
         }
     }
 }
@@ -102,11 +106,12 @@ void CInterpolator::matching_search(int size_loc_x, double *array_loc_x, int siz
 void CInterpolator::matching_fillMatrix(CInterfaceMatrix *H, CInterfaceMatrix *H_T) const
 {
 
+    int const localFluidOffset = manager->getGlobalIndexRange(CManager::FLUID, myid)[0];
     int iGlobalVertexFluid, jGlobalVertexSolid;
 
     for (int iVertex = 0; iVertex < nf_loc; iVertex++)
     {
-        iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
+        iGlobalVertexFluid = localFluidOffset + iVertex;
         jGlobalVertexSolid = jGlobalVertexSolid_array[iVertex];
         if (minDist[iVertex] > 1e-6)
             cout << "WARNING : Tolerance for matching meshes is not matched between node F" << iGlobalVertexFluid << " and S" << jGlobalVertexSolid << " DISTANCE : " << minDist[iVertex] << " !" << endl;
@@ -121,9 +126,10 @@ void CInterpolator::TPS_fillMatrixA(int size_loc_x, double *array_loc_x, int siz
                                     int iProc) const
 {
 
-    double solidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
-    int iGlobalVertexSolid, jGlobalVertexSolid;
+    int const buffSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, iProc)[0];
+    int const localSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, myid)[0];
+    double solidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexSolid;
 
     assert(ns_loc == size_loc_x);
     assert(ns_loc == size_loc_y);
@@ -135,49 +141,50 @@ void CInterpolator::TPS_fillMatrixA(int size_loc_x, double *array_loc_x, int siz
 
     vector<int> jGlobalVertexSolid_list(size_buff_x);
     vector<int> iGlobalVertexSolid_list(1);
-    vector<double> phi_value(size_buff_x);
+    for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
+    {
+        jGlobalVertexSolid_list[jVertex] = buffSolidOffset + jVertex;
+    }
+
+    int const chunkSize = getChunkSize(size_buff_x);
+    vector<vector<double>> phi_rows(chunkSize);
 
-    for (int iVertex = 0; iVertex < ns_loc; iVertex++)
+    for (int iStart = 0; iStart < ns_loc; iStart += chunkSize)
     {
-        solidPoint[0] = array_loc_x[iVertex];
-        solidPoint[1] = array_loc_y[iVertex];
-        solidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexSolid = manager->getGlobalIndex("solid", myid, iVertex);
-        iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-        for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
+        int const iStop = min(iStart + chunkSize, ns_loc);
+        TPS_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, size_buff_x, buff_x, buff_y, buff_z, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-            jGlobalVertexSolid_list[jVertex] = jGlobalVertexSolid;
-            solidQuery[0] = buff_x[jVertex];
-            solidQuery[1] = buff_y[jVertex];
-            solidQuery[2] = buff_z[jVertex];
-            dist = distance(3, solidPoint, 3, solidQuery);
-            phi = PHI_TPS(dist);
-            phi_value[jVertex] = phi;
-        }
-        //Set PHI block
-        A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));   //set the entire row
-        A_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexSolid_list.front()), &(phi_value.front())); //set the entire column of the transposed matrix
-        //Set P block
-        A->setValue(iGlobalVertexSolid, ns, 1.0);
-        A->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
-        A->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
-        A_T->setValue(ns, iGlobalVertexSolid, 1.0);
-        A_T->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
-        A_T->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
-        //Set P^T block
-        A->setValue(ns, iGlobalVertexSolid, 1.0);
-        A->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
-        A->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
-        A_T->setValue(iGlobalVertexSolid, ns, 1.0);
-        A_T->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
-        A_T->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
-        if (nDim == 3)
-        {
-            A->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
-            A->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
-            A_T->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
-            A_T->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            solidPoint[0] = array_loc_x[iVertex];
+            solidPoint[1] = array_loc_y[iVertex];
+            solidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexSolid = localSolidOffset + iVertex;
+            iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
+            //Set PHI block
+            A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));   //set the entire row
+            A_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexSolid_list.front()), &(phi_value.front())); //set the entire column of the transposed matrix
+            //Set P block
+            A->setValue(iGlobalVertexSolid, ns, 1.0);
+            A->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
+            A->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
+            A_T->setValue(ns, iGlobalVertexSolid, 1.0);
+            A_T->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
+            A_T->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
+            //Set P^T block
+            A->setValue(ns, iGlobalVertexSolid, 1.0);
+            A->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
+            A->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
+            A_T->setValue(iGlobalVertexSolid, ns, 1.0);
+            A_T->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
+            A_T->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
+            if (nDim == 3)
+            {
+                A->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
+                A->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
+                A_T->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
+                A_T->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
+            }
         }
     }
 }
@@ -188,9 +195,10 @@ void CInterpolator::TPS_fillMatrixB(int size_loc_x, double *array_loc_x, int siz
                                     int iProc) const
 {
 
-    double fluidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
-    int iGlobalVertexFluid, jGlobalVertexSolid;
+    int const buffSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, iProc)[0];
+    int const localFluidOffset = manager->getGlobalIndexRange(CManager::FLUID, myid)[0];
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexFluid;
 
     assert(nf_loc == size_loc_x);
     assert(nf_loc == size_loc_y);
@@ -202,40 +210,41 @@ void CInterpolator::TPS_fillMatrixB(int size_loc_x, double *array_loc_x, int siz
 
     vector<int> jGlobalVertexSolid_list(size_buff_x);
     vector<int> iGlobalVertexFluid_list(1);
-    vector<double> phi_value(size_buff_x);
+    for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
+    {
+        jGlobalVertexSolid_list[jVertex] = buffSolidOffset + jVertex;
+    }
 
-    for (int iVertex = 0; iVertex < nf_loc; iVertex++)
+    int const chunkSize = getChunkSize(size_buff_x);
+    vector<vector<double>> phi_rows(chunkSize);
+
+    for (int iStart = 0; iStart < nf_loc; iStart += chunkSize)
     {
-        fluidPoint[0] = array_loc_x[iVertex];
-        fluidPoint[1] = array_loc_y[iVertex];
-        fluidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-        iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-        for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
+        int const iStop = min(iStart + chunkSize, nf_loc);
+        TPS_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, size_buff_x, buff_x, buff_y, buff_z, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-            jGlobalVertexSolid_list[jVertex] = jGlobalVertexSolid;
-            solidQuery[0] = buff_x[jVertex];
-            solidQuery[1] = buff_y[jVertex];
-            solidQuery[2] = buff_z[jVertex];
-            dist = distance(3, fluidPoint, 3, solidQuery);
-            phi = PHI_TPS(dist);
-            phi_value[jVertex] = phi;
-        }
-        //Set PHI block
-        B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));   //set the entire row
-        B_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexFluid_list.front()), &(phi_value.front())); //set the entire column of the transposed matrix
-        //Set P block
-        B->setValue(iGlobalVertexFluid, ns, 1.0);
-        B->setValue(iGlobalVertexFluid, ns + 1, fluidPoint[0]);
-        B->setValue(iGlobalVertexFluid, ns + 2, fluidPoint[1]);
-        B_T->setValue(ns, iGlobalVertexFluid, 1.0);
-        B_T->setValue(ns + 1, iGlobalVertexFluid, fluidPoint[0]);
-        B_T->setValue(ns + 2, iGlobalVertexFluid, fluidPoint[1]);
-        if (nDim == 3)
-        {
-            B->setValue(iGlobalVertexFluid, ns + 3, fluidPoint[2]);
-            B_T->setValue(ns + 3, iGlobalVertexFluid, fluidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            fluidPoint[0] = array_loc_x[iVertex];
+            fluidPoint[1] = array_loc_y[iVertex];
+            fluidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexFluid = localFluidOffset + iVertex;
+            iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
+            //Set PHI block
+            B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));   //set the entire row
+            B_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexFluid_list.front()), &(phi_value.front())); //set the entire column of the transposed matrix
+            //Set P block
+            B->setValue(iGlobalVertexFluid, ns, 1.0);
+            B->setValue(iGlobalVertexFluid, ns + 1, fluidPoint[0]);
+            B->setValue(iGlobalVertexFluid, ns + 2, fluidPoint[1]);
+            B_T->setValue(ns, iGlobalVertexFluid, 1.0);
+            B_T->setValue(ns + 1, iGlobalVertexFluid, fluidPoint[0]);
+            B_T->setValue(ns + 2, iGlobalVertexFluid, fluidPoint[1]);
+            if (nDim == 3)
+            {
+                B->setValue(iGlobalVertexFluid, ns + 3, fluidPoint[2]);
+                B_T->setValue(ns + 3, iGlobalVertexFluid, fluidPoint[2]);
+            }
         }
     }
 }
@@ -246,9 +255,10 @@ void CInterpolator::consistent_TPS_fillMatrixA(int size_loc_x, double *array_loc
                                                int iProc) const
 {
 
-    double solidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
-    int iGlobalVertexSolid, jGlobalVertexSolid;
+    int const buffSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, iProc)[0];
+    int const localSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, myid)[0];
+    double solidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexSolid;
 
     assert(ns_loc == size_loc_x);
     assert(ns_loc == size_loc_y);
@@ -260,40 +270,41 @@ void CInterpolator::consistent_TPS_fillMatrixA(int size_loc_x, double *array_loc
 
     vector<int> jGlobalVertexSolid_list(size_buff_x);
     vector<int> iGlobalVertexSolid_list(1);
-    vector<double> phi_value(size_buff_x);
+    for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
+    {
+        jGlobalVertexSolid_list[jVertex] = buffSolidOffset + jVertex;
+    }
+
+    int const chunkSize = getChunkSize(size_buff_x);
+    vector<vector<double>> phi_rows(chunkSize);
 
-    for (int iVertex = 0; iVertex < ns_loc; iVertex++)
+    for (int iStart = 0; iStart < ns_loc; iStart += chunkSize)
     {
-        solidPoint[0] = array_loc_x[iVertex];
-        solidPoint[1] = array_loc_y[iVertex];
-        solidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexSolid = manager->getGlobalIndex("solid", myid, iVertex);
-        iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-        for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
-        {
-            jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-            jGlobalVertexSolid_list[jVertex] = jGlobalVertexSolid;
-            solidQuery[0] = buff_x[jVertex];
-            solidQuery[1] = buff_y[jVertex];
-            solidQuery[2] = buff_z[jVertex];
-            dist = distance(3, solidPoint, 3, solidQuery);
-            phi = PHI_TPS(dist);
-            phi_value[jVertex] = phi;
-        }
-        //Set PHI block
-        A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front())); //set the entire row
-        //Set P block
-        A->setValue(iGlobalVertexSolid, ns, 1.0);
-        A->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
-        A->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
-        //Set P^T block
-        A->setValue(ns, iGlobalVertexSolid, 1.0);
-        A->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
-        A->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
-        if (nDim == 3)
+        int const iStop = min(iStart + chunkSize, ns_loc);
+        TPS_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, size_buff_x, buff_x, buff_y, buff_z, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            A->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
-            A->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            solidPoint[0] = array_loc_x[iVertex];
+            solidPoint[1] = array_loc_y[iVertex];
+            solidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexSolid = localSolidOffset + iVertex;
+            iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
+            //Set PHI block
+            A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front())); //set the entire row
+            //Set P block
+            A->setValue(iGlobalVertexSolid, ns, 1.0);
+            A->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
+            A->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
+            //Set P^T block
+            A->setValue(ns, iGlobalVertexSolid, 1.0);
+            A->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
+            A->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
+            if (nDim == 3)
+            {
+                A->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
+                A->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
+            }
         }
     }
 }
@@ -304,8 +315,9 @@ void CInterpolator::consistent_TPS_fillMatrixBD(int size_loc_x, double *array_lo
                                                 int iProc) const
 {
 
-    double fluidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
+    int const buffSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, iProc)[0];
+    int const localFluidOffset = manager->getGlobalIndexRange(CManager::FLUID, myid)[0];
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
     int iGlobalVertexFluid, jGlobalVertexSolid;
 
     assert(nf_loc == size_loc_x);
@@ -318,42 +330,52 @@ void CInterpolator::consistent_TPS_fillMatrixBD(int size_loc_x, double *array_lo
 
     vector<int> jGlobalVertexSolid_list(size_buff_x);
     vector<int> iGlobalVertexFluid_list(1);
-    vector<double> phi_value(size_buff_x);
+    for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
+    {
+        jGlobalVertexSolid_list[jVertex] = buffSolidOffset + jVertex;
+    }
 
-    //Build B (donor = solid, target = fluid)
-    //Build D (donor = fluid, target = solid)
-    for (int iVertex = 0; iVertex < nf_loc; iVertex++)
+    //Set the P block of D, it only depends on the solid vertices
+    if (nf_loc > 0)
     {
-        fluidPoint[0] = array_loc_x[iVertex];
-        fluidPoint[1] = array_loc_y[iVertex];
-        fluidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-        iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
         for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
         {
-            jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-            jGlobalVertexSolid_list[jVertex] = jGlobalVertexSolid;
-            solidQuery[0] = buff_x[jVertex];
-            solidQuery[1] = buff_y[jVertex];
-            solidQuery[2] = buff_z[jVertex];
-            dist = distance(3, fluidPoint, 3, solidQuery);
-            phi = PHI_TPS(dist);
-            phi_value[jVertex] = phi;
+            jGlobalVertexSolid = jGlobalVertexSolid_list[jVertex];
             D->setValue(jGlobalVertexSolid, nf, 1.0);
-            D->setValue(jGlobalVertexSolid, nf + 1, solidQuery[0]);
-            D->setValue(jGlobalVertexSolid, nf + 2, solidQuery[1]);
+            D->setValue(jGlobalVertexSolid, nf + 1, buff_x[jVertex]);
+            D->setValue(jGlobalVertexSolid, nf + 2, buff_y[jVertex]);
             if (nDim == 3)
-                D->setValue(jGlobalVertexSolid, nf + 3, solidQuery[2]);
+                D->setValue(jGlobalVertexSolid, nf + 3, buff_z[jVertex]);
         }
-        B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-        B->setValue(iGlobalVertexFluid, ns, 1.0);
-        B->setValue(iGlobalVertexFluid, ns + 1, fluidPoint[0]);
-        B->setValue(iGlobalVertexFluid, ns + 2, fluidPoint[1]);
-        if (nDim == 3)
+    }
+
+    int const chunkSize = getChunkSize(size_buff_x);
+    vector<vector<double>> phi_rows(chunkSize);
+
+    //Build B (donor = solid, target = fluid)
+    //Build D (donor = fluid, target = solid)
+    for (int iStart = 0; iStart < nf_loc; iStart += chunkSize)
+    {
+        int const iStop = min(iStart + chunkSize, nf_loc);
+        TPS_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, size_buff_x, buff_x, buff_y, buff_z, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            B->setValue(iGlobalVertexFluid, ns + 3, fluidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            fluidPoint[0] = array_loc_x[iVertex];
+            fluidPoint[1] = array_loc_y[iVertex];
+            fluidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexFluid = localFluidOffset + iVertex;
+            iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
+            B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
+            B->setValue(iGlobalVertexFluid, ns, 1.0);
+            B->setValue(iGlobalVertexFluid, ns + 1, fluidPoint[0]);
+            B->setValue(iGlobalVertexFluid, ns + 2, fluidPoint[1]);
+            if (nDim == 3)
+            {
+                B->setValue(iGlobalVertexFluid, ns + 3, fluidPoint[2]);
+            }
+            D->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexFluid_list.front()), &(phi_value.front()));
         }
-        D->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexFluid_list.front()), &(phi_value.front()));
     }
 }
 
@@ -363,9 +385,10 @@ void CInterpolator::consistent_TPS_fillMatrixC(int size_loc_x, double *array_loc
                                                int iProc) const
 {
 
-    double fluidPoint[3] = {0.0, 0.0, 0.0}, fluidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
-    int iGlobalVertexFluid, jGlobalVertexFluid;
+    int const buffFluidOffset = manager->getGlobalIndexRange(CManager::FLUID, iProc)[0];
+    int const localFluidOffset = manager->getGlobalIndexRange(CManager::FLUID, myid)[0];
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexFluid;
 
     assert(nf_loc == size_loc_x);
     assert(nf_loc == size_loc_y);
@@ -377,40 +400,41 @@ void CInterpolator::consistent_TPS_fillMatrixC(int size_loc_x, double *array_loc
 
     vector<int> jGlobalVertexFluid_list(size_buff_x);
     vector<int> iGlobalVertexFluid_list(1);
-    vector<double> phi_value(size_buff_x);
+    for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
+    {
+        jGlobalVertexFluid_list[jVertex] = buffFluidOffset + jVertex;
+    }
 
-    for (int iVertex = 0; iVertex < nf_loc; iVertex++)
+    int const chunkSize = getChunkSize(size_buff_x);
+    vector<vector<double>> phi_rows(chunkSize);
+
+    for (int iStart = 0; iStart < nf_loc; iStart += chunkSize)
     {
-        fluidPoint[0] = array_loc_x[iVertex];
-        fluidPoint[1] = array_loc_y[iVertex];
-        fluidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-        iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-        for (int jVertex = 0; jVertex < size_buff_x; jVertex++)
+        int const iStop = min(iStart + chunkSize, nf_loc);
+        TPS_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, size_buff_x, buff_x, buff_y, buff_z, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            jGlobalVertexFluid = manager->getGlobalIndex("fluid", iProc, jVertex);
-            jGlobalVertexFluid_list[jVertex] = jGlobalVertexFluid;
-            fluidQuery[0] = buff_x[jVertex];
-            fluidQuery[1] = buff_y[jVertex];
-            fluidQuery[2] = buff_z[jVertex];
-            dist = distance(3, fluidPoint, 3, fluidQuery);
-            phi = PHI_TPS(dist);
-            phi_value[jVertex] = phi;
-        }
-        //Set block PHI
-        C->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexFluid_list.size()), &(jGlobalVertexFluid_list.front()), &(phi_value.front()));
-        //Set block P
-        C->setValue(iGlobalVertexFluid, nf, 1.0);
-        C->setValue(iGlobalVertexFluid, nf + 1, fluidPoint[0]);
-        C->setValue(iGlobalVertexFluid, nf + 2, fluidPoint[1]);
-        //Set block P^T
-        C->setValue(nf, iGlobalVertexFluid, 1.0);
-        C->setValue(nf + 1, iGlobalVertexFluid, fluidPoint[0]);
-        C->setValue(nf + 2, iGlobalVertexFluid, fluidPoint[1]);
-        if (nDim == 3)
-        {
-            C->setValue(iGlobalVertexFluid, nf + 3, fluidPoint[2]);
-            C->setValue(nf + 3, iGlobalVertexFluid, fluidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            fluidPoint[0] = array_loc_x[iVertex];
+            fluidPoint[1] = array_loc_y[iVertex];
+            fluidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexFluid = localFluidOffset + iVertex;
+            iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
+            //Set block PHI
+            C->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexFluid_list.size()), &(jGlobalVertexFluid_list.front()), &(phi_value.front()));
+            //Set block P
+            C->setValue(iGlobalVertexFluid, nf, 1.0);
+            C->setValue(iGlobalVertexFluid, nf + 1, fluidPoint[0]);
+            C->setValue(iGlobalVertexFluid, nf + 2, fluidPoint[1]);
+            //Set block P^T
+            C->setValue(nf, iGlobalVertexFluid, 1.0);
+            C->setValue(nf + 1, iGlobalVertexFluid, fluidPoint[0]);
+            C->setValue(nf + 2, iGlobalVertexFluid, fluidPoint[1]);
+            if (nDim == 3)
+            {
+                C->setValue(iGlobalVertexFluid, nf + 3, fluidPoint[2]);
+                C->setValue(nf + 3, iGlobalVertexFluid, fluidPoint[2]);
+            }
         }
     }
 }
@@ -421,13 +445,12 @@ void CInterpolator::RBF_fillMatrixA(int size_loc_x, double *array_loc_x, int siz
                                     int iProc, double const &radius) const
 {
 
-    double solidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
-    int iGlobalVertexSolid, jGlobalVertexSolid;
-    vector<int> solidVertices;
+    int const buffSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, iProc)[0];
+    int const localSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, myid)[0];
+    double solidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexSolid;
     vector<int> jGlobalVertexSolid_list;
     vector<int> iGlobalVertexSolid_list(1);
-    vector<double> phi_value;
 
     assert(ns_loc == size_loc_x);
     assert(ns_loc == size_loc_y);
@@ -437,51 +460,52 @@ void CInterpolator::RBF_fillMatrixA(int size_loc_x, double *array_loc_x, int siz
     assert(size_buff_y == size_buff_z);
     assert(size_buff_x == size_buff_z);
 
+    int const chunkSize = getChunkSize(RBF_ROW_LENGTH);
+    vector<vector<int>> solidVertices_rows(chunkSize);
+    vector<vector<double>> phi_rows(chunkSize);
+
     ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-    for (int iVertex = 0; iVertex < ns_loc; iVertex++)
+    for (int iStart = 0; iStart < ns_loc; iStart += chunkSize)
     {
-        solidPoint[0] = array_loc_x[iVertex];
-        solidPoint[1] = array_loc_y[iVertex];
-        solidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexSolid = manager->getGlobalIndex("solid", myid, iVertex);
-        iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-        jGlobalVertexSolid_list.clear();
-        phi_value.clear();
-        ADT.queryBallNN(3, solidPoint, radius, solidVertices);
-        for (int jVertex : solidVertices)
-        {
-            jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-            jGlobalVertexSolid_list.push_back(jGlobalVertexSolid);
-            solidQuery[0] = buff_x[jVertex];
-            solidQuery[1] = buff_y[jVertex];
-            solidQuery[2] = buff_z[jVertex];
-            dist = distance(3, solidPoint, 3, solidQuery);
-            phi = PHI_RBF(dist, radius);
-            phi_value.push_back(phi);
-        }
-        //Set block PHI
-        A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-        A_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexSolid_list.front()), &(phi_value.front()));
-        //set block P
-        A->setValue(iGlobalVertexSolid, ns, 1.0);
-        A->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
-        A->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
-        A_T->setValue(ns, iGlobalVertexSolid, 1.0);
-        A_T->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
-        A_T->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
-        //Set block P^T
-        A->setValue(ns, iGlobalVertexSolid, 1.0);
-        A->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
-        A->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
-        A_T->setValue(iGlobalVertexSolid, ns, 1.0);
-        A_T->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
-        A_T->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
-        if (nDim == 3)
+        int const iStop = min(iStart + chunkSize, ns_loc);
+        RBF_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, ADT, buff_x, buff_y, buff_z, radius, solidVertices_rows, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            A->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
-            A->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
-            A_T->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
-            A_T->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            solidPoint[0] = array_loc_x[iVertex];
+            solidPoint[1] = array_loc_y[iVertex];
+            solidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexSolid = localSolidOffset + iVertex;
+            iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
+            jGlobalVertexSolid_list.clear();
+            for (int jVertex : solidVertices_rows[iVertex - iStart])
+            {
+                jGlobalVertexSolid_list.push_back(buffSolidOffset + jVertex);
+            }
+            //Set block PHI
+            A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
+            A_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexSolid_list.front()), &(phi_value.front()));
+            //set block P
+            A->setValue(iGlobalVertexSolid, ns, 1.0);
+            A->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
+            A->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
+            A_T->setValue(ns, iGlobalVertexSolid, 1.0);
+            A_T->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
+            A_T->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
+            //Set block P^T
+            A->setValue(ns, iGlobalVertexSolid, 1.0);
+            A->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
+            A->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
+            A_T->setValue(iGlobalVertexSolid, ns, 1.0);
+            A_T->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
+            A_T->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
+            if (nDim == 3)
+            {
+                A->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
+                A->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
+                A_T->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
+                A_T->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
+            }
         }
     }
 }
@@ -492,12 +516,11 @@ void CInterpolator::RBF_fillMatrixB(int size_loc_x, double *array_loc_x, int siz
                                     int iProc, double const &radius) const
 {
 
-    double fluidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
-    int iGlobalVertexFluid, jGlobalVertexSolid;
-    vector<int> solidVertices;
+    int const buffSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, iProc)[0];
+    int const localFluidOffset = manager->getGlobalIndexRange(CManager::FLUID, myid)[0];
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexFluid;
     vector<int> jGlobalVertexSolid_list;
-    vector<double> phi_value;
     vector<int> iGlobalVertexFluid_list(1);
 
     assert(nf_loc == size_loc_x);
@@ -508,40 +531,41 @@ void CInterpolator::RBF_fillMatrixB(int size_loc_x, double *array_loc_x, int siz
     assert(size_buff_y == size_buff_z);
     assert(size_buff_x == size_buff_z);
 
+    int const chunkSize = getChunkSize(RBF_ROW_LENGTH);
+    vector<vector<int>> solidVertices_rows(chunkSize);
+    vector<vector<double>> phi_rows(chunkSize);
+
     ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-    for (int iVertex = 0; iVertex < nf_loc; iVertex++)
+    for (int iStart = 0; iStart < nf_loc; iStart += chunkSize)
     {
-        fluidPoint[0] = array_loc_x[iVertex];
-        fluidPoint[1] = array_loc_y[iVertex];
-        fluidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-        iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-        jGlobalVertexSolid_list.clear();
-        phi_value.clear();
-        ADT.queryBallNN(3, fluidPoint, radius, solidVertices);
-        for (int jVertex : solidVertices)
-        {
-            jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-            jGlobalVertexSolid_list.push_back(jGlobalVertexSolid);
-            solidQuery[0] = buff_x[jVertex];
-            solidQuery[1] = buff_y[jVertex];
-            solidQuery[2] = buff_z[jVertex];
-            dist = distance(3, fluidPoint, 3, solidQuery);
-            phi = PHI_RBF(dist, radius);
-            phi_value.push_back(phi);
-        }
-        B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-        B_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexFluid_list.front()), &(phi_value.front()));
-        B->setValue(iGlobalVertexFluid, ns, 1.0);
-        B->setValue(iGlobalVertexFluid, ns + 1, fluidPoint[0]);
-        B->setValue(iGlobalVertexFluid, ns + 2, fluidPoint[1]);
-        B_T->setValue(ns, iGlobalVertexFluid, 1.0);
-        B_T->setValue(ns + 1, iGlobalVertexFluid, fluidPoint[0]);
-        B_T->setValue(ns + 2, iGlobalVertexFluid, fluidPoint[1]);
-        if (nDim == 3)
+        int const iStop = min(iStart + chunkSize, nf_loc);
+        RBF_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, ADT, buff_x, buff_y, buff_z, radius, solidVertices_rows, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            B->setValue(iGlobalVertexFluid, ns + 3, fluidPoint[2]);
-            B_T->setValue(ns + 3, iGlobalVertexFluid, fluidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            fluidPoint[0] = array_loc_x[iVertex];
+            fluidPoint[1] = array_loc_y[iVertex];
+            fluidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexFluid = localFluidOffset + iVertex;
+            iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
+            jGlobalVertexSolid_list.clear();
+            for (int jVertex : solidVertices_rows[iVertex - iStart])
+            {
+                jGlobalVertexSolid_list.push_back(buffSolidOffset + jVertex);
+            }
+            B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
+            B_T->setValues(static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), 1, &(iGlobalVertexFluid_list.front()), &(phi_value.front()));
+            B->setValue(iGlobalVertexFluid, ns, 1.0);
+            B->setValue(iGlobalVertexFluid, ns + 1, fluidPoint[0]);
+            B->setValue(iGlobalVertexFluid, ns + 2, fluidPoint[1]);
+            B_T->setValue(ns, iGlobalVertexFluid, 1.0);
+            B_T->setValue(ns + 1, iGlobalVertexFluid, fluidPoint[0]);
+            B_T->setValue(ns + 2, iGlobalVertexFluid, fluidPoint[1]);
+            if (nDim == 3)
+            {
+                B->setValue(iGlobalVertexFluid, ns + 3, fluidPoint[2]);
+                B_T->setValue(ns + 3, iGlobalVertexFluid, fluidPoint[2]);
+            }
         }
     }
 }
@@ -552,13 +576,12 @@ void CInterpolator::consistent_RBF_fillMatrixA(int size_loc_x, double *array_loc
                                                int iProc, double const &radius) const
 {
 
-    double solidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
-    int iGlobalVertexSolid, jGlobalVertexSolid;
-    vector<int> solidVertices;
+    int const buffSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, iProc)[0];
+    int const localSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, myid)[0];
+    double solidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexSolid;
     vector<int> jGlobalVertexSolid_list;
     vector<int> iGlobalVertexSolid_list(1);
-    vector<double> phi_value;
 
     assert(ns_loc == size_loc_x);
     assert(ns_loc == size_loc_y);
@@ -568,42 +591,43 @@ void CInterpolator::consistent_RBF_fillMatrixA(int size_loc_x, double *array_loc
     assert(size_buff_y == size_buff_z);
     assert(size_buff_x == size_buff_z);
 
+    int const chunkSize = getChunkSize(RBF_ROW_LENGTH);
+    vector<vector<int>> solidVertices_rows(chunkSize);
+    vector<vector<double>> phi_rows(chunkSize);
+
     ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-    for (int iVertex = 0; iVertex < ns_loc; iVertex++)
+    for (int iStart = 0; iStart < ns_loc; iStart += chunkSize)
     {
-        solidPoint[0] = array_loc_x[iVertex];
-        solidPoint[1] = array_loc_y[iVertex];
-        solidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexSolid = manager->getGlobalIndex("solid", myid, iVertex);
-        iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-        jGlobalVertexSolid_list.clear();
-        phi_value.clear();
-        ADT.queryBallNN(3, solidPoint, radius, solidVertices);
-        for (int jVertex : solidVertices)
-        {
-            jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-            jGlobalVertexSolid_list.push_back(jGlobalVertexSolid);
-            solidQuery[0] = buff_x[jVertex];
-            solidQuery[1] = buff_y[jVertex];
-            solidQuery[2] = buff_z[jVertex];
-            dist = distance(3, solidPoint, 3, solidQuery);
-            phi = PHI_RBF(dist, radius);
-            phi_value.push_back(phi);
-        }
-        //Set block PHI
-        A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-        //Set block P
-        A->setValue(iGlobalVertexSolid, ns, 1.0);
-        A->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
-        A->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
-        //Set block P^T
-        A->setValue(ns, iGlobalVertexSolid, 1.0);
-        A->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
-        A->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
-        if (nDim == 3)
+        int const iStop = min(iStart + chunkSize, ns_loc);
+        RBF_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, ADT, buff_x, buff_y, buff_z, radius, solidVertices_rows, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            A->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
-            A->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            solidPoint[0] = array_loc_x[iVertex];
+            solidPoint[1] = array_loc_y[iVertex];
+            solidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexSolid = localSolidOffset + iVertex;
+            iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
+            jGlobalVertexSolid_list.clear();
+            for (int jVertex : solidVertices_rows[iVertex - iStart])
+            {
+                jGlobalVertexSolid_list.push_back(buffSolidOffset + jVertex);
+            }
+            //Set block PHI
+            A->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
+            //Set block P
+            A->setValue(iGlobalVertexSolid, ns, 1.0);
+            A->setValue(iGlobalVertexSolid, ns + 1, solidPoint[0]);
+            A->setValue(iGlobalVertexSolid, ns + 2, solidPoint[1]);
+            //Set block P^T
+            A->setValue(ns, iGlobalVertexSolid, 1.0);
+            A->setValue(ns + 1, iGlobalVertexSolid, solidPoint[0]);
+            A->setValue(ns + 2, iGlobalVertexSolid, solidPoint[1]);
+            if (nDim == 3)
+            {
+                A->setValue(iGlobalVertexSolid, ns + 3, solidPoint[2]);
+                A->setValue(ns + 3, iGlobalVertexSolid, solidPoint[2]);
+            }
         }
     }
 }
@@ -614,19 +638,16 @@ void CInterpolator::consistent_RBF_fillMatrixBD(int size_loc_x, double *array_lo
                                                 int iProc, double const &radius) const
 {
 
-    double fluidPoint[3] = {0.0, 0.0, 0.0}, solidQuery[3] = {0.0, 0.0, 0.0};
-    double solidPoint[3] = {0.0, 0.0, 0.0}, fluidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
-    int iGlobalVertexFluid, jGlobalVertexSolid;
-    int iGlobalVertexSolid, jGlobalVertexFluid;
-    vector<int> solidVertices;
-    vector<int> fluidVertices;
+    int const buffSolidOffset = manager->getGlobalIndexRange(CManager::SOLID, iProc)[0];
+    int const localFluidOffset = manager->getGlobalIndexRange(CManager::FLUID, myid)[0];
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
+    double solidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexFluid, iGlobalVertexSolid;
 
     vector<int> jGlobalVertexSolid_list;
     vector<int> iGlobalVertexFluid_list(1);
     vector<int> jGlobalVertexFluid_list;
     vector<int> iGlobalVertexSolid_list(1);
-    vector<double> phi_value;
 
     assert(nf_loc == size_loc_x);
     assert(nf_loc == size_loc_y);
@@ -636,69 +657,67 @@ void CInterpolator::consistent_RBF_fillMatrixBD(int size_loc_x, double *array_lo
     assert(size_buff_y == size_buff_z);
     assert(size_buff_x == size_buff_z);
 
+    int const chunkSize = getChunkSize(RBF_ROW_LENGTH);
+    vector<vector<int>> vertices_rows(chunkSize);
+    vector<vector<double>> phi_rows(chunkSize);
+
     //Build B (donor = solid, target = fluid)
     ADTPoint ADTDonor(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-    for (int iVertex = 0; iVertex < nf_loc; iVertex++)
+    for (int iStart = 0; iStart < nf_loc; iStart += chunkSize)
     {
-        fluidPoint[0] = array_loc_x[iVertex];
-        fluidPoint[1] = array_loc_y[iVertex];
-        fluidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-        iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-        jGlobalVertexSolid_list.clear();
-        phi_value.clear();
-        ADTDonor.queryBallNN(3, fluidPoint, radius, solidVertices);
-        for (int jVertex : solidVertices)
+        int const iStop = min(iStart + chunkSize, nf_loc);
+        RBF_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, ADTDonor, buff_x, buff_y, buff_z, radius, vertices_rows, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            jGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, jVertex);
-            jGlobalVertexSolid_list.push_back(jGlobalVertexSolid);
-            solidQuery[0] = buff_x[jVertex];
-            solidQuery[1] = buff_y[jVertex];
-            solidQuery[2] = buff_z[jVertex];
-            dist = distance(3, fluidPoint, 3, solidQuery);
-            phi = PHI_RBF(dist, radius);
-            phi_value.push_back(phi);
-        }
-        B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
-        B->setValue(iGlobalVertexFluid, ns, 1.0);
-        B->setValue(iGlobalVertexFluid, ns + 1, fluidPoint[0]);
-        B->setValue(iGlobalVertexFluid, ns + 2, fluidPoint[1]);
-        if (nDim == 3)
-        {
-            B->setValue(iGlobalVertexFluid, ns + 3, fluidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            fluidPoint[0] = array_loc_x[iVertex];
+            fluidPoint[1] = array_loc_y[iVertex];
+            fluidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexFluid = localFluidOffset + iVertex;
+            iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
+            jGlobalVertexSolid_list.clear();
+            for (int jVertex : vertices_rows[iVertex - iStart])
+            {
+                jGlobalVertexSolid_list.push_back(buffSolidOffset + jVertex);
+            }
+            B->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexSolid_list.size()), &(jGlobalVertexSolid_list.front()), &(phi_value.front()));
+            B->setValue(iGlobalVertexFluid, ns, 1.0);
+            B->setValue(iGlobalVertexFluid, ns + 1, fluidPoint[0]);
+            B->setValue(iGlobalVertexFluid, ns + 2, fluidPoint[1]);
+            if (nDim == 3)
+            {
+                B->setValue(iGlobalVertexFluid, ns + 3, fluidPoint[2]);
+            }
         }
     }
 
     //Build D (donor = fluid, target = solid)
     ADTPoint ADTTarget(size_loc_x, array_loc_x, size_loc_y, array_loc_y, size_loc_z, array_loc_z);
-    for (int iVertex = 0; iVertex < size_buff_x; iVertex++)
+    for (int iStart = 0; iStart < size_buff_x; iStart += chunkSize)
     {
-        solidPoint[0] = buff_x[iVertex];
-        solidPoint[1] = buff_y[iVertex];
-        solidPoint[2] = buff_z[iVertex];
-        iGlobalVertexSolid = manager->getGlobalIndex("solid", iProc, iVertex);
-        iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
-        jGlobalVertexFluid_list.clear();
-        phi_value.clear();
-        ADTTarget.queryBallNN(3, solidPoint, radius, fluidVertices);
-        for (int jVertex : fluidVertices)
+        int const iStop = min(iStart + chunkSize, size_buff_x);
+        RBF_computeRows(iStart, iStop, buff_x, buff_y, buff_z, ADTTarget, array_loc_x, array_loc_y, array_loc_z, radius, vertices_rows, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
         {
-            jGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, jVertex);
-            jGlobalVertexFluid_list.push_back(jGlobalVertexFluid);
-            fluidQuery[0] = array_loc_x[jVertex];
-            fluidQuery[1] = array_loc_y[jVertex];
-            fluidQuery[2] = array_loc_z[jVertex];
-            dist = distance(3, solidPoint, 3, fluidQuery);
-            phi = PHI_RBF(dist, radius);
-            phi_value.push_back(phi);
-        }
-        D->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexFluid_list.size()), &(jGlobalVertexFluid_list.front()), &(phi_value.front()));
-        D->setValue(iGlobalVertexSolid, nf, 1.0);
-        D->setValue(iGlobalVertexSolid, nf + 1, solidPoint[0]);
-        D->setValue(iGlobalVertexSolid, nf + 2, solidPoint[1]);
-        if (nDim == 3)
-        {
-            D->setValue(iGlobalVertexSolid, nf + 3, solidPoint[2]);
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            solidPoint[0] = buff_x[iVertex];
+            solidPoint[1] = buff_y[iVertex];
+            solidPoint[2] = buff_z[iVertex];
+            iGlobalVertexSolid = buffSolidOffset + iVertex;
+            iGlobalVertexSolid_list[0] = iGlobalVertexSolid;
+            jGlobalVertexFluid_list.clear();
+            for (int jVertex : vertices_rows[iVertex - iStart])
+            {
+                jGlobalVertexFluid_list.push_back(localFluidOffset + jVertex);
+            }
+            D->setValues(1, &(iGlobalVertexSolid_list.front()), static_cast<int>(jGlobalVertexFluid_list.size()), &(jGlobalVertexFluid_list.front()), &(phi_value.front()));
+            D->setValue(iGlobalVertexSolid, nf, 1.0);
+            D->setValue(iGlobalVertexSolid, nf + 1, solidPoint[0]);
+            D->setValue(iGlobalVertexSolid, nf + 2, solidPoint[1]);
+            if (nDim == 3)
+            {
+                D->setValue(iGlobalVertexSolid, nf + 3, solidPoint[2]);
+            }
         }
     }
 }
@@ -709,13 +728,12 @@ void CInterpolator::consistent_RBF_fillMatrixC(int size_loc_x, double *array_loc
                                                int iProc, double const &radius) const
 {
 
-    double fluidPoint[3] = {0.0, 0.0, 0.0}, fluidQuery[3] = {0.0, 0.0, 0.0};
-    double phi, dist;
-    int iGlobalVertexFluid, jGlobalVertexFluid;
-    vector<int> fluidVertices;
+    int const buffFluidOffset = manager->getGlobalIndexRange(CManager::FLUID, iProc)[0];
+    int const localFluidOffset = manager->getGlobalIndexRange(CManager::FLUID, myid)[0];
+    double fluidPoint[3] = {0.0, 0.0, 0.0};
+    int iGlobalVertexFluid;
     vector<int> iGlobalVertexFluid_list(1);
     vector<int> jGlobalVertexFluid_list;
-    vector<double> phi_value;
 
     assert(nf_loc == size_loc_x);
     assert(nf_loc == size_loc_y);
@@ -725,46 +743,126 @@ void CInterpolator::consistent_RBF_fillMatrixC(int size_loc_x, double *array_loc
     assert(size_buff_y == size_buff_z);
     assert(size_buff_x == size_buff_z);
 
+    int const chunkSize = getChunkSize(RBF_ROW_LENGTH);
+    vector<vector<int>> fluidVertices_rows(chunkSize);
+    vector<vector<double>> phi_rows(chunkSize);
+
     ADTPoint ADT(size_buff_x, buff_x, size_buff_y, buff_y, size_buff_z, buff_z);
-    for (int iVertex = 0; iVertex < nf_loc; iVertex++)
+    for (int iStart = 0; iStart < nf_loc; iStart += chunkSize)
+    {
+        int const iStop = min(iStart + chunkSize, nf_loc);
+        RBF_computeRows(iStart, iStop, array_loc_x, array_loc_y, array_loc_z, ADT, buff_x, buff_y, buff_z, radius, fluidVertices_rows, phi_rows);
+        for (int iVertex = iStart; iVertex < iStop; iVertex++)
+        {
+            vector<double> &phi_value = phi_rows[iVertex - iStart];
+            fluidPoint[0] = array_loc_x[iVertex];
+            fluidPoint[1] = array_loc_y[iVertex];
+            fluidPoint[2] = array_loc_z[iVertex];
+            iGlobalVertexFluid = localFluidOffset + iVertex;
+            iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
+            jGlobalVertexFluid_list.clear();
+            for (int jVertex : fluidVertices_rows[iVertex - iStart])
+            {
+                jGlobalVertexFluid_list.push_back(buffFluidOffset + jVertex);
+            }
+            //Set block PHI
+            C->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexFluid_list.size()), &(jGlobalVertexFluid_list.front()), &(phi_value.front()));
+            //Set block P
+            C->setValue(iGlobalVertexFluid, nf, 1.0);
+            C->setValue(iGlobalVertexFluid, nf + 1, fluidPoint[0]);
+            C->setValue(iGlobalVertexFluid, nf + 2, fluidPoint[1]);
+            //Set block P^T
+            C->setValue(nf, iGlobalVertexFluid, 1.0);
+            C->setValue(nf + 1, iGlobalVertexFluid, fluidPoint[0]);
+            C->setValue(nf + 2, iGlobalVertexFluid, fluidPoint[1]);
+            if (nDim == 3)
+            {
+                C->setValue(iGlobalVertexFluid, nf + 3, fluidPoint[2]);
+                C->setValue(nf + 3, iGlobalVertexFluid, fluidPoint[2]);
+            }
+        }
+    }
+}
+
+void CInterpolator::TPS_computeRows(int const &iStart, int const &iStop,
+                                    double *target_x, double *target_y, double *target_z,
+                                    int const &nDonor, double *donor_x, double *donor_y, double *donor_z,
+                                    vector<vector<double>> &phi_rows) const
+{
+    // Rows iStart to iStop-1 of the TPS kernel matrix (all the donors), computed in parallel
+
+#pragma omp parallel for schedule(static) num_threads(nThreads)
+    for (int iVertex = iStart; iVertex < iStop; iVertex++)
     {
-        fluidPoint[0] = array_loc_x[iVertex];
-        fluidPoint[1] = array_loc_y[iVertex];
-        fluidPoint[2] = array_loc_z[iVertex];
-        iGlobalVertexFluid = manager->getGlobalIndex("fluid", myid, iVertex);
-        iGlobalVertexFluid_list[0] = iGlobalVertexFluid;
-        jGlobalVertexFluid_list.clear();
-        phi_value.clear();
-        ADT.queryBallNN(3, fluidPoint, radius, fluidVertices);
-        for (int jVertex : fluidVertices)
+        double targetPoint[3] = {target_x[iVertex], target_y[iVertex], target_z[iVertex]};
+        double donorPoint[3];
+        double dist;
+        vector<double> &phi_value = phi_rows[iVertex - iStart];
+        phi_value.resize(nDonor);
+        for (int jVertex = 0; jVertex < nDonor; jVertex++)
         {
-            jGlobalVertexFluid = manager->getGlobalIndex("fluid", iProc, jVertex);
-            jGlobalVertexFluid_list.push_back(jGlobalVertexFluid);
-            fluidQuery[0] = buff_x[jVertex];
-            fluidQuery[1] = buff_y[jVertex];
-            fluidQuery[2] = buff_z[jVertex];
-            dist = distance(3, fluidPoint, 3, fluidQuery);
-            phi = PHI_RBF(dist, radius);
-            phi_value.push_back(phi);
+            donorPoint[0] = donor_x[jVertex];
+            donorPoint[1] = donor_y[jVertex];
+            donorPoint[2] = donor_z[jVertex];
+            dist = distance(3, targetPoint, 3, donorPoint);
+            phi_value[jVertex] = PHI_TPS(dist);
         }
-        //Set block PHI
-        C->setValues(1, &(iGlobalVertexFluid_list.front()), static_cast<int>(jGlobalVertexFluid_list.size()), &(jGlobalVertexFluid_list.front()), &(phi_value.front()));
-        //Set block P
-        C->setValue(iGlobalVertexFluid, nf, 1.0);
-        C->setValue(iGlobalVertexFluid, nf + 1, fluidPoint[0]);
-        C->setValue(iGlobalVertexFluid, nf + 2, fluidPoint[1]);
-        //Set block P^T
-        C->setValue(nf, iGlobalVertexFluid, 1.0);
-        C->setValue(nf + 1, iGlobalVertexFluid, fluidPoint[0]);
-        C->setValue(nf + 2, iGlobalVertexFluid, fluidPoint[1]);
-        if (nDim == 3)
+    }
+}
+
+void CInterpolator::RBF_computeRows(int const &iStart, int const &iStop,
+                                    double *target_x, double *target_y, double *target_z,
+                                    ADTPoint &donorADT, double *donor_x, double *donor_y, double *donor_z, double const &radius,
+                                    vector<vector<int>> &donor_rows, vector<vector<double>> &phi_rows) const
+{
+    // Rows iStart to iStop-1 of the RBF kernel matrix (donors within the radius only), computed in parallel
+
+#pragma omp parallel for schedule(dynamic, 16) num_threads(nThreads)
+    for (int iVertex = iStart; iVertex < iStop; iVertex++)
+    {
+        double targetPoint[3] = {target_x[iVertex], target_y[iVertex], target_z[iVertex]};
+        double donorPoint[3];
+        double dist;
+        vector<int> &donorVertices = donor_rows[iVertex - iStart];
+        vector<double> &phi_value = phi_rows[iVertex - iStart];
+        donorADT.queryBallNN(3, targetPoint, radius, donorVertices);
+        phi_value.resize(donorVertices.size());
+        for (unsigned int kk = 0; kk < donorVertices.size(); kk++)
         {
-            C->setValue(iGlobalVertexFluid, nf + 3, fluidPoint[2]);
-            C->setValue(nf + 3, iGlobalVertexFluid, fluidPoint[2]);
+            donorPoint[0] = donor_x[donorVertices[kk]];
+            donorPoint[1] = donor_y[donorVertices[kk]];
+            donorPoint[2] = donor_z[donorVertices[kk]];
+            dist = distance(3, targetPoint, 3, donorPoint);
+            phi_value[kk] = PHI_RBF(dist, radius);
         }
     }
 }
 
+int CInterpolator::getChunkSize(int const &rowLength) const
+{
+    // Number of rows generated before being inserted, so that the row buffers stay below ~4M entries
+
+    return max(nThreads, min(256 * nThreads, 4194304 / max(rowLength, 1)));
+}
+
+void CInterpolator::setNumberOfThreads(int const &val_nThreads)
+{
+
+#ifdef _OPENMP
+    nThreads = max(1, val_nThreads);
+#else  //_OPENMP
+    if (val_nThreads > 1)
+        cout << "WARNING : CUPyDO has been built without OpenMP, the interpolation matrices are assembled on a single thread." << endl;
+    nThreads = 1;
+#endif //_OPENMP
+}
+
+int CInterpolator::getNumberOfThreads() const
+{
+
+    return nThreads;
+}
+
 double CInterpolator::PHI_TPS(double &distance) const
 {
 
@@ -22,20 +22,41 @@
 #ifndef CINTERPOLATOR_H
 #define CINTERPOLATOR_H
 
+#include <vector>
+
 #include "cManager.h"
 #include "cInterfaceMatrix.h"
 
+class ADTPoint;
+
 class CInterpolator
 {
     CManager *manager;
     double *minDist;
     int *jGlobalVertexSolid_array;
+    int nThreads;
+
+    void TPS_computeRows(int const &iStart, int const &iStop,
+                         double *target_x, double *target_y, double *target_z,
+                         int const &nDonor, double *donor_x, double *donor_y, double *donor_z,
+                         std::vector<std::vector<double>> &phi_rows) const;
+
+    void RBF_computeRows(int const &iStart, int const &iStop,
+                         double *target_x, double *target_y, double *target_z,
+                         ADTPoint &donorADT, double *donor_x, double *donor_y, double *donor_z, double const &radius,
+                         std::vector<std::vector<int>> &donor_rows, std::vector<std::vector<double>> &phi_rows) const;
+
+    int getChunkSize(int const &rowLength) const;
 
 public:
     CInterpolator(CManager *val_manager);
 
     virtual ~CInterpolator();
 
+    void setNumberOfThreads(int const &val_nThreads);
+
+    int getNumberOfThreads() const;
+
     void matching_initSearch();
 
     void matching_search(int size_loc_x, double *array_loc_x, int size_loc_y, double *array_loc_y, int size_loc_z, double *array_loc_z,
@@ -23,6 +23,7 @@
 #include <cassert>
 
 #ifdef HAVE_MPI
+#include "petscversion.h"
 #include "petscvec.h"
 #include "petscmat.h"
 #include "petscksp.h"
@@ -70,6 +71,21 @@ void CLinearSolver::solve(CFlexInterfaceData *B, CFlexInterfaceData *X)
 
     assert(X->getDim() == B->getDim());
 
+#if PETSC_VERSION_GE(3, 14, 0)
+    if (X->getDim() > 1)
+    {
+        // All the components are solved at once, X holds the initial guess
+        Mat BMat = B->getDenseMat();
+        Mat XMat = X->getDenseMat();
+        KSPMatSolve(KSPSolver, BMat, XMat);
+        monitor();
+        X->setDenseMat(XMat);
+        MatDestroy(&BMat);
+        MatDestroy(&XMat);
+        return;
+    }
+#endif //PETSC_VERSION_GE
+
     for (int i = 0; i < X->getDim(); i++)
     {
         KSPSolve(KSPSolver, B->getData(i), X->getData(i));
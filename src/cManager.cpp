@@ -59,35 +59,46 @@ CManager::~CManager()
 #endif //NDEBUG
 }
 
-int CManager::getGlobalIndex(string const &str_physics, int const &iProc, int const &iVertex)
+int CManager::getPhysics(string const &str_physics)
 {
 
     int physics;
 
     if (str_physics.compare("fluid") == 0)
-        physics = 0;
+        physics = FLUID;
     else if (str_physics.compare("solid") == 0)
-        physics = 1;
+        physics = SOLID;
     else
         physics = 1000;
 
+    return physics;
+}
+
+int CManager::getGlobalIndex(string const &str_physics, int const &iProc, int const &iVertex)
+{
+
+    return getGlobalIndex(getPhysics(str_physics), iProc, iVertex);
+}
+
+int CManager::getGlobalIndex(int const &physics, int const &iProc, int const &iVertex) const
+{
+
     return globalIndexRange[physics][iProc][0] + iVertex;
 }
 
+vector<int> const &CManager::getGlobalIndexRange(int const &physics, int const &iProc) const
+{
+
+    return globalIndexRange[physics][iProc];
+}
+
 void CManager::setGlobalIndexing(std::string str_physics, std::vector<std::vector<int>> index_range)
 {
 
-    int physics;
+    int physics = getPhysics(str_physics);
 
     assert(index_range.size() == static_cast<unsigned int>(mpiSize));
 
-    if (str_physics.compare("fluid") == 0)
-        physics = 0;
-    else if (str_physics.compare("solid") == 0)
-        physics = 1;
-    else
-        physics = 1000;
-
     for (int ii = 0; ii < mpiSize; ii++)
     {
         for (int jj = 0; jj < 2; jj++)
@@ -29,9 +29,17 @@ class CManager
 {
 
 public:
+    enum Physics
+    {
+        FLUID = 0,
+        SOLID = 1
+    };
     CManager();
     virtual ~CManager();
+    static int getPhysics(std::string const &str_physics);
     int getGlobalIndex(std::string const &str_physics, int const &iProc, int const &iVertex);
+    int getGlobalIndex(int const &physics, int const &iProc, int const &iVertex) const;
+    std::vector<int> const &getGlobalIndexRange(int const &physics, int const &iProc) const;
     void setGlobalIndexing(std::string str_physics, std::vector<std::vector<int>> index_range);
     std::vector<std::vector<std::vector<int>>> globalIndexRange;
     int nPhyscis;
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# CUPyDO regression test
+# History and correction of the Anderson and IQN-GB algorithms:
+# - the RingBuffer order after wrap-around (get, getStored/getAges, truncate, getState/setState) is compared with a list of the pushed arrays,
+# - the Anderson correction is compared with a dense least-squares solution (type II) and the IQN-GB one with the dense generalized Broyden
+#   inverse Jacobian (type I), which satisfies the secant equations and is only updated in the range of dX^T.
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+#  Algorithms without solvers
+# ----------------------------------------------------------------------
+
+def newAlgorithm(name, depth, damping, restartType):
+    """
+    Anderson or IQN-GB algorithm (the constructors need the solvers, the attributes are set here).
+    """
+
+    from cupydo.algorithm import AlgorithmAnderson, AlgorithmIQN_GB
+    from cupydo.utilities import RingBuffer
+
+    class Anderson(AlgorithmAnderson):
+        def __init__(self):
+            pass
+
+    class IQN_GB(AlgorithmIQN_GB):
+        def __init__(self):
+            pass
+
+    algo = Anderson() if name == 'Anderson' else IQN_GB()
+    algo.mpiComm = None
+    algo.myid = 0
+    algo.depth = depth
+    algo.damping = damping
+    algo.restartType = restartType
+    algo.safeguardFactor = None
+    algo.maxConditionNumber = 1.0e10
+    algo.deltaRes = RingBuffer(depth)
+    algo.deltaD = RingBuffer(depth)
+    algo.resNormkM1 = None
+    return algo
+
+# ----------------------------------------------------------------------
+#  Test
+# ----------------------------------------------------------------------
+
+def sameOrder(buff, ref):
+    """
+    Compares the RingBuffer buff with the list ref of the stored arrays (the newest first).
+    """
+
+    if buff.getSize() != len(ref):
+        return False
+    if not all(np.array_equal(buff.get(i), ref[i]) for i in range(len(ref))):
+        return False
+    if len(ref) == 0:
+        return True
+    stored, ages = buff.getStored(), buff.getAges()
+    return len(stored) == len(ref) and sorted(ages) == range(len(ref)) and all(np.array_equal(stored[j], ref[ages[j]]) for j in range(len(ref)))
+
+def testRingBuffer(tests, rng):
+    from cupydo.testing import CTest
+    from cupydo.utilities import RingBuffer
+
+    n, size = 5, 4
+    errors = {'wrap-around': 0, 'truncate': 0, 'state': 0, 'random': 0}
+
+    # --- Wrap-around: the oldest arrays are overwritten --- #
+    buff = RingBuffer(size)
+    ref = []
+    for j in range(2*size+1):
+        v = rng.rand(n)
+        buff.push(v)
+        ref = ([v] + ref)[:size]
+        if not sameOrder(buff, ref):
+            errors['wrap-around'] += 1
+
+    # --- Truncate after wrap-around, then push again (the stored part wraps around the end of the storage) --- #
+    buff.truncate(2)
+    ref = ref[:2]
+    if not sameOrder(buff, ref):
+        errors['truncate'] += 1
+    for j in range(size):
+        v = rng.rand(n)
+        buff.push(v)
+        ref = ([v] + ref)[:size]
+        if not sameOrder(buff, ref):
+            errors['truncate'] += 1
+
+    # --- getState/setState --- #
+    state = buff.getState()
+    refState = list(ref)
+    for j in range(3):
+        v = rng.rand(n)
+        buff.push(v)
+    buff.truncate(1)
+    buff.setState(state)
+    if not sameOrder(buff, refState):
+        errors['state'] += 1
+
+    # --- Random sequences --- #
+    buff = RingBuffer(size)
+    ref = []
+    for it in range(2000):
+        op = rng.randint(6)
+        if op < 4:
+            v = rng.rand(n)
+            buff.push(v)
+            ref = ([v] + ref)[:size]
+        elif op == 4:
+            m = rng.randint(0, size+1)
+            buff.truncate(m)
+            ref = ref[:m]
+        elif rng.rand() < 0.2:
+            buff.reset()
+            ref = []
+        if not sameOrder(buff, ref):
+            errors['random'] += 1
+
+    for name in ['wrap-around', 'truncate', 'state', 'random']:
+        tests.add(CTest('RingBuffer errors ({})'.format(name), errors[name], 0, 0, True))
+
+def testCorrections(tests, rng):
+    from cupydo.testing import CTest
+
+    n, depth, damping = 40, 5, 0.7
+    for name in ['Anderson', 'IQN-GB']:
+        err, secantErr = 0.0, 0.0
+        for restartType in ['window', 'restart']:
+            algo = newAlgorithm(name, depth, damping, restartType)
+            dRList, dXList = [], []
+            for it in range(2*depth+2):
+                # --- New secant pair (dX = delta_d - delta_res) --- #
+                dr, dd = rng.rand(n), rng.rand(n)
+                if restartType == 'restart' and len(dRList) == depth:
+                    dRList, dXList = [], []
+                algo.addSecantPair(dr, dd)
+                dRList, dXList = ([dr] + dRList)[:depth], ([dd - dr] + dXList)[:depth]
+
+                # --- Dense reference, columns sorted by age --- #
+                dR, dX = np.array(dRList).T, np.array(dXList).T
+                res = rng.rand(n)
+                if name == 'Anderson':
+                    gamma = np.linalg.lstsq(dR, res, rcond=None)[0]
+                    deltaRef = damping*res - (dX + damping*dR).dot(gamma)
+                else:
+                    H = damping*np.eye(n) - (dX + damping*dR).dot(np.linalg.solve(dX.T.dot(dR), dX.T))
+                    deltaRef = H.dot(res)
+                    # --- H*dR = -dX and H = damping*I on the orthogonal complement of dX --- #
+                    P = np.eye(n) - dX.dot(np.linalg.pinv(dX))
+                    secantErr = max(secantErr, np.abs(H.dot(dR) + dX).max(), np.abs((H - damping*np.eye(n)).dot(P)).max())
+                err = max(err, np.abs(algo.computeCorrection(res) - deltaRef).max())
+        tests.add(CTest('{} correction vs dense reference'.format(name), err, 0, 1e-10, True))
+        if name == 'IQN-GB':
+            tests.add(CTest('IQN-GB reference secant and range errors', secantErr, 0, 1e-10, True))
+
+def test():
+    from cupydo.testing import CTests
+
+    rng = np.random.RandomState(4)
+    tests = CTests()
+    testRingBuffer(tests, rng)
+    testCorrections(tests, rng)
+    tests.run()
+
+def main():
+    test()
+
+    # eof
+    print ''
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+    main()
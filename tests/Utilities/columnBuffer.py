@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# CUPyDO regression test
+# Storage of the IQN-ILS history: the ColumnBuffer (columns inserted at both ends) and the IncrementalQR factorization are
+# compared with dense references (numpy matrices) along random sequences of insertions, deletions and truncations.
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+#  Test
+# ----------------------------------------------------------------------
+
+def sameMatrix(buff, ref):
+    """
+    Compares the columns of buff with the dense reference (None if there is no column).
+    """
+
+    M = buff.get()
+    if ref.shape[1] == 0:
+        return M is None and buff.getNumberOfColumns() == 0
+    return M is not None and M.shape == ref.shape and np.array_equal(M, ref)
+
+def testColumnBuffer(tests, rng):
+    from cupydo.testing import CTest
+    from cupydo.utilities import ColumnBuffer
+
+    n = 7
+    errors = {'growth': 0, 'wrap-around': 0, 'delete': 0, 'random': 0}
+
+    # --- Growth: prepend beyond the capacity keeps the columns, the storage is at most twice the number of columns --- #
+    buff = ColumnBuffer(4)
+    ref = np.zeros((n, 0))
+    for j in range(20):
+        v = rng.rand(n)
+        buff.prepend(v)
+        ref = np.column_stack((v, ref))
+        if not sameMatrix(buff, ref) or buff.capacity < buff.getNumberOfColumns():
+            errors['growth'] += 1
+    if buff.capacity > 2*(20+1):
+        errors['growth'] += 1
+
+    # --- Wrap-around: prepend with head == 0 and append with tail == capacity, the columns are moved to the other end (no growth up to capacity/2 columns) --- #
+    buff = ColumnBuffer(8)
+    ref = np.zeros((n, 0))
+    while buff.data is None or buff.head > 0:
+        v = rng.rand(n)
+        buff.prepend(v)
+        ref = np.column_stack((v, ref))
+    buff.truncate(3)
+    ref = ref[:,:3]
+    data = buff.data
+    v = rng.rand(n)
+    buff.prepend(v)
+    ref = np.column_stack((v, ref))
+    if not sameMatrix(buff, ref) or buff.data is not data or buff.tail != buff.capacity:
+        errors['wrap-around'] += 1
+    buff.delete(0)
+    ref = ref[:,1:]
+    v = rng.rand(n)
+    buff.append(v)
+    ref = np.column_stack((ref, v))
+    if not sameMatrix(buff, ref) or buff.data is not data or buff.head != 0:
+        errors['wrap-around'] += 1
+
+    # --- Delete: the columns before (i < k/2) or after (i >= k/2) the deleted one are shifted --- #
+    for i in range(9):
+        buff = ColumnBuffer(4)
+        ref = rng.rand(n, 9)
+        buff.set(ref)
+        head, tail = buff.head, buff.tail
+        buff.delete(i)
+        ref = np.delete(ref, i, 1)
+        if not sameMatrix(buff, ref):
+            errors['delete'] += 1
+        if (i < 9//2 and (buff.head, buff.tail) != (head+1, tail)) or (i >= 9//2 and (buff.head, buff.tail) != (head, tail-1)):
+            errors['delete'] += 1
+
+    # --- Random sequences --- #
+    buff = ColumnBuffer(2)
+    ref = np.zeros((n, 0))
+    for it in range(3000):
+        op = rng.randint(7)
+        k = ref.shape[1]
+        if op < 2:
+            v = rng.rand(n)
+            buff.prepend(v)
+            ref = np.column_stack((v, ref))
+        elif op < 4:
+            v = rng.rand(n)
+            buff.append(v)
+            ref = np.column_stack((ref, v))
+        elif op == 4 and k > 0:
+            i = rng.randint(k)
+            buff.delete(i)
+            ref = np.delete(ref, i, 1)
+        elif op == 5:
+            m = rng.randint(0, k+1)
+            buff.truncate(m)
+            ref = ref[:,:m]
+        elif rng.rand() < 0.1:
+            if rng.rand() < 0.5:
+                buff.reset()
+                ref = np.zeros((n, 0))
+            else:
+                ref = rng.rand(n, rng.randint(0, 12))
+                buff.set(ref)
+        if ref.shape[1] > 24:
+            buff.truncate(24)
+            ref = ref[:,:24]
+        if not sameMatrix(buff, ref):
+            errors['random'] += 1
+
+    for name in ['growth', 'wrap-around', 'delete', 'random']:
+        tests.add(CTest('ColumnBuffer errors ({})'.format(name), errors[name], 0, 0, True))
+
+def testIncrementalQR(tests, rng):
+    from cupydo.testing import CTest
+    from cupydo.utilities import IncrementalQR
+
+    n = 50
+    qr = IncrementalQR()
+    VRef, WRef, tagsRef = np.zeros((n, 0)), np.zeros((n, 0)), np.zeros(0, dtype=int)
+    err, tagErrors = 0.0, 0
+    state, stateRef = None, None
+    for it in range(3000):
+        op = rng.randint(6)
+        k = VRef.shape[1]
+        if op < 3 or k < 2:
+            v = rng.randn(n)
+            w = rng.randn(n)
+            qr.prepend(v, w, it)
+            VRef, WRef, tagsRef = np.column_stack((v, VRef)), np.column_stack((w, WRef)), np.concatenate(([it], tagsRef))
+        elif op == 3:
+            i = rng.randint(k)
+            qr.delete(i)
+            VRef, WRef, tagsRef = np.delete(VRef, i, 1), np.delete(WRef, i, 1), np.delete(tagsRef, i)
+        elif op == 4:
+            m = rng.randint(1, k+1)
+            qr.truncate(m)
+            VRef, WRef, tagsRef = VRef[:,:m], WRef[:,:m], tagsRef[:m]
+        elif state is None:
+            state, stateRef = qr.getState(), (VRef.copy(), WRef.copy(), tagsRef.copy())
+        else:
+            qr.setState(state)
+            VRef, WRef, tagsRef = stateRef
+            state, stateRef = None, None
+        if VRef.shape[1] > 30:
+            qr.truncate(30)
+            VRef, WRef, tagsRef = VRef[:,:30], WRef[:,:30], tagsRef[:30]
+        k = VRef.shape[1]
+        err = max(err, np.abs(qr.V - VRef).max(), np.abs(qr.W - WRef).max(), np.abs(qr.Q.dot(qr.R) - VRef).max(),
+                  np.abs(qr.Q.T.dot(qr.Q) - np.eye(k)).max(), np.abs(np.tril(qr.R, -1)).max())
+        if qr.getNumberOfColumns() != k or not np.array_equal(qr.tags, tagsRef):
+            tagErrors += 1
+
+    tests.add(CTest('IncrementalQR error (V, W, Q*R = V, Q^T*Q = I)', err, 0, 1e-10, True))
+    tests.add(CTest('IncrementalQR column and tag errors', tagErrors, 0, 0, True))
+
+def test():
+    from cupydo.testing import CTests
+
+    rng = np.random.RandomState(3)
+    tests = CTests()
+    testColumnBuffer(tests, rng)
+    testIncrementalQR(tests, rng)
+    tests.run()
+
+def main():
+    test()
+
+    # eof
+    print ''
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# CUPyDO regression test
+# Low-rank inverse Jacobian of the IQN-IMVJ algorithm, compared with dense references:
+# - the truncated SVD of A*B^T (compressJacobian) with the one of the dense matrix,
+# - without previous Jacobian (A = None), the IQN-IMVJ correction with the IQN-ILS one and with a dense least-squares solution,
+# - the update of the time step (updateTimeStepHistory) with the dense J_prev = -I + W*V^+.
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+#  Algorithms without solvers
+# ----------------------------------------------------------------------
+
+def newHistory(n, k, rng):
+    """
+    Random (well conditioned) V and W.
+    """
+
+    from cupydo.utilities import IncrementalQR
+    qr = IncrementalQR()
+    V, W = rng.rand(n, k), rng.rand(n, k)
+    for j in range(k-1, -1, -1):
+        qr.prepend(V[:,j], W[:,j], 0)
+    return qr, V, W
+
+def newAlgorithms(qr):
+    """
+    IQN-ILS and IQN-IMVJ algorithms sharing the history qr (the constructors need the solvers, the attributes are set here).
+    """
+
+    from cupydo.algorithm import AlgorithmIQN_ILS, AlgorithmIQN_MVJ
+
+    class ILS(AlgorithmIQN_ILS):
+        def __init__(self):
+            pass
+
+    class MVJ(AlgorithmIQN_MVJ):
+        def __init__(self):
+            pass
+
+    ils, mvj = ILS(), MVJ()
+    for algo in [ils, mvj]:
+        algo.mpiComm = None
+        algo.myid = 0
+        algo.useQR = True
+        algo.qrFilter = 'Haelterman'
+        algo.tollQR = 1.0e-6
+        algo.qr = qr
+    mvj.A = None
+    mvj.B = None
+    mvj.timeIter = 1
+    mvj.restartType = 'SVD'
+    mvj.maxRank = 100
+    mvj.svdTol = 1.0e-4
+    mvj.nbTimeSinceRestart = 0
+    return ils, mvj
+
+# ----------------------------------------------------------------------
+#  Test
+# ----------------------------------------------------------------------
+
+def test():
+    from cupydo.testing import CTest, CTests
+
+    rng = np.random.RandomState(2)
+    n = 60
+    tests = CTests()
+
+    # --- compressJacobian: truncated SVD of A*B^T (decaying spectrum, within the accuracy of the Gram matrix orthogonalization) --- #
+    ils, mvj = newAlgorithms(None)
+    errSVD = 0.0
+    rankErrors = 0
+    for maxRank, svdTol in [(100, 1.0e-4), (4, 1.0e-12), (100, 1.0e-6)]:
+        k = 12
+        mvj.A = rng.rand(n, k).dot(np.diag(np.logspace(0, -6, k)))
+        mvj.B = rng.rand(n, k)
+        mvj.maxRank, mvj.svdTol = maxRank, svdTol
+        M = mvj.A.dot(mvj.B.T)
+        U, S, VT = np.linalg.svd(M)
+        rank = min(maxRank, np.count_nonzero(S > svdTol*S[0]))
+        MRef = (U[:,:rank]*S[:rank]).dot(VT[:rank])
+        mvj.compressJacobian()
+        rankErrors += abs(mvj.getJacobianRank() - rank)
+        errSVD = max(errSVD, np.linalg.norm(mvj.A.dot(mvj.B.T) - MRef)/np.linalg.norm(M))
+    tests.add(CTest('compressJacobian rank difference', rankErrors, 0, 0, True))
+    tests.add(CTest('compressJacobian error', errSVD, 0, 1e-10, True))
+
+    # --- Without previous Jacobian, IQN-IMVJ is IQN-ILS --- #
+    qr, V, W = newHistory(n, 6, rng)
+    ils, mvj = newAlgorithms(qr)
+    res = rng.rand(n)
+    X = rng.rand(n, 3)
+    c = np.linalg.lstsq(V, -res, rcond=None)[0]
+    deltaRef = W.dot(c) + res
+    tests.add(CTest('applyPreviousJacobian without A', np.abs(mvj.applyPreviousJacobian(X) + X).max(), 0, 0, True))
+    tests.add(CTest('IQN-IMVJ vs IQN-ILS correction', np.abs(mvj.computeCorrection(res) - ils.computeCorrection(res)).max(), 0, 1e-12, True))
+    tests.add(CTest('IQN-IMVJ vs dense least-squares correction', np.abs(mvj.computeCorrection(res) - deltaRef).max(), 0, 1e-10, True))
+
+    # --- Update of the time step: J_prev = -I + W*V^+ --- #
+    mvj.updateTimeStepHistory(6)
+    JRef = -np.eye(n) + W.dot(np.linalg.pinv(V))
+    JPrev = -np.eye(n) + mvj.A.dot(mvj.B.T)
+    tests.add(CTest('updateTimeStepHistory vs dense J_prev', np.abs(JPrev - JRef).max(), 0, 1e-10, True))
+
+    # --- Next time step: new secant pairs, J = J_prev + (W - V - J_prev*V)*V^+ --- #
+    qr2, V2, W2 = newHistory(n, 4, rng)
+    mvj.qr = qr2
+    JRef2 = JRef + (W2 - V2 - JRef.dot(V2)).dot(np.linalg.pinv(V2))
+    tests.add(CTest('IQN-IMVJ correction with J_prev', np.abs(mvj.computeCorrection(res) + JRef2.dot(res)).max(), 0, 1e-10, True))
+
+    tests.run()
+
+def main():
+    test()
+
+    # eof
+    print ''
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# CUPyDO regression test
+# QR filters of the IQN-ILS algorithm: the vectorized implementations must keep exactly the same columns (and give the same
+# least-squares coefficients) as the original loop implementations, which are reproduced below as references.
+
+import numpy as np
+import scipy as sp
+import scipy.linalg
+
+# ----------------------------------------------------------------------
+#  Reference (loop) implementations
+# ----------------------------------------------------------------------
+
+def solve_upper_triangular_mod_ref(U, y, toll):
+
+    n = y.shape[0]
+    x = np.zeros((n,))
+
+    for i in range (n - 1, -1, -1):
+        if abs(U[i, i]) <= toll:
+            x[i] = 0.
+        else:
+            x[i] = y[i];
+            for j in range (i + 1, n):
+                  x[i] -= U[i, j] * x[j]
+            x[i] /= U[i, i]
+    return x.T
+
+def QRfiltering_ref(V, W, toll):
+
+    while True:
+        n = V.shape[0]
+        s = V.shape[1]
+
+        flag = True
+
+        Q, R = sp.linalg.qr(V, mode='economic')
+
+        for i in range(0, s):
+            if abs(R[i,i]) < toll*np.linalg.norm(R, 2):
+                V = np.delete(V, i, 1)
+                W = np.delete(W, i, 1)
+                if i == s-1:
+                    flag = False
+                else:
+                    flag = True
+                break
+        if i >= s-1 and flag == True:
+            return (Q, R, V, W)
+
+def QRfiltering_mod_ref(V, W, toll):
+
+    while True:
+        n = V.shape[0]
+        s = V.shape[1]
+        Q = np.zeros((n, s))
+        R = np.zeros((s, s))
+
+        flag = True
+
+        i = 0
+        V0 = V[:,i]
+        R[i,i] = np.linalg.norm(V0, 2)
+        Q[:,i] = np.dot(V0, 1.0/R[i,i])
+
+        for i in range(1, s):
+            vbar = V[:,i]
+            for j in range(0, i):
+                R[j,i] = np.dot(Q[:,j].T,vbar)
+                vbar = vbar - np.dot(Q[:,j], R[j,i])
+            if np.linalg.norm(vbar, 2) < toll*np.linalg.norm(V[:,i], 2):
+                V = np.delete(V, i, 1)
+                W = np.delete(W, i, 1)
+                if i == s-1:
+                    flag = False
+                else:
+                    flag = True
+                break
+            else:
+                R[i,i] = np.linalg.norm(vbar, 2)
+                Q[:,i] = np.dot(vbar, 1.0/R[i,i])
+        if i >= s-1 and flag == True:
+            return (Q, R, V, W)
+
+def incrementalFilter_ref(qr, method, toll):
+
+    nRemoved = 0
+    if method == 'Haelterman':
+        i = 1
+        while i < qr.getNumberOfColumns():
+            if abs(qr.R[i,i]) < toll*qr.norms[i]:
+                qr.delete(i)
+                nRemoved += 1
+            else:
+                i += 1
+    elif method == 'Degroote2':
+        while qr.getNumberOfColumns() > 0:
+            small = np.flatnonzero(np.abs(np.diag(qr.R)) < toll*np.linalg.norm(qr.R, 2))
+            if small.size == 0:
+                break
+            qr.delete(small[0])
+            nRemoved += 1
+    return nRemoved
+
+# ----------------------------------------------------------------------
+#  Test
+# ----------------------------------------------------------------------
+
+def randomHistory(rng):
+    """
+    Random V (with almost linearly dependent columns), W, residual and filtering tolerance.
+    """
+
+    n = rng.randint(20, 60)
+    k = rng.randint(2, 12)
+    V = rng.rand(n, k)
+    for j in range(k):
+        if rng.rand() < 0.4:
+            a, b = rng.randint(0, k, 2)
+            V[:,j] = V[:,a]*rng.rand() + V[:,b]*rng.rand() + 10**rng.uniform(-6, 0)*rng.rand(n)
+    W = rng.rand(n, k)
+    res = rng.rand(n)
+    toll = 10**rng.uniform(-3, -0.5)
+    return V, W, res, toll
+
+def sameColumns(V1, W1, V2, W2):
+    return V1.shape == V2.shape and np.array_equal(W1, W2) and np.array_equal(V1, V2)
+
+def test(nCases=400):
+    from cupydo.testing import CTest, CTests
+    from cupydo.utilities import solve_upper_triangular_mod, QRfiltering, QRfiltering_mod, IncrementalQR
+
+    rng = np.random.RandomState(1)
+    errors = {'Degroote1': 0, 'Degroote2': 0, 'Haelterman': 0, 'IncrementalQR Degroote2': 0, 'IncrementalQR Haelterman': 0}
+
+    for case in range(nCases):
+        V, W, res, toll = randomHistory(rng)
+
+        # --- Degroote1: no removal, the coefficients of the dependent columns are set to zero --- #
+        Q, R = sp.linalg.qr(V, mode='economic')
+        s = np.dot(Q.T, -res)
+        tollR = toll*np.linalg.norm(R, 2)
+        x, xRef = solve_upper_triangular_mod(R, s, tollR), solve_upper_triangular_mod_ref(R, s, tollR)
+        if not (np.array_equal(x == 0.0, xRef == 0.0) and np.allclose(x, xRef, rtol=1e-8, atol=1e-12)):
+            errors['Degroote1'] += 1
+
+        # --- Degroote2 and Haelterman --- #
+        for name, filtering, filteringRef in [('Degroote2', QRfiltering, QRfiltering_ref), ('Haelterman', QRfiltering_mod, QRfiltering_mod_ref)]:
+            Q, R, Vk, Wk = filtering(V.copy(), W.copy(), toll)
+            QRef, RRef, VkRef, WkRef = filteringRef(V.copy(), W.copy(), toll)
+            if not sameColumns(Vk, Wk, VkRef, WkRef):
+                errors[name] += 1
+                continue
+            x = sp.linalg.solve_triangular(R, np.dot(Q.T, -res))
+            xRef = sp.linalg.solve_triangular(RRef, np.dot(QRef.T, -res))
+            if not np.allclose(x, xRef, rtol=1e-6, atol=1e-10):
+                errors[name] += 1
+
+        # --- IncrementalQR.filter (newest column first) --- #
+        for method in ['Degroote2', 'Haelterman']:
+            qr, qrRef = IncrementalQR(), IncrementalQR()
+            for j in range(V.shape[1]-1, -1, -1):
+                qr.prepend(V[:,j], W[:,j], j)
+                qrRef.prepend(V[:,j], W[:,j], j)
+            qr.filter(method, toll)
+            incrementalFilter_ref(qrRef, method, toll)
+            if not (np.array_equal(qr.tags, qrRef.tags) and sameColumns(qr.V, qr.W, qrRef.V, qrRef.W)):
+                errors['IncrementalQR ' + method] += 1
+                continue
+            x = sp.linalg.solve_triangular(qr.R, qr.dot(-res))
+            xRef = sp.linalg.solve_triangular(qrRef.R, qrRef.dot(-res))
+            if not np.allclose(x, xRef, rtol=1e-6, atol=1e-10):
+                errors['IncrementalQR ' + method] += 1
+
+    tests = CTests()
+    for name in sorted(errors.keys()):
+        tests.add(CTest('Cases differing from the reference ({})'.format(name), errors[name], 0, 0, True))
+    tests.run()
+
+def main():
+    test()
+
+    # eof
+    print ''
+
+# --- This is only accessed if running from command prompt --- #
+if __name__ == '__main__':
+    main()